@@ -2,18 +2,29 @@
 # Purpose: Process and merge data from mimic identification pipeline
 
 import os
+import sys
 import pandas as pd
 import numpy as np
 import json
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, Counter
+from collections.abc import Mapping
+from dataclasses import dataclass, asdict, fields
 import math
 import functools
+import itertools
+import copy
+import operator
 import re
 import time
 import mmap
 import io
+import contextlib
 import tracemalloc
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import weakref
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Tuple, Set, Optional, Union, Any
 
 try:
@@ -22,6 +33,476 @@ try:
 except ImportError:
     HAS_POLARS = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    import pydivsufsort
+    HAS_DIVSUFSORT = True
+except ImportError:
+    HAS_DIVSUFSORT = False
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Arrow-backed string dtype (contiguous buffers instead of one Python object per cell).
+# Missing values stay NaN so existing NaN handling keeps working.
+ARROW_STRING_DTYPE = None
+if HAS_PYARROW:
+    try:
+        ARROW_STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        try:
+            ARROW_STRING_DTYPE = pd.StringDtype('pyarrow_numpy')
+        except TypeError:
+            pass
+
+# Size of the slices used when scanning memory-mapped FASTA files
+INDEX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Feather copy of the merged table, reused while the input files are unchanged
+MERGED_CACHE_FILENAME = '.merged_cache.feather'
+MERGED_CACHE_VERSION = 2
+
+# Domain enrichment results as JSON, reused while the input files are unchanged
+ENRICHMENT_CACHE_FILENAME = '.enrichment_cache.json'
+ENRICHMENT_CACHE_VERSION = 4
+
+# Maximum number of FASTA files kept memory-mapped at once (least recently used are unmapped)
+MAX_MAPPED_FILES = 32
+
+# Records at least this long are cleaned with a vectorized NumPy mask instead of bytes.translate
+NUMPY_STRIP_THRESHOLD = 64 * 1024
+
+# Bytes removed from FASTA sequence lines: residues are printable ASCII, so everything at or
+# below space (line breaks, tabs, other whitespace and control bytes) is dropped
+NON_RESIDUE_BYTES = bytes(range(33))
+
+# Peptide searches doing at least this much work (unique peptides x sequence length)
+# use a single Aho-Corasick pass instead of one str.find per peptide
+AHOCORASICK_MIN_WORK = 500_000
+
+# Sequences at least this long are searched through a suffix array (pydivsufsort) that is
+# kept for later searches: building one costs a few Aho-Corasick scans, after which each
+# peptide is a binary search instead of another pass over the whole sequence
+SUFFIX_ARRAY_MIN_LENGTH = 100_000
+
+# Memory budget in bytes of the kept suffix arrays (least recently used are dropped)
+SUFFIX_ARRAY_CACHE_BYTES = 256 * 1024 * 1024
+
+# Intersection analyses over at least this many sequences are spread over worker processes
+PARALLEL_INTERSECTION_MIN_SEQUENCES = 2000
+
+# Parallel intersection work is cut into this many batches per worker so a slow batch
+# does not leave the other workers idle at the end
+INTERSECTION_BATCHES_PER_WORKER = 4
+
+# Intersection workers are not forked from the (multi-threaded) server process, which could
+# copy a lock held by another thread; a fork server starts them from a clean process instead
+INTERSECTION_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Number of intersection analysis results kept per processor (least recently used are dropped)
+INTERSECTION_CACHE_SIZE = 16
+
+# Number of related-sequence lookups kept per processor (least recently used are dropped)
+RELATED_CACHE_SIZE = 4096
+
+# Number of table filter masks and sort orders kept per processor (least recently used are dropped)
+FILTER_CACHE_SIZE = 64
+
+# The domain columns hold one JSON string per row; orjson parses them several times faster
+# (and writes the JSON cache files faster as well)
+json_loads = orjson.loads if HAS_ORJSON else json.loads
+json_dumps = orjson.dumps if HAS_ORJSON else (lambda obj: json.dumps(obj).encode('utf-8'))
+
+# Sorted pages reaching no further than this fraction (1/n) of the filtered rows are
+# cut out with a partial sort until the full sort order is cached
+PARTIAL_SORT_MAX_FRACTION = 2
+
+# Columns with at least this many distinct strings get a trigram index for substring filters
+# of three or more characters (smaller columns are scanned directly)
+TRIGRAM_INDEX_MIN_STRINGS = 1000
+
+# String filters are regular expressions; ones without these characters match as plain substrings
+REGEX_SPECIAL_CHARS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# Set MIMIC_TRACE_MALLOC to report memory usage of the intersection analysis
+# (tracing slows down every allocation, so it is off by default)
+TRACE_MALLOC = bool(os.environ.get('MIMIC_TRACE_MALLOC'))
+
+# Set MIMIC_DEBUG=1 to print per-request debug details (some format large records)
+DEBUG_OUTPUT = os.environ.get('MIMIC_DEBUG', '0') == '1'
+
+# Companion file in the data directory caching the per-file FASTA indexes between runs
+# (JSON, so reading a file someone else placed there cannot run code)
+INDEX_CACHE_FILENAME = '.seqcache.index.json'
+INDEX_CACHE_VERSION = 4
+
+# String columns of the PFAM/KOFAM hits tables
+HMM_STRING_COLUMNS = ['sequence_id', 'hmm_name']
+
+# Values treated as missing when reading tables (matches the pandas defaults)
+CSV_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null'
+]
+
+def _scan_fasta_buffer(buf):
+    """
+    Locate every record in a FASTA byte buffer in one pass.
+    
+    A record starts at a '>' at the beginning of a line; its header runs to the
+    end of that line and its length is the number of bytes up to the next
+    record, excluding NON_RESIDUE_BYTES (line breaks and other bytes at or below
+    space). JIT-compiled with Numba when available.
+    
+    Args:
+        buf (ndarray): uint8 view of the file contents
+        
+    Returns:
+        tuple: Arrays of header start offsets, header end offsets and sequence lengths
+    """
+    header_starts = []
+    header_ends = []
+    sequence_lengths = []
+    
+    at_line_start = True
+    in_header = False
+    in_record = False
+    residue_count = 0
+    
+    for i in range(buf.shape[0]):
+        byte = buf[i]
+        if at_line_start and byte == 62:  # '>'
+            if in_record:
+                sequence_lengths.append(residue_count)
+            header_starts.append(i)
+            in_header = True
+            in_record = True
+            residue_count = 0
+        elif in_header:
+            if byte == 10:  # '\n'
+                header_ends.append(i)
+                in_header = False
+        elif in_record and byte > 32:  # skip line breaks, whitespace and control bytes
+            residue_count += 1
+        at_line_start = byte == 10
+    
+    if in_record:
+        if in_header:
+            header_ends.append(buf.shape[0])
+        sequence_lengths.append(residue_count)
+    
+    return (np.array(header_starts, dtype=np.int64), np.array(header_ends, dtype=np.int64),
+            np.array(sequence_lengths, dtype=np.int64))
+
+if HAS_NUMBA:
+    _scan_fasta_buffer = njit(cache=True)(_scan_fasta_buffer)
+
+def find_peptide_positions(sequence, peptides):
+    """
+    Find the first occurrence of each peptide in a sequence.
+    
+    Long sequences are searched in their (kept) suffix array, since the same
+    sequences are searched again by every binding analysis. Other large searches
+    build one Aho-Corasick automaton over all peptides and scan the sequence
+    once; everything else uses str.find.
+    
+    Args:
+        sequence (str): The sequence to search
+        peptides (iterable): Peptide strings to look for
+        
+    Returns:
+        dict: Mapping of each peptide to its 0-based start position, or -1 if absent
+    """
+    unique_peptides = {peptide for peptide in peptides if peptide}
+    work = len(unique_peptides) * len(sequence)
+    
+    if unique_peptides and HAS_DIVSUFSORT and len(sequence) >= SUFFIX_ARRAY_MIN_LENGTH and sequence.isascii():
+        return _find_peptide_positions_suffix_array(sequence, unique_peptides)
+    
+    if not unique_peptides or not HAS_AHOCORASICK or work < AHOCORASICK_MIN_WORK:
+        return {peptide: sequence.find(peptide) for peptide in unique_peptides}
+    
+    automaton = ahocorasick.Automaton()
+    for peptide in unique_peptides:
+        automaton.add_word(peptide, peptide)
+    automaton.make_automaton()
+    
+    # Matches arrive in order of end position, so the first hit of a peptide is its first occurrence
+    positions = dict.fromkeys(unique_peptides, -1)
+    for end_index, peptide in automaton.iter(sequence):
+        if positions[peptide] == -1:
+            positions[peptide] = end_index - len(peptide) + 1
+    return positions
+
+# sequence -> (ASCII bytes, suffix array), least recently used first
+_suffix_arrays = OrderedDict()
+_suffix_arrays_bytes = 0
+_suffix_arrays_lock = threading.Lock()
+
+def _suffix_array_bytes(sequence, text, suffix_array):
+    return len(sequence) + len(text) + suffix_array.nbytes
+
+def _get_suffix_array(sequence):
+    """
+    Return the ASCII bytes and suffix array of a sequence, building them on first use.
+    
+    Args:
+        sequence (str): The sequence (ASCII only)
+        
+    Returns:
+        tuple: (bytes, suffix array)
+    """
+    global _suffix_arrays_bytes
+    
+    with _suffix_arrays_lock:
+        entry = _suffix_arrays.get(sequence)
+        if entry is not None:
+            _suffix_arrays.move_to_end(sequence)
+            return entry
+    
+    # Built outside the lock; a concurrent build of the same sequence is just discarded
+    text = sequence.encode('ascii')
+    entry = (text, pydivsufsort.divsufsort(text))
+    with _suffix_arrays_lock:
+        if sequence not in _suffix_arrays:
+            _suffix_arrays[sequence] = entry
+            _suffix_arrays_bytes += _suffix_array_bytes(sequence, *entry)
+            while _suffix_arrays_bytes > SUFFIX_ARRAY_CACHE_BYTES and len(_suffix_arrays) > 1:
+                old_sequence, old_entry = _suffix_arrays.popitem(last=False)
+                _suffix_arrays_bytes -= _suffix_array_bytes(old_sequence, *old_entry)
+    return entry
+
+def _find_peptide_positions_suffix_array(sequence, peptides):
+    """
+    Find the first occurrence of each peptide using a suffix array of the sequence.
+    
+    Args:
+        sequence (str): The sequence to search (ASCII only)
+        peptides (set): Non-empty peptide strings to look for
+        
+    Returns:
+        dict: Mapping of each peptide to its 0-based start position, or -1 if absent
+    """
+    text, suffix_array = _get_suffix_array(sequence)
+    
+    positions = {}
+    for peptide in peptides:
+        if not peptide.isascii():
+            positions[peptide] = -1
+            continue
+        count, first = pydivsufsort.sa_search(text, suffix_array, peptide.encode('ascii'))
+        # Matching suffixes are sorted lexicographically, not by position, so take the smallest
+        positions[peptide] = int(suffix_array[first:first + count].min()) if count else -1
+    return positions
+
+def _intersect_domain_binding_ranges(domain_firsts, domain_stops, domain_starts, domain_ends,
+                                     binding_firsts, binding_stops, binding_starts, binding_ends):
+    """
+    Compare every domain with every binding of each sequence in compiled loops.
+    
+    Sequence i owns domain rows [domain_firsts[i], domain_stops[i]) and binding
+    rows [binding_firsts[i], binding_stops[i]). Hits are counted in a first pass
+    so the output arrays can be allocated exactly, and come out in the same order
+    as the NumPy path (by sequence, domain, binding). JIT-compiled with Numba
+    (releasing the GIL) when available.
+    
+    Returns:
+        tuple: Arrays of sequence index, domain row, binding row and overlap percentage per hit
+    """
+    num_sequences = domain_firsts.shape[0]
+    
+    total_hits = 0
+    for i in range(num_sequences):
+        for d in range(domain_firsts[i], domain_stops[i]):
+            for b in range(binding_firsts[i], binding_stops[i]):
+                overlap = min(domain_ends[d], binding_ends[b]) - max(domain_starts[d], binding_starts[b]) + 1
+                if overlap * 2 >= binding_ends[b] - binding_starts[b] + 1:
+                    total_hits += 1
+    
+    sequence_index = np.empty(total_hits, dtype=np.int32)
+    domain_rows = np.empty(total_hits, dtype=np.int64)
+    binding_rows = np.empty(total_hits, dtype=np.int64)
+    overlap_pcts = np.empty(total_hits, dtype=np.float64)
+    k = 0
+    for i in range(num_sequences):
+        for d in range(domain_firsts[i], domain_stops[i]):
+            for b in range(binding_firsts[i], binding_stops[i]):
+                overlap = min(domain_ends[d], binding_ends[b]) - max(domain_starts[d], binding_starts[b]) + 1
+                binding_length = binding_ends[b] - binding_starts[b] + 1
+                if overlap * 2 >= binding_length:
+                    sequence_index[k] = i
+                    domain_rows[k] = d
+                    binding_rows[k] = b
+                    overlap_pcts[k] = overlap / binding_length * 100
+                    k += 1
+    
+    return sequence_index, domain_rows, binding_rows, overlap_pcts
+
+if HAS_NUMBA:
+    _intersect_domain_binding_ranges = njit(nogil=True, cache=True)(_intersect_domain_binding_ranges)
+
+def _count_selected_domain_codes(rows, row_values, value_indptr, value_codes, num_names):
+    """
+    Count domain name codes over the selected rows (in table order) in one pass, without sorting.
+    
+    Row i holds distinct value row_values[i] (-1 if missing), whose hits are
+    value_codes[value_indptr[v]:value_indptr[v + 1]]. Each distinct value is
+    expanded once, weighted by its number of selected rows. Only used when
+    Numba is available (JIT-compiled).
+    
+    Returns:
+        tuple: Hit count of every name code, and the codes present in order of first appearance
+    """
+    value_rows = np.zeros(value_indptr.shape[0] - 1, dtype=np.int64)
+    value_order = np.empty(value_indptr.shape[0] - 1, dtype=np.int64)
+    num_values = 0
+    for k in range(rows.shape[0]):
+        v = row_values[rows[k]]
+        if v >= 0:
+            if value_rows[v] == 0:
+                value_order[num_values] = v
+                num_values += 1
+            value_rows[v] += 1
+    
+    counts = np.zeros(num_names, dtype=np.int64)
+    appearance = np.empty(num_names, dtype=np.int64)
+    num_present = 0
+    for k in range(num_values):
+        v = value_order[k]
+        for j in range(value_indptr[v], value_indptr[v + 1]):
+            code = value_codes[j]
+            if counts[code] == 0:
+                appearance[num_present] = code
+                num_present += 1
+            counts[code] += value_rows[v]
+    
+    return counts, appearance[:num_present]
+
+if HAS_NUMBA:
+    _count_selected_domain_codes = njit(cache=True)(_count_selected_domain_codes)
+
+def _find_domain_binding_intersections(sequence_ids, domain_bounds, domain_starts, domain_ends,
+                                       binding_bounds, binding_starts, binding_ends):
+    """
+    Find the domain/binding pairs of each sequence where at least half of the binding lies in the domain.
+    
+    Domains and bindings are given column-wise; each sequence owns a contiguous
+    (first, stop) range of rows in the domain arrays and in the binding arrays.
+    Uses the compiled kernel when Numba is available, otherwise NumPy broadcasting
+    per sequence. Defined at module level so batches can be sent to worker processes.
+    
+    Args:
+        sequence_ids (list): Sequence IDs to process
+        domain_bounds (dict): (first, stop) domain rows of each sequence
+        domain_starts (ndarray): Start position of every domain
+        domain_ends (ndarray): End position of every domain
+        binding_bounds (dict): (first, stop) binding rows of each sequence
+        binding_starts (ndarray): Start position of every binding
+        binding_ends (ndarray): End position of every binding
+        
+    Returns:
+        dict: Column arrays with one entry per intersecting pair: 'sequence_index'
+        (position in sequence_ids), 'domain_rows', 'binding_rows' and 'overlap_pcts'
+    """
+    if HAS_NUMBA:
+        domain_ranges = np.array([domain_bounds[seq_id] for seq_id in sequence_ids], dtype=np.int64).reshape(-1, 2)
+        binding_ranges = np.array([binding_bounds[seq_id] for seq_id in sequence_ids], dtype=np.int64).reshape(-1, 2)
+        sequence_index, domain_rows, binding_rows, overlap_pcts = _intersect_domain_binding_ranges(
+            np.ascontiguousarray(domain_ranges[:, 0]), np.ascontiguousarray(domain_ranges[:, 1]),
+            domain_starts, domain_ends,
+            np.ascontiguousarray(binding_ranges[:, 0]), np.ascontiguousarray(binding_ranges[:, 1]),
+            binding_starts, binding_ends
+        )
+        return {
+            'sequence_index': sequence_index,
+            'domain_rows': domain_rows.astype(np.intp, copy=False),
+            'binding_rows': binding_rows.astype(np.intp, copy=False),
+            'overlap_pcts': overlap_pcts
+        }
+    
+    sequence_index_chunks = []
+    domain_row_chunks = []
+    binding_row_chunks = []
+    overlap_pct_chunks = []
+    
+    for position, seq_id in enumerate(sequence_ids):
+        domain_first, domain_stop = domain_bounds[seq_id]
+        binding_first, binding_stop = binding_bounds[seq_id]
+        
+        # Compare every domain with every binding at once: rows are domains, columns bindings
+        seq_domain_starts = domain_starts[domain_first:domain_stop]
+        seq_domain_ends = domain_ends[domain_first:domain_stop]
+        seq_binding_starts = binding_starts[binding_first:binding_stop]
+        seq_binding_ends = binding_ends[binding_first:binding_stop]
+        
+        # Overlap length is zero or negative where a domain and binding do not intersect
+        overlap_lengths = (np.minimum(seq_domain_ends[:, None], seq_binding_ends[None, :])
+                           - np.maximum(seq_domain_starts[:, None], seq_binding_starts[None, :]) + 1)
+        binding_lengths = seq_binding_ends - seq_binding_starts + 1
+        
+        # Only count if overlap is significant (at least 50%): compared in integers,
+        # the percentage is only computed for the pairs that pass
+        domain_indices, binding_indices = np.nonzero(overlap_lengths * 2 >= binding_lengths[None, :])
+        if len(domain_indices) == 0:
+            continue
+        
+        sequence_index_chunks.append(np.full(len(domain_indices), position, dtype=np.int32))
+        domain_row_chunks.append(domain_indices + domain_first)
+        binding_row_chunks.append(binding_indices + binding_first)
+        overlap_pct_chunks.append(overlap_lengths[domain_indices, binding_indices] / binding_lengths[binding_indices] * 100)
+    
+    def concatenate(chunks, dtype):
+        return np.concatenate(chunks).astype(dtype, copy=False) if chunks else np.empty(0, dtype=dtype)
+    
+    return {
+        'sequence_index': concatenate(sequence_index_chunks, np.int32),
+        'domain_rows': concatenate(domain_row_chunks, np.intp),
+        'binding_rows': concatenate(binding_row_chunks, np.intp),
+        'overlap_pcts': concatenate(overlap_pct_chunks, np.float64)
+    }
+
+def _write_cache_file(cache_path, write, description):
+    """
+    Write a cache file through a temporary file so a concurrent reader never sees a partial cache.
+    
+    Args:
+        cache_path (str): Path of the cache file
+        write (callable): Writes the cache to the (temporary) path it is given
+        description (str): What the cache holds, for the warning when it cannot be written
+    """
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        # A read-only data directory (or an unconvertible value) just means no cache
+        print(f"Could not write {description} cache {cache_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 class SequenceCache:
     """
     Efficient cache for FASTA sequences using memory mapping and indexing.
@@ -30,16 +511,22 @@ class SequenceCache:
     while keeping memory usage low by using memory-mapped files.
     """
     
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str, max_mapped_files: int = MAX_MAPPED_FILES):
         """
         Initialize the sequence cache.
         
         Args:
             data_dir (str): Directory containing FASTA files
+            max_mapped_files (int): Maximum number of files kept memory-mapped at once
         """
         self.data_dir = data_dir
-        self.sequence_index: Dict[str, Tuple[str, int, int]] = {}  # seq_id -> (filename, start_pos, length)
-        self.mmapped_files: Dict[str, mmap.mmap] = {}
+        # seq_id -> (filename, start_pos, length, record_bytes); record_bytes is the exact
+        # size of the sequence lines on disk, line breaks included
+        self.sequence_index: Dict[str, Tuple[str, int, int, int]] = {}
+        # Files are mapped on first use and kept in least-recently-used order
+        self.mmapped_files: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+        self.max_mapped_files = max(1, max_mapped_files)
+        self._mmap_lock = threading.Lock()
         self.sequence_lengths: Dict[str, int] = {}
         
         # Initialize the cache
@@ -57,29 +544,110 @@ class SequenceCache:
             print("No FASTA files found in data directory")
             return
             
-        # Use ThreadPoolExecutor to index files in parallel
-        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
-            # Submit indexing tasks for each file
-            futures = {executor.submit(self._index_single_file, os.path.join(self.data_dir, f)): f 
-                      for f in fasta_files}
-            
-            # Process results as they complete
-            for future in futures:
-                filename = futures[future]
-                try:
-                    file_sequences = future.result()
-                    # Merge the results into our main index
-                    for seq_id, (start_pos, length) in file_sequences.items():
-                        self.sequence_index[seq_id] = (filename, start_pos, length)
-                        self.sequence_lengths[seq_id] = length
-                except Exception as e:
-                    print(f"Error indexing {filename}: {e}")
+        # Reuse cached indexes for files that have not changed since the last run
+        file_stamps = {f: self._file_stamp(os.path.join(self.data_dir, f)) for f in fasta_files}
+        file_indexes = self._load_index_cache(file_stamps)
+        stale_files = [f for f in fasta_files if f not in file_indexes]
+        
+        # The mmap scan is CPU-bound and holds the GIL, so threads would not run in parallel.
+        # Index several files in separate processes; a single file is scanned directly.
+        if len(stale_files) == 1:
+            file_indexes[stale_files[0]] = self._index_single_file(os.path.join(self.data_dir, stale_files[0]))
+        elif stale_files:
+            with ProcessPoolExecutor(max_workers=min(len(stale_files), os.cpu_count() or 1)) as executor:
+                # Submit indexing tasks for each file
+                futures = {executor.submit(self._index_single_file, os.path.join(self.data_dir, f)): f 
+                          for f in stale_files}
+                
+                # Collect the per-file results
+                for future in futures:
+                    filename = futures[future]
+                    try:
+                        file_indexes[filename] = future.result()
+                    except Exception as e:
+                        print(f"Error indexing {filename}: {e}")
+        
+        if stale_files:
+            self._save_index_cache(file_stamps, file_indexes)
+        
+        # Merge the results into our main index
+        for filename in fasta_files:
+            for seq_id, (start_pos, length, record_bytes) in file_indexes.get(filename, {}).items():
+                self.sequence_index[seq_id] = (filename, start_pos, length, record_bytes)
+                self.sequence_lengths[seq_id] = length
         
         print(f"Indexed {len(self.sequence_index)} sequences from {len(fasta_files)} files "
-              f"in {time.time() - start_time:.2f} seconds")
+              f"({len(fasta_files) - len(stale_files)} from cache) in {time.time() - start_time:.2f} seconds")
+    
+    @staticmethod
+    def _file_stamp(file_path: str) -> Tuple[int, int]:
+        """Modification time and size identifying the version of a file that was indexed."""
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _load_index_cache(self, file_stamps: Dict[str, Tuple[int, int]]) -> Dict[str, Dict[str, Tuple[int, int, int]]]:
+        """
+        Load cached per-file indexes from the data directory.
+        
+        Args:
+            file_stamps (dict): Current (mtime, size) stamp of each FASTA file
+            
+        Returns:
+            dict: Cached index of each file whose stamp still matches
+        """
+        cache_path = os.path.join(self.data_dir, INDEX_CACHE_FILENAME)
+        if not os.path.exists(cache_path):
+            return {}
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                cache = json_loads(f.read())
+            if cache.get('version') != INDEX_CACHE_VERSION:
+                return {}
+            file_indexes = {}
+            for filename, stamp in file_stamps.items():
+                index = cache['indexes'].get(filename)
+                if index is not None and cache['stamps'].get(filename) == list(stamp):
+                    file_indexes[filename] = dict(zip(
+                        index['ids'], zip(index['starts'], index['lengths'], index['record_bytes'])
+                    ))
+            return file_indexes
+        except Exception as e:
+            print(f"Ignoring unreadable FASTA index cache {cache_path}: {e}")
+            return {}
+    
+    def _save_index_cache(self, file_stamps: Dict[str, Tuple[int, int]], file_indexes: Dict[str, Dict[str, Tuple[int, int, int]]]):
+        """
+        Write the per-file indexes next to the FASTA files for the next run.
+        
+        Args:
+            file_stamps (dict): (mtime, size) stamp of each indexed FASTA file
+            file_indexes (dict): Index of each FASTA file
+        """
+        cache_path = os.path.join(self.data_dir, INDEX_CACHE_FILENAME)
+        # Each file's index is stored as columns: sequence IDs and their three offsets
+        cache = {
+            'version': INDEX_CACHE_VERSION,
+            'stamps': {f: list(file_stamps[f]) for f in file_indexes},
+            'indexes': {
+                filename: {
+                    'ids': list(index),
+                    'starts': [entry[0] for entry in index.values()],
+                    'lengths': [entry[1] for entry in index.values()],
+                    'record_bytes': [entry[2] for entry in index.values()]
+                }
+                for filename, index in file_indexes.items()
+            }
+        }
+        
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                f.write(json_dumps(cache))
+        
+        _write_cache_file(cache_path, write, 'FASTA index')
             
     @staticmethod
-    def _index_single_file(file_path: str) -> Dict[str, Tuple[int, int]]:
+    def _index_single_file(file_path: str) -> Dict[str, Tuple[int, int, int]]:
         """
         Index a single FASTA file.
         
@@ -87,60 +655,135 @@ class SequenceCache:
             file_path: Path to the FASTA file
             
         Returns:
-            Dictionary mapping sequence IDs to (start_position, sequence_length)
+            Dictionary mapping sequence IDs to (start_position, sequence_length, record_bytes),
+            where record_bytes is the on-disk size of the sequence lines
         """
         sequences = {}
-        
+
         try:
-            with open(file_path, 'r') as f:
-                current_id = None
-                start_pos = None
-                sequence_length = 0
-                
-                # Scan through the file line by line
-                pos = 0
-                for line in f:
-                    line_length = len(line)
-                    
-                    if line.startswith('>'):
-                        # If we were tracking a sequence, save its info
-                        if current_id is not None and start_pos is not None:
-                            sequences[current_id] = (start_pos, sequence_length)
-                            
-                        # Parse new sequence ID
-                        header_parts = line[1:].split()
-                        current_id = header_parts[0] if header_parts else None
-                        start_pos = pos + line_length  # Start after the header line
-                        sequence_length = 0
-                    elif current_id is not None:
-                        # Add to the current sequence length (only count sequence characters)
-                        sequence_length += len(line.strip())
-                        
-                    pos += line_length
-                    
-                # Add the last sequence if there was one
-                if current_id is not None and start_pos is not None:
-                    sequences[current_id] = (start_pos, sequence_length)
+            with open(file_path, 'rb') as f:
+                # mmap cannot map an empty file
+                if os.fstat(f.fileno()).st_size == 0:
+                    return sequences
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            try:
+                # The whole file is scanned front to back exactly once
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+
+                file_size = len(mm)
+
+                if HAS_NUMBA:
+                    # Compiled byte scanner: locate all records first, then parse IDs
+                    buf = np.frombuffer(mm, dtype=np.uint8)
+                    try:
+                        header_starts, header_ends, sequence_lengths = _scan_fasta_buffer(buf)
+                    finally:
+                        # The array must release the buffer before the map can be closed
+                        del buf
                     
+                    # Each record ends where the next header begins
+                    record_ends = header_starts[1:].tolist() + [file_size]
+                    for header_start, header_end, sequence_length, record_end in zip(
+                        header_starts.tolist(), header_ends.tolist(), sequence_lengths.tolist(), record_ends
+                    ):
+                        header_parts = mm[header_start + 1:header_end].decode('utf-8', errors='ignore').split()
+                        if header_parts:
+                            seq_start = min(header_end + 1, file_size)
+                            sequences[header_parts[0]] = (seq_start, sequence_length, record_end - seq_start)
+                    return sequences
+
+                # Find the first header (records always start at the beginning of a line)
+                if mm[:1] == b'>':
+                    header_start = 0
+                else:
+                    header_start = mm.find(b'\n>')
+                    if header_start != -1:
+                        header_start += 1
+
+                # Walk the file record by record - all scanning is done in C by mmap.find
+                while header_start != -1:
+                    header_end = mm.find(b'\n', header_start)
+                    if header_end == -1:
+                        header_end = file_size
+                    seq_start = min(header_end + 1, file_size)
+
+                    # The record ends where the next header line begins
+                    next_header = mm.find(b'\n>', header_end)
+                    record_end = file_size if next_header == -1 else next_header + 1
+
+                    # Parse sequence ID from the header line
+                    header_parts = mm[header_start + 1:header_end].decode('utf-8', errors='ignore').split()
+                    if header_parts:
+                        # Sequence length is the record size minus the bytes get_sequence strips
+                        sequence_length = (record_end - seq_start) - SequenceCache._count_non_residue_bytes(
+                            mm, seq_start, record_end
+                        )
+                        sequences[header_parts[0]] = (seq_start, sequence_length, record_end - seq_start)
+
+                    header_start = -1 if next_header == -1 else next_header + 1
+            finally:
+                mm.close()
+
         except Exception as e:
             print(f"Error indexing file {file_path}: {e}")
-            
+
         return sequences
+
+    @staticmethod
+    def _count_non_residue_bytes(mm: mmap.mmap, start: int, end: int) -> int:
+        """
+        Count the NON_RESIDUE_BYTES (line breaks, whitespace and control bytes) in a
+        region of a memory-mapped file.
+
+        Large regions are counted in fixed-size chunks so that very long records
+        (e.g. whole chromosomes) never have to be copied out of the map at once.
+        """
+        count = 0
+        for chunk_start in range(start, end, INDEX_CHUNK_SIZE):
+            chunk = mm[chunk_start:min(chunk_start + INDEX_CHUNK_SIZE, end)]
+            count += len(chunk) - len(chunk.translate(None, NON_RESIDUE_BYTES))
+        return count
     
-    def _ensure_file_mapped(self, filename: str):
-        """Ensure the specified file is memory-mapped."""
-        if filename not in self.mmapped_files:
+    def _ensure_file_mapped(self, filename: str) -> Optional[mmap.mmap]:
+        """
+        Ensure the specified file is memory-mapped, unmapping the least recently used
+        file when the limit on open maps is reached.
+        
+        Args:
+            filename: Name of the FASTA file in the data directory
+            
+        Returns:
+            The memory map, or None if the file could not be mapped
+        """
+        with self._mmap_lock:
+            mm = self.mmapped_files.get(filename)
+            if mm is not None:
+                self.mmapped_files.move_to_end(filename)
+                return mm
+            
             try:
                 filepath = os.path.join(self.data_dir, filename)
-                with open(filepath, 'r+b') as f:
-                    # Memory map the file for efficient random access
-                    self.mmapped_files[filename] = mmap.mmap(
-                        f.fileno(), 0, access=mmap.ACCESS_READ
-                    )
+                with open(filepath, 'rb') as f:
+                    # Memory map the file read-only for efficient random access
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                
+                # Single-sequence lookups jump around the file, so kernel readahead
+                # is wasted; batch fetches request the pages they need explicitly
+                if hasattr(mmap, 'MADV_RANDOM'):
+                    mm.madvise(mmap.MADV_RANDOM)
             except Exception as e:
                 print(f"Error memory-mapping file {filename}: {e}")
-                return False
-        return True
+                return None
+            
+            # Bound address space and page tables by unmapping rarely used files
+            while len(self.mmapped_files) >= self.max_mapped_files:
+                _, evicted = self.mmapped_files.popitem(last=False)
+                evicted.close()
+            
+            self.mmapped_files[filename] = mm
+            return mm
     
     def get_sequence(self, sequence_id: str) -> str:
         """
@@ -155,41 +798,53 @@ class SequenceCache:
         if sequence_id not in self.sequence_index:
             return ""
             
-        filename, start_pos, length = self.sequence_index[sequence_id]
+        filename, start_pos, length, record_bytes = self.sequence_index[sequence_id]
         
         # Ensure the file is memory-mapped
-        if not self._ensure_file_mapped(filename):
+        mm = self._ensure_file_mapped(filename)
+        if mm is None:
             return ""
             
         try:
-            # Read from the memory-mapped file
-            mm = self.mmapped_files[filename]
-            
-            # Position at the start of the sequence data
-            mm.seek(start_pos)
-            
-            # Read bytes that should contain the sequence (plus some extra for newlines)
-            # We read more than needed to account for newlines that we'll filter out
-            read_length = length + (length // 60) + 10  # Approximate extra space for newlines
-            data = mm.read(read_length)
-            
-            # Convert bytes to string and clean up
-            sequence_text = data.decode('utf-8', errors='ignore')
-            
-            # Extract sequence content (remove newlines)
-            sequence = ''.join(line.strip() for line in sequence_text.split('\n'))
-            
+            # Slice exactly the record's sequence lines.
+            # Slicing leaves the map's shared file position untouched, so concurrent callers are safe
+            data = mm[start_pos:start_pos + record_bytes]
+
+            # Remove line breaks from the record bytes
+            sequence = self._strip_whitespace(data)
+
             # Truncate to the expected length and remove any stop codon
             sequence = sequence[:length]
-            if sequence.endswith('*'):
+            if sequence.endswith(b'*'):
                 sequence = sequence[:-1]
-                
-            return sequence
+
+            return sequence.decode('ascii', errors='ignore')
             
         except Exception as e:
             print(f"Error retrieving sequence {sequence_id}: {e}")
             return ""
     
+    @staticmethod
+    def _strip_whitespace(data: bytes) -> bytes:
+        """
+        Remove line breaks and other whitespace from raw FASTA record bytes.
+        
+        Short records use bytes.translate; long ones use a NumPy mask, whose
+        vectorized comparison is faster once records reach tens of kilobytes.
+        Both drop exactly NON_RESIDUE_BYTES (every byte at or below space).
+        
+        Args:
+            data: Raw bytes of a sequence record
+            
+        Returns:
+            The residue bytes only
+        """
+        if len(data) < NUMPY_STRIP_THRESHOLD:
+            return data.translate(None, NON_RESIDUE_BYTES)
+        
+        residues = np.frombuffer(data, dtype=np.uint8)
+        return residues[residues > 32].tobytes()
+    
     def get_sequence_length(self, sequence_id: str) -> int:
         """Get the length of a sequence without loading the full sequence."""
         return self.sequence_lengths.get(sequence_id, 0)
@@ -210,26 +865,288 @@ class SequenceCache:
         sequences_by_file = defaultdict(list)
         for seq_id in sequence_ids:
             if seq_id in self.sequence_index:
-                filename, _, _ = self.sequence_index[seq_id]
+                filename = self.sequence_index[seq_id][0]
                 sequences_by_file[filename].append(seq_id)
         
         # Process each file
         for filename, file_sequences in sequences_by_file.items():
             # Ensure the file is memory-mapped
-            if not self._ensure_file_mapped(filename):
+            mm = self._ensure_file_mapped(filename)
+            if mm is None:
                 continue
-                
-            # Get all sequences from this file
-            for seq_id in file_sequences:
-                result[seq_id] = self.get_sequence(seq_id)
-                
+
+            # Walk the file once in ascending offset order instead of seeking randomly
+            file_sequences.sort(key=lambda seq_id: self.sequence_index[seq_id][1])
+
+            # (seq_id, start_pos, length, record_bytes) for every sequence in this file
+            reads = [(seq_id,) + self.sequence_index[seq_id][1:] for seq_id in file_sequences]
+
+            # Put the reads for the whole batch in flight before touching any of them
+            if len(reads) > 1:
+                self._prefetch_ranges(mm, [(start_pos, start_pos + record_bytes)
+                                           for _, start_pos, _, record_bytes in reads])
+
+            for seq_id, start_pos, length, record_bytes in reads:
+                try:
+                    data = mm[start_pos:start_pos + record_bytes]
+
+                    # Strip line breaks in C, then truncate and remove any stop codon
+                    sequence = self._strip_whitespace(data)[:length]
+                    if sequence.endswith(b'*'):
+                        sequence = sequence[:-1]
+
+                    result[seq_id] = sequence.decode('ascii', errors='ignore')
+                except Exception as e:
+                    print(f"Error retrieving sequence {seq_id}: {e}")
+                    result[seq_id] = ""
+
         return result
     
+    @staticmethod
+    def _prefetch_ranges(mm: mmap.mmap, ranges: List[Tuple[int, int]]):
+        """
+        Ask the kernel to start reading several byte ranges of a mapping at once.
+        
+        MADV_WILLNEED schedules asynchronous readahead, so on a cold page cache
+        the reads for a whole batch are queued together instead of being faulted
+        in one page at a time. Ranges must be sorted; neighbouring ranges are
+        coalesced to keep the number of syscalls small.
+        
+        Args:
+            mm: The memory-mapped file
+            ranges: Sorted list of (start, end) byte offsets
+        """
+        if not hasattr(mmap, 'MADV_WILLNEED'):
+            return
+            
+        page_size = mmap.PAGESIZE
+        file_size = len(mm)
+        merged = []
+        for start, end in ranges:
+            # madvise offsets must be page aligned
+            start -= start % page_size
+            end = min(end, file_size)
+            if merged and start <= merged[-1][1] + page_size:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        
+        try:
+            for start, end in merged:
+                if end > start:
+                    mm.madvise(mmap.MADV_WILLNEED, start, end - start)
+        except OSError as e:
+            print(f"Error prefetching sequence data: {e}")
+    
     def close(self):
         """Close all memory-mapped files."""
-        for mm in self.mmapped_files.values():
-            mm.close()
-        self.mmapped_files.clear()
+        with self._mmap_lock:
+            for mm in self.mmapped_files.values():
+                mm.close()
+            self.mmapped_files.clear()
+
+@dataclass(slots=True)
+class Domain:
+    """A single HMM domain hit on a sequence."""
+    hmm_name: str
+    bitscore: float
+    e_value: float
+    start: int
+    end: int
+
+@dataclass(slots=True)
+class SequenceDetail:
+    """Everything the sequence detail page shows about one sequence."""
+    sequence_id: str
+    basic_info: dict
+    pfam_domains: list
+    kofam_domains: list
+    pfam_metagenome_domains: list
+    kofam_metagenome_domains: list
+    binding_data: list  # One dict per merged_data row of the sequence
+    sequence: str  # Empty if the sequence is not in the FASTA files
+    binding_positions: list  # Binding coverage histogram: {'position', 'count'} dicts
+    raw_data: dict  # The sequence's first merged_data row
+    
+    def to_dict(self):
+        """Return the fields as a dict (shallow; the values are shared)."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+class DomainMap(Mapping):
+    """
+    Read-only mapping of sequence IDs to their HMM domain hits, stored column-wise.
+    
+    Hits are kept as one contiguous NumPy array per field (struct-of-arrays),
+    grouped by sequence, instead of one Python object per hit. Looking up a
+    sequence returns a list of Domain records, built on demand from that
+    sequence's slice of the arrays.
+    
+    Positions are stored as int32. Bitscores and e-values stay float64: bitscores
+    are shown as parsed (float32 would print 227.3 as 227.3000030517578), and
+    HMMER routinely reports e-values far below float32's range.
+    Domain names are interned: each hit stores an int32 code into name_table,
+    so aggregations can count codes instead of hashing name strings. The name
+    and sequence ID strings themselves go through sys.intern, so maps built
+    from different files share one object per distinct string and lookups
+    across maps compare by identity.
+    """
+    
+    FIELDS = ('hmm_name', 'bitscore', 'e_value', 'start', 'end')
+    
+    def __init__(self, seq_ids=None, hmm_names=None, bitscores=None, e_values=None, starts=None, ends=None):
+        """
+        Build the mapping from per-hit column arrays.
+        
+        Args:
+            seq_ids (array-like): Sequence ID of each hit
+            hmm_names (array-like): Domain name of each hit
+            bitscores (array-like): Bitscore of each hit
+            e_values (array-like): E-value of each hit
+            starts (array-like): Domain start position of each hit
+            ends (array-like): Domain end position of each hit
+        """
+        # seq_id -> (first_row, stop_row) into the column arrays
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._postings = None  # Inverted index, built by postings() on first use
+        
+        if seq_ids is None or len(seq_ids) == 0:
+            self.name_table = np.empty(0, dtype=object)
+            self.name_codes = np.empty(0, dtype=np.int32)
+            self.bitscores = np.empty(0, dtype=np.float64)
+            self.e_values = np.empty(0, dtype=np.float64)
+            self.starts = np.empty(0, dtype=np.int32)
+            self.ends = np.empty(0, dtype=np.int32)
+            return
+        
+        # Group hits by sequence (in order of first appearance), keeping the original hit order
+        codes, unique_ids = pd.factorize(np.asarray(seq_ids, dtype=object), sort=False)
+        order = np.argsort(codes, kind='stable')
+        
+        name_codes, name_table = pd.factorize(np.asarray(hmm_names, dtype=object), sort=False)
+        self.name_table = np.array([sys.intern(str(name)) for name in name_table], dtype=object)
+        self.name_codes = name_codes.astype(np.int32)[order]
+        self.bitscores = np.asarray(bitscores, dtype=np.float64)[order]
+        self.e_values = np.asarray(e_values, dtype=np.float64)[order]
+        self.starts = np.asarray(starts, dtype=np.int32)[order]
+        self.ends = np.asarray(ends, dtype=np.int32)[order]
+        
+        stops = np.cumsum(np.bincount(codes, minlength=len(unique_ids)))
+        firsts = stops - np.bincount(codes, minlength=len(unique_ids))
+        self._offsets = dict(zip(map(sys.intern, map(str, unique_ids.tolist())), zip(firsts.tolist(), stops.tolist())))
+    
+    def add_empty(self, seq_ids):
+        """Register sequences that have no domain hits so they appear as keys with empty lists."""
+        for seq_id in seq_ids:
+            self._offsets.setdefault(sys.intern(seq_id), (0, 0))
+    
+    def row_range(self, seq_id):
+        """(first, stop) rows of a sequence's hits in the column arrays ((0, 0) if unknown)."""
+        return self._offsets.get(seq_id, (0, 0))
+    
+    def domain_count(self, seq_id):
+        """Number of domain hits for a sequence (0 if unknown)."""
+        first, stop = self._offsets.get(seq_id, (0, 0))
+        return stop - first
+    
+    @property
+    def hmm_names(self):
+        """Domain name of every hit, expanded from the interned codes."""
+        return self.name_table[self.name_codes]
+    
+    def domain_names(self, seq_id):
+        """List of domain names for a sequence without building the full records."""
+        first, stop = self._offsets.get(seq_id, (0, 0))
+        return self.name_table[self.name_codes[first:stop]].tolist()
+    
+    def hit_rows(self, seq_ids):
+        """
+        Rows of all hits of a list of sequences, in sequence order and hit order.
+        
+        Args:
+            seq_ids (list): Sequence IDs (unknown IDs have no rows)
+            
+        Returns:
+            tuple: (rows, owners) int arrays; owners[i] is the position in seq_ids of row i's sequence
+        """
+        bounds = np.array([self._offsets.get(seq_id, (0, 0)) for seq_id in seq_ids], dtype=np.int64).reshape(-1, 2)
+        lengths = bounds[:, 1] - bounds[:, 0]
+        owners = np.repeat(np.arange(len(lengths)), lengths)
+        # Each row is its sequence's first row plus its offset within that sequence
+        row_offsets = np.arange(len(owners)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return bounds[owners, 0] + row_offsets, owners
+    
+    def postings(self):
+        """
+        Inverted index of the hits, built once and then reused.
+        
+        Returns:
+            dict: Domain name -> list of the sequence IDs with a hit of that domain
+        """
+        if self._postings is None:
+            seq_ids = [seq_id for seq_id, (first, stop) in self._offsets.items() if stop > first]
+            rows, owners = self.hit_rows(seq_ids)
+            # Distinct (domain, sequence) pairs, sorted by domain and then sequence order
+            pairs = np.unique(self.name_codes[rows].astype(np.int64) * max(len(seq_ids), 1) + owners)
+            pair_codes, pair_owners = np.divmod(pairs, max(len(seq_ids), 1))
+            codes, starts = np.unique(pair_codes, return_index=True)
+            seq_id_array = np.array(seq_ids, dtype=object)
+            self._postings = {
+                name: owner_group.tolist()
+                for name, owner_group in zip(
+                    self.name_table[codes].tolist(),
+                    np.split(seq_id_array[pair_owners], starts[1:])
+                )
+            }
+        return self._postings
+    
+    def name_counts(self, seq_ids):
+        """
+        Count domain hits by name over a set of sequences.
+        
+        Args:
+            seq_ids (iterable): Sequence IDs to count (unknown IDs are skipped)
+            
+        Returns:
+            dict: Domain name -> number of hits, in order of first appearance
+        """
+        code_slices = [
+            self.name_codes[first:stop]
+            for first, stop in map(self.row_range, seq_ids)
+            if stop > first
+        ]
+        if not code_slices:
+            return {}
+        codes, unique_codes = pd.factorize(np.concatenate(code_slices), sort=False)
+        return dict(zip(self.name_table[unique_codes].tolist(), np.bincount(codes).tolist()))
+    
+    def __getitem__(self, seq_id):
+        first, stop = self._offsets[seq_id]
+        if first == stop:
+            return []
+        
+        return list(map(
+            Domain,
+            self.name_table[self.name_codes[first:stop]].tolist(), self.bitscores[first:stop].tolist(),
+            self.e_values[first:stop].tolist(), self.starts[first:stop].tolist(),
+            self.ends[first:stop].tolist()
+        ))
+    
+    def get(self, seq_id, default=None):
+        if seq_id not in self._offsets:
+            return default
+        return self[seq_id]
+    
+    def __contains__(self, seq_id):
+        return seq_id in self._offsets
+    
+    def __iter__(self):
+        return iter(self._offsets)
+    
+    def __len__(self):
+        return len(self._offsets)
+    
+    def keys(self):
+        return self._offsets.keys()
 
 class MimicDataProcessor:
     """
@@ -254,10 +1171,42 @@ class MimicDataProcessor:
         self.kofam_metagenome_data = None
         self.metagenome_sequence_lengths = {}  # Dictionary to store sequence lengths
         self.merged_data = None
+        self._input_files = []  # Table files read by load_data(), part of the merged cache key
+        self._merged_version = 0  # Bumped whenever merged_data is rebuilt
+        self._summary_cache = None  # ((id(merged_data), version), summary)
+        self._merged_genes_cache = None  # ((id(merged_data), version), pd.Index of unique genes)
+        self._domain_freqs_cache = None  # ((id(merged_data), version), frequencies)
+        self._enrichment_cache = None  # ((id(merged_data), version), enrichment data)
+        self._related_cache = OrderedDict()  # (id(merged_data), version, sequence_id, limit) -> related
+        self._related_cache_lock = threading.Lock()
+        self._filter_cache = OrderedDict()  # (id(merged_data), version, filters JSON, sort) -> rows
+        self._filter_cache_lock = threading.Lock()
+        self._column_views = None  # ((id(merged_data), version), {(kind, column): per-row array})
+        self._sequence_details = None  # ((id(merged_data), version), {sequence_id: sequence data})
+        self._sequence_details_lock = threading.Lock()
+        self._intersection_cache = OrderedDict()  # (id(merged_data), version, *filters) -> result
+        self._intersection_cache_lock = threading.Lock()
+        self._intersection_pool = None  # Worker processes reused across intersection analyses
+        self._intersection_pool_size = 0
+        self._intersection_pool_lock = threading.Lock()
         
         # Create a sequence cache for efficient FASTA file access
         print("Initializing sequence cache...")
         self.sequence_cache = SequenceCache(data_dir)
+    
+    def close(self):
+        """Shut down the intersection worker processes and close the sequence cache."""
+        with self._intersection_pool_lock:
+            if self._intersection_pool is not None:
+                self._intersection_pool.shutdown()
+                self._intersection_pool = None
+        self.sequence_cache.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
         
     def load_data(self):
         """Load all data files from the specified directory."""
@@ -289,48 +1238,29 @@ class MimicDataProcessor:
             'mimic_Score_EL', 'mimic_%Rank_EL', 'mimic_Aff(nM)', 'mimic_BindLevel'
         ]
         
-        # Find which essential columns exist in the file
-        usecols = [col for col in essential_columns if col in header]
+        # Find which essential columns exist in the file (kept in file order)
+        usecols = [col for col in header if col in essential_columns]
         
         # Load only essential columns and with optimized performance settings
-        self.binders_data = pd.read_csv(
+        self.binders_data = self._read_table(
             binders_path,
             usecols=usecols,
-            low_memory=False,  # Prevents mixed type warnings
-            dtype={
-                'mimic_gene': str,
-                'MHC': str,
-                'cancer_acc': str,
-                'cancer_DB': str,
-                'mimic_Peptide': str,
-                'mimic_BindLevel': str
-            }
+            string_columns=[
+                'mimic_gene', 'MHC', 'cancer_acc', 'cancer_DB',
+                'mimic_Peptide', 'mimic_BindLevel'
+            ]
         )
         
         # Load PFAM better binders hits
         pfam_binders_path = os.path.join(self.data_dir, f"{self.sample_id}_PFAM_better_binders.tsv")
         if os.path.exists(pfam_binders_path):
-            self.pfam_binders_data = pd.read_csv(
-                pfam_binders_path, 
-                sep='\t',
-                dtype={
-                    'sequence_id': str,
-                    'hmm_name': str
-                }
-            )
+            self.pfam_binders_data = self._read_table(pfam_binders_path, sep='\t', string_columns=HMM_STRING_COLUMNS)
             print(f"PFAM better binders hits: {len(self.pfam_binders_data)} rows")
         else:
             # Try the older naming convention as fallback
             pfam_binders_path = os.path.join(self.data_dir, f"{self.sample_id}_PFAM_hits.tsv")
             if os.path.exists(pfam_binders_path):
-                self.pfam_binders_data = pd.read_csv(
-                    pfam_binders_path, 
-                    sep='\t',
-                    dtype={
-                        'sequence_id': str,
-                        'hmm_name': str
-                    }
-                )
+                self.pfam_binders_data = self._read_table(pfam_binders_path, sep='\t', string_columns=HMM_STRING_COLUMNS)
                 print(f"PFAM hits (legacy format): {len(self.pfam_binders_data)} rows")
             else:
                 print(f"WARNING: No PFAM better binders file found for {self.sample_id}")
@@ -339,27 +1269,13 @@ class MimicDataProcessor:
         # Load KOFAM better binders hits
         kofam_binders_path = os.path.join(self.data_dir, f"{self.sample_id}_KOFAM_better_binders.tsv")
         if os.path.exists(kofam_binders_path):
-            self.kofam_binders_data = pd.read_csv(
-                kofam_binders_path, 
-                sep='\t',
-                dtype={
-                    'sequence_id': str,
-                    'hmm_name': str
-                }
-            )
+            self.kofam_binders_data = self._read_table(kofam_binders_path, sep='\t', string_columns=HMM_STRING_COLUMNS)
             print(f"KOFAM better binders hits: {len(self.kofam_binders_data)} rows")
         else:
             # Try the older naming convention as fallback
             kofam_binders_path = os.path.join(self.data_dir, f"{self.sample_id}_KOFAM_hits.tsv")
             if os.path.exists(kofam_binders_path):
-                self.kofam_binders_data = pd.read_csv(
-                    kofam_binders_path, 
-                    sep='\t',
-                    dtype={
-                        'sequence_id': str,
-                        'hmm_name': str
-                    }
-                )
+                self.kofam_binders_data = self._read_table(kofam_binders_path, sep='\t', string_columns=HMM_STRING_COLUMNS)
                 print(f"KOFAM hits (legacy format): {len(self.kofam_binders_data)} rows")
             else:
                 print(f"WARNING: No KOFAM better binders file found for {self.sample_id}")
@@ -368,14 +1284,7 @@ class MimicDataProcessor:
         # Load PFAM metagenome hits (optional)
         pfam_metagenome_path = os.path.join(self.data_dir, f"{self.sample_id}_PFAM_metagenome.tsv")
         if os.path.exists(pfam_metagenome_path):
-            self.pfam_metagenome_data = pd.read_csv(
-                pfam_metagenome_path, 
-                sep='\t',
-                dtype={
-                    'sequence_id': str,
-                    'hmm_name': str
-                }
-            )
+            self.pfam_metagenome_data = self._read_table(pfam_metagenome_path, sep='\t', string_columns=HMM_STRING_COLUMNS)
             print(f"PFAM metagenome hits: {len(self.pfam_metagenome_data)} rows")
         else:
             print(f"INFO: No PFAM metagenome file found for {self.sample_id}")
@@ -384,14 +1293,7 @@ class MimicDataProcessor:
         # Load KOFAM metagenome hits (optional)
         kofam_metagenome_path = os.path.join(self.data_dir, f"{self.sample_id}_KOFAM_metagenome.tsv")
         if os.path.exists(kofam_metagenome_path):
-            self.kofam_metagenome_data = pd.read_csv(
-                kofam_metagenome_path, 
-                sep='\t',
-                dtype={
-                    'sequence_id': str,
-                    'hmm_name': str
-                }
-            )
+            self.kofam_metagenome_data = self._read_table(kofam_metagenome_path, sep='\t', string_columns=HMM_STRING_COLUMNS)
             print(f"KOFAM metagenome hits: {len(self.kofam_metagenome_data)} rows")
         else:
             print(f"INFO: No KOFAM metagenome file found for {self.sample_id}")
@@ -402,126 +1304,176 @@ class MimicDataProcessor:
         
         return self
     
+    def _read_table(self, path, sep=',', string_columns=(), usecols=None):
+        """
+        Read a delimited text file into a pandas DataFrame.
+        
+        Uses polars' multi-threaded lazy CSV scanner when available and falls
+        back to pandas otherwise (or if polars cannot parse the file). String
+        columns are Arrow-backed when pyarrow is installed.
+        
+        Args:
+            path (str): Path to the file
+            sep (str): Field separator
+            string_columns (iterable): Columns that must be read as strings
+            usecols (list, optional): Subset of columns to load
+            
+        Returns:
+            DataFrame: The loaded data
+        """
+        self._input_files.append(path)
+        
+        if HAS_POLARS:
+            try:
+                lazy_frame = pl.scan_csv(
+                    path,
+                    separator=sep,
+                    schema_overrides={col: pl.Utf8 for col in string_columns},
+                    null_values=CSV_NA_VALUES,
+                    infer_schema_length=10000
+                )
+                if usecols is not None:
+                    lazy_frame = lazy_frame.select(usecols)
+                
+                # pandas marks missing strings with NaN rather than None
+                data = lazy_frame.collect().to_pandas().fillna(np.nan)
+            except Exception as e:
+                print(f"Polars could not read {path}, falling back to pandas: {e}")
+                data = None
+        else:
+            data = None
+        
+        if data is None:
+            data = pd.read_csv(
+                path,
+                sep=sep,
+                usecols=usecols,
+                low_memory=False,  # Prevents mixed type warnings
+                dtype={col: str for col in string_columns}
+            )
+        
+        # Store string columns in Arrow buffers when pyarrow is available
+        if ARROW_STRING_DTYPE is not None:
+            arrow_columns = {col: ARROW_STRING_DTYPE for col in string_columns if col in data.columns}
+            if arrow_columns:
+                data = data.astype(arrow_columns)
+        
+        return data
+    
     def process_hmm_hits(self):
         """Process HMM hits to create mappings from sequence to domains."""
         # Process PFAM better binders hits
-        pfam_map = defaultdict(list)
-        self._process_hmm_data(self.pfam_binders_data, pfam_map, "PFAM better binders")
+        pfam_map = self._process_hmm_data(self.pfam_binders_data, "PFAM better binders")
         
         # Process KOFAM better binders hits
-        kofam_map = defaultdict(list)
-        self._process_hmm_data(self.kofam_binders_data, kofam_map, "KOFAM better binders")
+        kofam_map = self._process_hmm_data(self.kofam_binders_data, "KOFAM better binders")
         
         # Process PFAM metagenome hits (if they exist)
-        pfam_metagenome_map = defaultdict(list)
-        if self.pfam_metagenome_data is not None and len(self.pfam_metagenome_data) > 0:
-            self._process_hmm_data(self.pfam_metagenome_data, pfam_metagenome_map, "PFAM metagenome")
+        pfam_metagenome_map = self._process_hmm_data(self.pfam_metagenome_data, "PFAM metagenome")
         
         # Process KOFAM metagenome hits (if they exist)
-        kofam_metagenome_map = defaultdict(list)
-        if self.kofam_metagenome_data is not None and len(self.kofam_metagenome_data) > 0:
-            self._process_hmm_data(self.kofam_metagenome_data, kofam_metagenome_map, "KOFAM metagenome")
+        kofam_metagenome_map = self._process_hmm_data(self.kofam_metagenome_data, "KOFAM metagenome")
         
         # Check for any mimic_gene IDs in the binders data that don't have domain entries
         # and explicitly add empty lists for them to prevent potential lookup issues
         if self.binders_data is not None:
-            for gene_id in self.binders_data['mimic_gene'].unique():
-                str_gene_id = str(gene_id)
-                if str_gene_id not in pfam_map:
-                    pfam_map[str_gene_id] = []
-                if str_gene_id not in kofam_map:
-                    kofam_map[str_gene_id] = []
-                if str_gene_id not in pfam_metagenome_map:
-                    pfam_metagenome_map[str_gene_id] = []
-                if str_gene_id not in kofam_metagenome_map:
-                    kofam_metagenome_map[str_gene_id] = []
+            gene_ids = [str(gene_id) for gene_id in self.binders_data['mimic_gene'].unique()]
+            for domain_map in (pfam_map, kofam_map, pfam_metagenome_map, kofam_metagenome_map):
+                domain_map.add_empty(gene_ids)
                 
         self.pfam_map = pfam_map
         self.kofam_map = kofam_map
         self.pfam_metagenome_map = pfam_metagenome_map
         self.kofam_metagenome_map = kofam_metagenome_map
+        self._invalidate_domain_caches()
         
         return self
-        
-    def _process_hmm_data(self, hmm_data, domain_map, data_type):
+    
+    @property
+    def data_version(self):
+        """Identify the current merged table; changes whenever merge_data() runs (or merged_data is replaced)."""
+        return (id(self.merged_data), self._merged_version)
+    
+    def _invalidate_domain_caches(self):
+        """Drop the cached results derived from the domain maps (call whenever the maps change)."""
+        self._domain_freqs_cache = None
+        self._enrichment_cache = None
+        with self._related_cache_lock:
+            self._related_cache.clear()
+    
+    def clear_caches(self):
+        """Drop all cached analysis results; they are recomputed on the next request."""
+        self._summary_cache = None
+        self._invalidate_domain_caches()
+        with self._filter_cache_lock:
+            self._filter_cache.clear()
+            self._column_views = None
+        with self._intersection_cache_lock:
+            self._intersection_cache.clear()
+        with self._sequence_details_lock:
+            self._sequence_details = None
+        
+    def _process_hmm_data(self, hmm_data, data_type):
         """
         Helper function to process HMM data and build domain mappings.
         
         Args:
             hmm_data (DataFrame): The HMM data to process
-            domain_map (defaultdict): The map to populate
             data_type (str): Description of the data type for error messages
+            
+        Returns:
+            DomainMap: Mapping of sequence IDs to their domain hits
         """
         if hmm_data is None or len(hmm_data) == 0:
             print(f"No {data_type} data to process")
-            return
+            return DomainMap()
         
         # Create a dictionary to track sequence lengths if this is metagenome data
         sequence_end_positions = {}
         is_metagenome = 'metagenome' in data_type.lower()
-            
-        for _, row in hmm_data.iterrows():
-            try:
-                seq_id = str(row['sequence_id'])
-                hmm_name = str(row['hmm_name'])
-                
-                # Ensure numeric values are valid
-                try:
-                    bitscore = float(row['bitscore'])
-                    if math.isnan(bitscore) or math.isinf(bitscore):
-                        bitscore = 0.0
-                except:
-                    bitscore = 0.0
-                    
-                try:
-                    e_value = float(row['evalue'])
-                    if math.isnan(e_value) or math.isinf(e_value):
-                        e_value = 1.0
-                except:
-                    e_value = 1.0
-                    
-                try:
-                    env_from = int(row['env_from'])
-                    if math.isnan(env_from):
-                        env_from = 1
-                except:
-                    env_from = 1
-                    
-                try:
-                    env_to = int(row['env_to'])
-                    if math.isnan(env_to):
-                        env_to = 1
-                except:
-                    env_to = 1
-                
-                # If this is metagenome data, track the maximum end position for each sequence
-                if is_metagenome:
-                    if seq_id not in sequence_end_positions or env_to > sequence_end_positions[seq_id]:
-                        sequence_end_positions[seq_id] = env_to
-                
-                domain_map[seq_id].append({
-                    'hmm_name': hmm_name,
-                    'bitscore': bitscore,
-                    'e_value': e_value,
-                    'start': env_from,
-                    'end': env_to
-                })
-            except Exception as e:
-                print(f"Error processing {data_type} hit: {e}")
-                continue
-        
-        # Ensure all values in maps are lists, not floats or other types
-        for seq_id in list(domain_map.keys()):
-            if not isinstance(domain_map[seq_id], list):
-                print(f"Warning: {data_type} mapping for {seq_id} is not a list: {type(domain_map[seq_id])}. Fixing...")
-                domain_map[seq_id] = []
+
+        def numeric_column(column, default):
+            # Coerce a whole column at once; unparseable, NaN and infinite values get the default
+            if column not in hmm_data.columns:
+                return pd.Series(default, index=hmm_data.index)
+            values = pd.to_numeric(hmm_data[column], errors='coerce')
+            return values.replace([np.inf, -np.inf], np.nan).fillna(default)
+
+        try:
+            seq_ids = hmm_data['sequence_id'].astype(str)
+            hmm_names = hmm_data['hmm_name'].astype(str)
+            # Narrow dtypes halve the memory of the position columns; scores keep float64 so
+            # they are reported exactly as parsed (and e-values need float64's range)
+            bitscores = numeric_column('bitscore', 0.0).astype(np.float64)
+            e_values = numeric_column('evalue', 1.0).astype(np.float64)
+            env_froms = numeric_column('env_from', 1).astype(np.int32)
+            env_tos = numeric_column('env_to', 1).astype(np.int32)
+        except Exception as e:
+            print(f"Error processing {data_type} hits: {e}")
+            return DomainMap()
+
+        # If this is metagenome data, track the maximum end position for each sequence
+        if is_metagenome:
+            sequence_end_positions = env_tos.groupby(seq_ids.values, sort=False).max()
+
+        # Store the hits column-wise, grouped by sequence
+        domain_map = DomainMap(
+            seq_ids.values, hmm_names.values, bitscores.values,
+            e_values.values, env_froms.values, env_tos.values
+        )
         
         # If this is metagenome data, update the sequence lengths dictionary
-        if is_metagenome and sequence_end_positions:
-            # Update our global dictionary of sequence lengths
-            for seq_id, end_pos in sequence_end_positions.items():
-                if seq_id not in self.metagenome_sequence_lengths or end_pos > self.metagenome_sequence_lengths[seq_id]:
-                    self.metagenome_sequence_lengths[seq_id] = end_pos
+        if is_metagenome and len(sequence_end_positions) > 0:
+            # Probe the known lengths for all sequences in one batch (unknown ones never win),
+            # then update our global dictionary only where the end position is longer
+            known_lengths = np.fromiter(
+                (self.metagenome_sequence_lengths.get(seq_id, -np.inf) for seq_id in sequence_end_positions.index),
+                dtype=np.float64, count=len(sequence_end_positions)
+            )
+            longer = sequence_end_positions[sequence_end_positions.to_numpy() > known_lengths]
+            self.metagenome_sequence_lengths.update(longer.to_dict())
+        
+        return domain_map
     
     def merge_data(self):
         """Merge binders data with HMM annotations."""
@@ -531,93 +1483,196 @@ class MimicDataProcessor:
         if not hasattr(self, 'pfam_map') or not hasattr(self, 'kofam_map'):
             self.process_hmm_hits()
         
-        # Create a copy of the binders data
-        self.merged_data = self.binders_data.copy()
+        # Reuse the merged table from the last run if none of the inputs changed
+        cache_key = self._merged_cache_key()
+        merged_data = self._load_merged_cache(cache_key)
+        if merged_data is None:
+            merged_data = self._build_merged_data()
+            self._save_merged_cache(cache_key, merged_data)
         
-        # Define a safe JSON conversion function
-        def safe_json(obj):
-            try:
-                return json.dumps(obj)
-            except:
-                return '[]'
+        self.merged_data = merged_data
+        self._merged_version += 1
+        self.clear_caches()
         
-        # Add PFAM and KOFAM better binders domains with safer handling
-        self.merged_data['PFAM_domains'] = self.merged_data['mimic_gene'].apply(
-            lambda x: safe_json(self.pfam_map.get(str(x), []))
-        )
+        # Print sequence length statistics
+        if 'origin_seq_length' in self.merged_data.columns:
+            non_zero_lengths = self.merged_data[self.merged_data['origin_seq_length'] > 0]['origin_seq_length']
+            if len(non_zero_lengths) > 0:
+                print(f"Sequence length stats: min={non_zero_lengths.min()}, max={non_zero_lengths.max()}, avg={non_zero_lengths.mean():.1f}")
+                print(f"Sequences with length data: {len(non_zero_lengths)} out of {len(self.merged_data)} ({len(non_zero_lengths) / len(self.merged_data) * 100:.1f}%)")
+            else:
+                print("No sequence length data available.")
         
-        self.merged_data['KOFAM_domains'] = self.merged_data['mimic_gene'].apply(
-            lambda x: safe_json(self.kofam_map.get(str(x), []))
-        )
+        print(f"Merged data created with {len(self.merged_data)} rows")
+        
+        return self
+    
+    def _build_merged_data(self):
+        """
+        Join the per-gene domain columns and sequence lengths onto the binders data.
+        
+        Returns:
+            DataFrame: One row per binding record with its gene's annotations
+        """
+        # Domain records only hold str/float/int fields, so serialization cannot fail.
+        # orjson is several times faster and serializes Domain dataclasses natively
+        if HAS_ORJSON:
+            def to_json(domains):
+                return orjson.dumps(domains).decode('utf-8')
+        else:
+            to_json = functools.partial(json.dumps, default=asdict)
+        
+        # (JSON column, count column, names column, domain map) for each annotation source
+        domain_columns = [
+            ('PFAM_domains', 'PFAM_domain_count', 'PFAM_domain_names', self.pfam_map),
+            ('KOFAM_domains', 'KOFAM_domain_count', 'KOFAM_domain_names', self.kofam_map)
+        ]
         
         # Add metagenome domains if they exist
         if hasattr(self, 'pfam_metagenome_map'):
-            self.merged_data['PFAM_metagenome_domains'] = self.merged_data['mimic_gene'].apply(
-                lambda x: safe_json(self.pfam_metagenome_map.get(str(x), []))
-            )
+            domain_columns.append(('PFAM_metagenome_domains', 'PFAM_metagenome_count',
+                                   'PFAM_metagenome_names', self.pfam_metagenome_map))
         
         if hasattr(self, 'kofam_metagenome_map'):
-            self.merged_data['KOFAM_metagenome_domains'] = self.merged_data['mimic_gene'].apply(
-                lambda x: safe_json(self.kofam_metagenome_map.get(str(x), []))
-            )
-        
-        # Add column for domain count
-        self.merged_data['PFAM_domain_count'] = self.merged_data['mimic_gene'].apply(
-            lambda x: len(self.pfam_map.get(str(x), []))
-        )
+            domain_columns.append(('KOFAM_metagenome_domains', 'KOFAM_metagenome_count',
+                                   'KOFAM_metagenome_names', self.kofam_metagenome_map))
+        
+        # Build the domain columns once per unique gene instead of once per row -
+        # binders files contain many rows (peptides/alleles) for each gene
+        unique_genes = self.binders_data['mimic_gene'].unique()
+        per_gene = {'mimic_gene': unique_genes}
+        
+        gene_keys = [str(gene) for gene in unique_genes]
+        
+        for json_column, count_column, names_column, domain_map in domain_columns:
+            # JSON strings, domain counts and comma-separated names for direct filtering;
+            # counts and names are read straight from the domain map's columns
+            per_gene[json_column] = [to_json(domain_map.get(gene, [])) for gene in gene_keys]
+            per_gene[count_column] = [domain_map.domain_count(gene) for gene in gene_keys]
+            per_gene[names_column] = [', '.join(domain_map.domain_names(gene)) for gene in gene_keys]
+        
+        # Keep the established column layout: all JSON columns, then counts, then names
+        column_order = ['mimic_gene'] + [columns[i] for i in range(3) for columns in domain_columns]
+        per_gene_data = pd.DataFrame(per_gene)[column_order]
+        
+        # Add the sequence length column with a hash join on the string gene ID
+        lengths_data = pd.DataFrame({
+            'gene_key': list(self.metagenome_sequence_lengths.keys()),
+            'origin_seq_length': np.fromiter(self.metagenome_sequence_lengths.values(), dtype=np.int32,
+                                             count=len(self.metagenome_sequence_lengths))
+        })
+        per_gene_data['gene_key'] = gene_keys
+        per_gene_data = per_gene_data.merge(lengths_data, on='gene_key', how='left').drop(columns='gene_key')
+        per_gene_data['origin_seq_length'] = per_gene_data['origin_seq_length'].fillna(0).astype(np.int32)
+        
+        # Join the per-gene columns onto every binding row
+        return self.binders_data.merge(per_gene_data, on='mimic_gene', how='left')
+    
+    def _merged_cache_key(self):
+        """
+        Describe the inputs of the merged table: the (mtime, size) stamp of every
+        table and FASTA file read, and the JSON serializer used for domain columns.
         
-        self.merged_data['KOFAM_domain_count'] = self.merged_data['mimic_gene'].apply(
-            lambda x: len(self.kofam_map.get(str(x), []))
-        )
+        Returns:
+            dict: JSON-serializable cache key
+        """
+        fasta_files = [os.path.join(self.data_dir, f) for f in os.listdir(self.data_dir)
+                       if f.endswith('.faa') or f.endswith('.fasta')]
+        stamps = {}
+        for path in self._input_files + fasta_files:
+            stat = os.stat(path)
+            stamps[os.path.basename(path)] = [stat.st_mtime_ns, stat.st_size]
         
-        # Add metagenome domain counts if they exist
-        if hasattr(self, 'pfam_metagenome_map'):
-            self.merged_data['PFAM_metagenome_count'] = self.merged_data['mimic_gene'].apply(
-                lambda x: len(self.pfam_metagenome_map.get(str(x), []))
-            )
+        return {
+            'version': MERGED_CACHE_VERSION,
+            'serializer': 'orjson' if HAS_ORJSON else 'json',
+            'stamps': stamps
+        }
+    
+    def _load_merged_cache(self, cache_key):
+        """
+        Load the cached merged table if it was built from the same inputs.
         
-        if hasattr(self, 'kofam_metagenome_map'):
-            self.merged_data['KOFAM_metagenome_count'] = self.merged_data['mimic_gene'].apply(
-                lambda x: len(self.kofam_metagenome_map.get(str(x), []))
-            )
+        Args:
+            cache_key (dict): Key of the current inputs (see _merged_cache_key)
+            
+        Returns:
+            DataFrame or None: The cached table, or None if missing or stale
+        """
+        cache_path = os.path.join(self.data_dir, MERGED_CACHE_FILENAME)
+        if not HAS_PYARROW or not os.path.exists(cache_path):
+            return None
         
-        # Add string columns with comma-separated domain names for direct filtering
-        self.merged_data['PFAM_domain_names'] = self.merged_data['mimic_gene'].apply(
-            lambda x: ', '.join([d.get('hmm_name', '') for d in self.pfam_map.get(str(x), [])])
-        )
+        try:
+            # Memory-mapped read of the uncompressed Feather file
+            table = pyarrow.feather.read_table(cache_path, memory_map=True)
+            metadata = json.loads(table.schema.metadata[b'mimic_cache'])
+            if metadata['key'] != cache_key:
+                return None
+            
+            # Arrow-backed string columns and null-free numeric columns wrap the mapped
+            # buffers directly (no copy), so their pages are shared with every other process
+            # serving the same data and only the columns a request touches are read
+            string_columns = set(metadata['string_columns']) if ARROW_STRING_DTYPE is not None else set()
+            merged_data = pd.DataFrame({
+                name: self._mapped_column(column, name in string_columns)
+                for name, column in zip(table.column_names, table.columns)
+            }, copy=False)  # copy=False keeps one block per column instead of consolidating
+            print(f"Loaded merged data from cache {cache_path}")
+            return merged_data
+        except Exception as e:
+            print(f"Ignoring unreadable merged data cache {cache_path}: {e}")
+            return None
+    
+    @staticmethod
+    def _mapped_column(column, is_string):
+        """
+        Convert one column of the memory-mapped cache table to a pandas Series.
         
-        self.merged_data['KOFAM_domain_names'] = self.merged_data['mimic_gene'].apply(
-            lambda x: ', '.join([d.get('hmm_name', '') for d in self.kofam_map.get(str(x), [])])
-        )
+        Args:
+            column (ChunkedArray): Column of the mapped Feather table
+            is_string (bool): Whether the column was an Arrow-backed string column
+            
+        Returns:
+            Series: The column, backed by the mapped buffers where possible (read-only)
+        """
+        if is_string:
+            return pd.Series(ARROW_STRING_DTYPE.__from_arrow__(column), copy=False)
         
-        # Add metagenome domain names if they exist
-        if hasattr(self, 'pfam_metagenome_map'):
-            self.merged_data['PFAM_metagenome_names'] = self.merged_data['mimic_gene'].apply(
-                lambda x: ', '.join([d.get('hmm_name', '') for d in self.pfam_metagenome_map.get(str(x), [])])
-            )
+        if (column.num_chunks == 1 and column.null_count == 0 and
+                (pyarrow.types.is_integer(column.type) or pyarrow.types.is_floating(column.type))):
+            return pd.Series(column.chunk(0).to_numpy(zero_copy_only=True), copy=False)
         
-        if hasattr(self, 'kofam_metagenome_map'):
-            self.merged_data['KOFAM_metagenome_names'] = self.merged_data['mimic_gene'].apply(
-                lambda x: ', '.join([d.get('hmm_name', '') for d in self.kofam_metagenome_map.get(str(x), [])])
-            )
+        # Nulls, booleans and object columns need a converted copy
+        return column.to_pandas()
+    
+    def _save_merged_cache(self, cache_key, merged_data):
+        """
+        Write the merged table as an uncompressed Feather file for the next run.
         
-        # Add sequence length column
-        self.merged_data['origin_seq_length'] = self.merged_data['mimic_gene'].apply(
-            lambda x: self.metagenome_sequence_lengths.get(str(x), 0)
-        )
+        Args:
+            cache_key (dict): Key of the inputs the table was built from
+            merged_data (DataFrame): The merged table
+        """
+        if not HAS_PYARROW:
+            return
         
-        # Print sequence length statistics
-        if 'origin_seq_length' in self.merged_data.columns:
-            non_zero_lengths = self.merged_data[self.merged_data['origin_seq_length'] > 0]['origin_seq_length']
-            if len(non_zero_lengths) > 0:
-                print(f"Sequence length stats: min={non_zero_lengths.min()}, max={non_zero_lengths.max()}, avg={non_zero_lengths.mean():.1f}")
-                print(f"Sequences with length data: {len(non_zero_lengths)} out of {len(self.merged_data)} ({len(non_zero_lengths) / len(self.merged_data) * 100:.1f}%)")
-            else:
-                print("No sequence length data available.")
+        cache_path = os.path.join(self.data_dir, MERGED_CACHE_FILENAME)
+        metadata = {
+            'key': cache_key,
+            # Arrow-backed string columns come back as object columns and are converted again on load
+            'string_columns': [col for col, dtype in merged_data.dtypes.items() if dtype == ARROW_STRING_DTYPE]
+        }
         
-        print(f"Merged data created with {len(self.merged_data)} rows")
+        def write(tmp_path):
+            table = pyarrow.Table.from_pandas(merged_data, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b'mimic_cache': json.dumps(metadata).encode('utf-8')
+            })
+            pyarrow.feather.write_feather(table, tmp_path, compression='uncompressed')
         
-        return self
+        _write_cache_file(cache_path, write, 'merged data')
     
     def get_column_metadata(self):
         """
@@ -633,14 +1688,14 @@ class MimicDataProcessor:
             col_data = self.merged_data[column]
             col_type = col_data.dtype
             
-            if col_type == 'object':
+            if col_type == 'object' or pd.api.types.is_string_dtype(col_type):
                 # String column
                 metadata[column] = {
                     'type': 'string',
                     'unique_count': col_data.nunique(),
                     'example_values': col_data.dropna().sample(min(5, len(col_data.dropna()))).tolist() if len(col_data.dropna()) > 0 else []
                 }
-            elif np.issubdtype(col_type, np.number):
+            elif pd.api.types.is_numeric_dtype(col_type) and not pd.api.types.is_bool_dtype(col_type):
                 # Numeric column
                 metadata[column] = {
                     'type': 'numeric',
@@ -690,9 +1745,17 @@ class MimicDataProcessor:
         return output_path, metadata_path
     
     def get_data_summary(self):
-        """Return a summary of the processed data."""
+        """
+        Return a summary of the processed data.
+        
+        The summary is cached until merge_data() runs again (or merged_data is replaced).
+        """
         if self.merged_data is None:
             raise ValueError("Merged data not created. Call merge_data() first.")
+        
+        cache_key = (id(self.merged_data), self._merged_version)
+        if self._summary_cache is not None and self._summary_cache[0] == cache_key:
+            return copy.deepcopy(self._summary_cache[1])
             
         summary = {
             'total_rows': len(self.merged_data),
@@ -708,53 +1771,39 @@ class MimicDataProcessor:
             print(f"Error getting binding_level_counts: {e}")
             summary['binding_level_counts'] = {}
         
-        # Safely add PFAM better binders stats
-        try:
-            pfam_with_domains = (self.merged_data['PFAM_domain_count'] > 0).sum()
-            pfam_avg = self.merged_data['PFAM_domain_count'].mean()
-            
-            summary['pfam_stats'] = {
-                'total_sequences_with_domains': int(pfam_with_domains),
-                'avg_domains_per_sequence': float(pfam_avg)
-            }
-        except Exception as e:
-            print(f"Error getting PFAM stats: {e}")
-            summary['pfam_stats'] = {
-                'total_sequences_with_domains': 0,
-                'avg_domains_per_sequence': 0
-            }
-        
-        # Safely add KOFAM better binders stats
-        try:
-            kofam_with_domains = (self.merged_data['KOFAM_domain_count'] > 0).sum()
-            kofam_avg = self.merged_data['KOFAM_domain_count'].mean()
-            
-            summary['kofam_stats'] = {
-                'total_sequences_with_domains': int(kofam_with_domains),
-                'avg_domains_per_sequence': float(kofam_avg)
-            }
-        except Exception as e:
-            print(f"Error getting KOFAM stats: {e}")
-            summary['kofam_stats'] = {
-                'total_sequences_with_domains': 0,
-                'avg_domains_per_sequence': 0
-            }
-        
+        # Safely add PFAM and KOFAM better binders stats
+        for stats_key, count_column, label in (('pfam_stats', 'PFAM_domain_count', 'PFAM'),
+                                               ('kofam_stats', 'KOFAM_domain_count', 'KOFAM')):
+            try:
+                domain_counts = self.merged_data[count_column].to_numpy()
+                
+                summary[stats_key] = {
+                    'total_sequences_with_domains': int(np.count_nonzero(domain_counts > 0)),
+                    'avg_domains_per_sequence': float(domain_counts.mean()) if len(domain_counts) > 0 else float('nan')
+                }
+            except Exception as e:
+                print(f"Error getting {label} stats: {e}")
+                summary[stats_key] = {
+                    'total_sequences_with_domains': 0,
+                    'avg_domains_per_sequence': 0
+                }
         
         # Add sequence length stats
         if 'origin_seq_length' in self.merged_data.columns:
             try:
                 # Only consider rows with valid sequence lengths
-                length_data = self.merged_data[self.merged_data['origin_seq_length'] > 0]['origin_seq_length']
+                length_data = self.merged_data['origin_seq_length']
+                length_data = length_data[length_data > 0]
                 
                 if len(length_data) > 0:
+                    length_stats = length_data.agg(['min', 'max', 'mean', 'median'])
                     summary['sequence_length_stats'] = {
                         'sequences_with_length_data': int(len(length_data)),
                         'percent_with_length_data': float(len(length_data) / len(self.merged_data) * 100),
-                        'min_length': int(length_data.min()),
-                        'max_length': int(length_data.max()),
-                        'mean_length': float(length_data.mean()),
-                        'median_length': float(length_data.median())
+                        'min_length': int(length_stats['min']),
+                        'max_length': int(length_stats['max']),
+                        'mean_length': float(length_stats['mean']),
+                        'median_length': float(length_stats['median'])
                     }
                 else:
                     summary['sequence_length_stats'] = {
@@ -776,7 +1825,424 @@ class MimicDataProcessor:
                     'median_length': 0
                 }
         
+        self._summary_cache = (cache_key, copy.deepcopy(summary))
         return summary
+    
+    def _cached_filter_result(self, key, compute=None):
+        """
+        Look up a filter mask or row order in the LRU cache, computing and storing it on a miss
+        (without compute, a miss returns None).
+        """
+        cache_key = (id(self.merged_data), self._merged_version) + key
+        with self._filter_cache_lock:
+            result = self._filter_cache.get(cache_key)
+            if result is not None:
+                self._filter_cache.move_to_end(cache_key)
+                return result
+        
+        if compute is None:
+            return None
+        result = compute()
+        result.flags.writeable = False  # Shared between requests
+        with self._filter_cache_lock:
+            self._filter_cache[cache_key] = result
+            while len(self._filter_cache) > FILTER_CACHE_SIZE:
+                self._filter_cache.popitem(last=False)
+        return result
+    
+    def filter_mask(self, filters):
+        """
+        Build the row mask for the table filters sent by the web UI.
+        
+        Masks are cached per filter set until merge_data() runs again, so paging and
+        re-sorting the same filtered view does not rescan the columns.
+        
+        Args:
+            filters (dict): Column name -> substring to match (case-insensitive) or
+                {'min': ..., 'max': ...} range; unknown columns are ignored
+            
+        Returns:
+            np.ndarray: Read-only boolean mask over the rows of merged_data
+        """
+        if self.merged_data is None:
+            raise ValueError("Merged data not created. Call merge_data() first.")
+        
+        def compute():
+            mask = np.ones(len(self.merged_data), dtype=bool)
+            
+            for column, filter_value in filters.items():
+                if column not in self.merged_data.columns:
+                    continue
+                
+                if isinstance(filter_value, dict):
+                    # Numeric filter
+                    lower = filter_value.get('min')
+                    upper = filter_value.get('max')
+                    if (lower is not None or upper is not None) and self._has_sorted_index(column, lower, upper):
+                        mask &= self._range_mask(column, lower, upper)
+                        continue
+                    if lower is not None:
+                        mask &= (self.merged_data[column] >= lower).to_numpy(dtype=bool)
+                    if upper is not None:
+                        mask &= (self.merged_data[column] <= upper).to_numpy(dtype=bool)
+                else:
+                    # String filter (substring match)
+                    mask &= self._substring_mask(column, str(filter_value))
+            
+            return mask
+        
+        return self._cached_filter_result(('mask', json.dumps(filters, sort_keys=True)), compute)
+    
+    def _has_sorted_index(self, column, *bounds):
+        """Check that a range filter can be answered from the column's sorted index."""
+        if self.merged_data[column].dtype.kind not in 'iuf':
+            return False
+        # Bounds must compare exactly against the column's values (no strings, NaN or huge ints)
+        return all(
+            bound is None
+            or (isinstance(bound, float) and not math.isnan(bound))
+            or (isinstance(bound, int) and not isinstance(bound, bool) and abs(bound) <= 2 ** 53)
+            for bound in bounds
+        )
+    
+    def _range_mask(self, column, lower, upper):
+        """
+        Select the rows with lower <= value <= upper (either bound may be None) by binary
+        search in the column's sorted index; missing values never match.
+        
+        Returns:
+            np.ndarray: Boolean mask over the rows of merged_data
+        """
+        def build(values):
+            values = values.to_numpy()
+            rows = np.flatnonzero(~np.isnan(values)) if values.dtype.kind == 'f' else np.arange(len(values))
+            order = np.argsort(values[rows], kind='stable')
+            return values[rows][order], rows[order]
+        
+        sorted_values, sorted_rows = self._column_view('sorted', column, build)
+        first = np.searchsorted(sorted_values, lower, side='left') if lower is not None else 0
+        stop = np.searchsorted(sorted_values, upper, side='right') if upper is not None else len(sorted_values)
+        
+        mask = np.zeros(len(self.merged_data), dtype=bool)
+        mask[sorted_rows[first:stop]] = True
+        return mask
+    
+    def _column_view(self, kind, column, build):
+        """Get a derived per-row array of a column, built once per merged table and reused by every request."""
+        cache_key = (id(self.merged_data), self._merged_version)
+        with self._filter_cache_lock:
+            if self._column_views is None or self._column_views[0] != cache_key:
+                self._column_views = (cache_key, {})
+            column_views = self._column_views[1]
+            view = column_views.get((kind, column))
+        
+        if view is None:
+            view = build(self.merged_data[column])
+            with self._filter_cache_lock:
+                view = column_views.setdefault((kind, column), view)
+        return view
+    
+    def _rows_by_value(self, column):
+        """
+        Get the row positions of every distinct value of a column.
+        
+        Returns:
+            dict: value -> ascending array of row positions (missing values are left out)
+        """
+        return self._column_view('rows_by_value', column,
+                                 lambda values: values.groupby(values, sort=False).indices)
+    
+    def _string_codes(self, column):
+        """
+        Get a column's values as strings, interned to their distinct values.
+        
+        Returns:
+            tuple: (codes, strings, lowered) - the distinct-string code of every row, and
+            each distinct string as is and in lowercase
+        """
+        def build(values):
+            codes, strings = pd.factorize(values.astype(str))
+            strings = np.asarray(strings, dtype=object)
+            lowered = np.array([string.lower() for string in strings.tolist()], dtype=object)
+            return codes, strings, lowered
+        
+        return self._column_view('strings', column, build)
+    
+    def _lowered_arrow(self, column):
+        """Get the distinct lowercase strings of a column as an Arrow array (for compiled substring scans)."""
+        return self._column_view('lowered_arrow', column,
+                                 lambda values: pyarrow.array(self._string_codes(column)[2], type=pyarrow.large_string()))
+    
+    def _trigram_index(self, column):
+        """
+        Index the distinct lowercase strings of a column by character trigram.
+        
+        Returns:
+            dict: Trigram -> sorted int32 array of the distinct strings containing it
+        """
+        def build(values):
+            _, _, lowered = self._string_codes(column)
+            postings = defaultdict(list)
+            for i, string in enumerate(lowered.tolist()):
+                for trigram in {string[j:j + 3] for j in range(len(string) - 2)}:
+                    postings[trigram].append(i)
+            return {trigram: np.array(ids, dtype=np.int32) for trigram, ids in postings.items()}
+        
+        return self._column_view('trigrams', column, build)
+    
+    def _value_codes(self, column):
+        """Get the distinct-value code of every row (-1 if missing) and the distinct values."""
+        def build(values):
+            codes, uniques = pd.factorize(values)
+            return codes, np.asarray(uniques, dtype=object)
+        
+        return self._column_view('values', column, build)
+    
+    def value_counts(self, column, rows):
+        """
+        Count the values of a column over the selected rows, like Series.value_counts().
+        
+        Args:
+            column (str): Column to count, e.g. 'MHC'
+            rows (np.ndarray): Row positions in table order, e.g. from filtered_rows()
+            
+        Returns:
+            dict: Value -> number of rows, most common first (missing values are not counted)
+        """
+        codes, uniques = self._value_codes(column)
+        selected = codes[rows]
+        counts = np.bincount(selected[selected >= 0], minlength=len(uniques))
+        order = np.argsort(-counts, kind='stable')
+        order = order[counts[order] > 0]
+        return dict(zip(uniques[order].tolist(), counts[order].tolist()))
+    
+    def json_column_values(self, column, rows):
+        """
+        Get the values of a JSON column for some rows, with '[]' in place of missing
+        values and invalid JSON. Each distinct value is validated once per merged table.
+        
+        Args:
+            column (str): JSON column, e.g. 'PFAM_domains'
+            rows (np.ndarray): Row positions into merged_data
+            
+        Returns:
+            list: One JSON string per row
+        """
+        def build(values):
+            codes, uniques = pd.factorize(values)
+            # One extra slot for the -1 code of missing values
+            valid_values = np.full(len(uniques) + 1, '[]', dtype=object)
+            for i, value in enumerate(np.asarray(uniques, dtype=object).tolist()):
+                if isinstance(value, str):
+                    try:
+                        json_loads(value)
+                        valid_values[i] = value
+                    except Exception:
+                        pass
+            return codes, valid_values
+        
+        codes, valid_values = self._column_view('valid_json', column, build)
+        return valid_values[codes[rows]].tolist()
+    
+    def _domain_name_index(self, column):
+        """
+        Index the domain names of a JSON domain column, parsing each distinct value once.
+        
+        Returns:
+            tuple: (row_values, value_indptr, value_codes, names) - the distinct-value code of
+            every row (-1 if missing), the CSR offsets of each distinct value's hits into
+            value_codes, the int32 name code of every hit, and the name of every code
+        """
+        def build(values):
+            row_values, uniques = pd.factorize(values)
+            vocabulary = {}
+            value_lengths = np.zeros(len(uniques), dtype=np.int64)
+            value_codes = []
+            for i, domains_json in enumerate(uniques):
+                try:
+                    hmm_names = [domain['hmm_name'] for domain in json_loads(domains_json)]
+                except Exception:
+                    continue  # Unparsable values contribute no domains
+                value_lengths[i] = len(hmm_names)
+                value_codes.extend(vocabulary.setdefault(name, len(vocabulary)) for name in hmm_names)
+            
+            value_indptr = np.zeros(len(uniques) + 1, dtype=np.int64)
+            np.cumsum(value_lengths, out=value_indptr[1:])
+            names = np.array(list(vocabulary), dtype=object)
+            return row_values, value_indptr, np.array(value_codes, dtype=np.int32), names
+        
+        return self._column_view('domain_names', column, build)
+    
+    def count_domain_names(self, column, rows):
+        """
+        Count the domain names of a JSON domain column over the selected rows.
+        
+        Only the selected rows are visited, so counting several columns for the same
+        filtered view shares one row selection.
+        
+        Args:
+            column (str): Domain column, e.g. 'PFAM_domains'
+            rows (np.ndarray): Row positions in table order, e.g. from filtered_rows()
+            
+        Returns:
+            Counter: Domain name -> number of hits, in order of first appearance
+        """
+        row_values, value_indptr, value_codes, names = self._domain_name_index(column)
+        
+        if HAS_NUMBA:
+            counts, appearance = _count_selected_domain_codes(
+                np.asarray(rows, dtype=np.int64), row_values, value_indptr, value_codes, len(names)
+            )
+            return Counter(dict(zip(names[appearance].tolist(), counts[appearance].tolist())))
+        
+        # Rows of the same gene share a distinct value: count each value's hits once,
+        # weighted by the number of selected rows holding it
+        selected = row_values[rows]
+        selected = selected[selected >= 0]
+        if len(selected) == 0:
+            return Counter()
+        value_ids, first_rows, value_rows = np.unique(selected, return_index=True, return_counts=True)
+        
+        value_starts = value_indptr[value_ids]
+        value_lengths = value_indptr[value_ids + 1] - value_starts
+        hit_ends = np.cumsum(value_lengths)
+        hit_positions = np.arange(hit_ends[-1]) - np.repeat(hit_ends - value_lengths, value_lengths)
+        hit_codes = value_codes[np.repeat(value_starts, value_lengths) + hit_positions]
+        
+        counts = np.bincount(hit_codes, weights=np.repeat(value_rows, value_lengths),
+                             minlength=len(names)).astype(np.int64)
+        
+        # Keep the row-by-row order of first appearance (most_common() breaks ties by it)
+        hit_order = np.lexsort((hit_positions, np.repeat(first_rows, value_lengths)))
+        present_codes, first_hits = np.unique(hit_codes[hit_order], return_index=True)
+        appearance = present_codes[np.argsort(first_hits)]
+        
+        return Counter(dict(zip(names[appearance].tolist(), counts[appearance].tolist())))
+    
+    def _substring_mask(self, column, pattern):
+        """
+        Match a string filter against a column, case-insensitively.
+        
+        Filters are regular expressions (as with Series.str.contains); plain ASCII text,
+        which is what the UI sends, is matched as a substring. Either way only the column's
+        distinct values are matched, and rows pick up the result of their value.
+        
+        Args:
+            column (str): Column to match
+            pattern (str): Filter text
+            
+        Returns:
+            np.ndarray: Boolean mask over the rows of merged_data
+        """
+        codes, strings, lowered = self._string_codes(column)
+        
+        # One extra slot (no match) for the -1 code of missing values
+        matches = np.zeros(len(strings) + 1, dtype=bool)
+        if not pattern.isascii() or REGEX_SPECIAL_CHARS.search(pattern):
+            string_matches = pd.Series(strings, dtype=object).str.contains(pattern, case=False, na=False)
+            matches[:-1] = string_matches.to_numpy(dtype=bool)
+        elif len(pattern) >= 3 and len(lowered) >= TRIGRAM_INDEX_MIN_STRINGS:
+            # Only strings holding every trigram of the pattern can contain it; check just those
+            pattern = pattern.lower()
+            trigram_index = self._trigram_index(column)
+            postings = sorted((trigram_index.get(pattern[j:j + 3], np.empty(0, dtype=np.int32))
+                               for j in range(len(pattern) - 2)), key=len)
+            candidates = functools.reduce(
+                lambda ids, other: np.intersect1d(ids, other, assume_unique=True), postings[1:], postings[0]
+            )
+            found = np.fromiter((pattern in value for value in lowered[candidates].tolist()),
+                                dtype=bool, count=len(candidates))
+            matches[candidates[found]] = True
+        elif HAS_PYARROW:
+            # Arrow's substring kernel scans the contiguous string buffer in native code
+            found = pyarrow.compute.match_substring(self._lowered_arrow(column), pattern.lower())
+            matches[:-1] = found.to_numpy(zero_copy_only=False)
+        else:
+            pattern = pattern.lower()
+            matches[:-1] = np.fromiter((pattern in value for value in lowered), dtype=bool, count=len(lowered))
+        return matches[codes]
+    
+    def filtered_rows(self, filters, sort_by=None, ascending=True, limit=None):
+        """
+        Get the positions of the rows matching the table filters, optionally sorted by a column.
+        
+        Args:
+            filters (dict): Table filters, as for filter_mask()
+            sort_by (str, optional): Column to sort the matching rows by
+            ascending (bool): Sort direction
+            limit (int, optional): Only the first limit rows of the sorted order are needed;
+                until the full order is cached, small limits on numeric columns are served
+                by a partial sort
+            
+        Returns:
+            np.ndarray: Read-only row positions into merged_data (possibly only the first limit)
+        """
+        if sort_by is None:
+            return self._cached_filter_result(
+                ('rows', json.dumps(filters, sort_keys=True)),
+                lambda: np.flatnonzero(self.filter_mask(filters))
+            )
+        
+        sort_key = ('sorted', json.dumps(filters, sort_keys=True), sort_by, bool(ascending))
+        if limit is not None and self._cached_filter_result(sort_key) is None:
+            rows = self.filtered_rows(filters)
+            if 0 < limit <= len(rows) // PARTIAL_SORT_MAX_FRACTION:
+                top_rows = self._partial_sort_rows(rows, sort_by, ascending, limit)
+                if top_rows is not None:
+                    return top_rows
+        
+        return self._cached_filter_result(
+            sort_key,
+            lambda: self.sort_rows(self.filtered_rows(filters), sort_by, ascending)
+        )
+    
+    def sort_rows(self, rows, column, ascending=True):
+        """
+        Order row positions by a column, the way DataFrame.sort_values() orders the rows.
+        
+        The sort is stable (equal values keep their table order, missing values go last),
+        so pages of a partial sort and of the full sort agree.
+        
+        Args:
+            rows (np.ndarray): Row positions into merged_data
+            column (str): Column to sort by
+            ascending (bool): Sort direction
+            
+        Returns:
+            np.ndarray: The row positions in sorted order
+        """
+        values = self.merged_data[column].iloc[rows].reset_index(drop=True)
+        return np.asarray(rows)[values.sort_values(ascending=ascending, kind='stable').index.to_numpy()]
+    
+    def _partial_sort_rows(self, rows, column, ascending, limit):
+        """
+        Get the first limit rows of the sort_rows() order by partitioning the column.
+        
+        Returns:
+            np.ndarray or None: The row positions, or None if the column is not a plain
+            numeric column or the limit reaches into its missing values
+        """
+        values = self.merged_data[column].to_numpy()
+        if values.dtype.kind not in 'if':
+            return None
+        values = values[rows]
+        
+        valid_positions = np.flatnonzero(~np.isnan(values)) if values.dtype.kind == 'f' else np.arange(len(values))
+        if limit > len(valid_positions):
+            return None
+        valid_values = values[valid_positions]
+        
+        # Every row up to the limit-th value, ties included, then a stable sort of just those
+        if ascending:
+            threshold = np.partition(valid_values, limit - 1)[limit - 1]
+            candidates = valid_positions[valid_values <= threshold]
+            keys = values[candidates]
+        else:
+            threshold = np.partition(valid_values, len(valid_values) - limit)[len(valid_values) - limit]
+            candidates = valid_positions[valid_values >= threshold]
+            keys = -values[candidates]
+        
+        return np.asarray(rows)[candidates[np.argsort(keys, kind='stable')[:limit]]]
 
     def get_sequence_data(self, sequence_id):
         """
@@ -786,19 +2252,96 @@ class MimicDataProcessor:
             sequence_id (str): The sequence ID to retrieve data for
             
         Returns:
-            dict: Dictionary containing all data related to the sequence
+            SequenceDetail or None: All data related to the sequence, or None if it is not in merged_data
         """
         if self.merged_data is None:
             raise ValueError("Merged data not created. Call merge_data() first.")
             
         # Get basic sequence information
-        sequence_rows = self.merged_data[self.merged_data['mimic_gene'] == sequence_id]
+        rows = self._rows_by_value('mimic_gene').get(sequence_id)
         
-        if len(sequence_rows) == 0:
+        if rows is None:
             return None  # Sequence not found
+        
+        return self._sequence_data_from_rows(sequence_id, self.merged_data.take(rows))
+    
+    def get_sequence_detail(self, sequence_id):
+        """
+        Get the sequence data of get_sequence_data(), cached per sequence until merged_data changes.
+        
+        The returned SequenceDetail is shared between callers and must not be modified.
+        
+        Args:
+            sequence_id (str): The sequence ID to retrieve data for
             
-        # Extract the first row for basic info
-        first_row = sequence_rows.iloc[0].to_dict()
+        Returns:
+            SequenceDetail or None: Sequence data, or None if the sequence is not in merged_data
+        """
+        details = self._sequence_details_for_version()
+        with self._sequence_details_lock:
+            if sequence_id in details:
+                return details[sequence_id]
+        
+        sequence_data = self.get_sequence_data(sequence_id)
+        if sequence_data is not None:  # Unknown IDs are not kept
+            with self._sequence_details_lock:
+                details[sequence_id] = sequence_data
+        return sequence_data
+    
+    def precompute_sequence_details(self):
+        """
+        Build the cached sequence data of every sequence in merged_data up front,
+        so get_sequence_detail() never computes on a request.
+        
+        Returns:
+            int: Number of sequences precomputed
+        """
+        if self.merged_data is None:
+            raise ValueError("Merged data not created. Call merge_data() first.")
+        
+        details = self._sequence_details_for_version()
+        
+        gene_rows = self._rows_by_value('mimic_gene')
+        for sequence_id, rows in gene_rows.items():
+            sequence_data = self._sequence_data_from_rows(sequence_id, self.merged_data.take(rows))
+            with self._sequence_details_lock:
+                details[sequence_id] = sequence_data
+        
+        print(f"Precomputed sequence details for {len(gene_rows)} sequences")
+        return len(gene_rows)
+    
+    def _sequence_details_for_version(self):
+        """Return the sequence detail cache of the current merged_data, starting a new one when it changed."""
+        if self.merged_data is None:
+            raise ValueError("Merged data not created. Call merge_data() first.")
+        
+        cache_key = (id(self.merged_data), self._merged_version)
+        with self._sequence_details_lock:
+            if self._sequence_details is None or self._sequence_details[0] != cache_key:
+                self._sequence_details = (cache_key, {})
+            return self._sequence_details[1]
+    
+    def _sequence_data_from_rows(self, sequence_id, sequence_rows):
+        """
+        Build the sequence data returned by get_sequence_data().
+        
+        Args:
+            sequence_id (str): The sequence ID
+            sequence_rows (DataFrame): The sequence's rows of merged_data (at least one)
+            
+        Returns:
+            SequenceDetail: All data related to the sequence
+        """
+        # One record per row, assembled from whole-column lists (several times faster than
+        # to_dict(orient='records') or iloc on a few rows)
+        columns = list(sequence_rows.columns)
+        binding_data = [
+            dict(zip(columns, row))
+            for row in zip(*(sequence_rows[column].tolist() for column in columns))
+        ]
+        
+        # Extract the first row for basic info (a copy; the binding records are modified below)
+        first_row = dict(binding_data[0])
         
         # Extract domain information from better binders - ensure we always get a list
         # Handle case where domains might not be iterable (e.g. float)
@@ -840,7 +2383,6 @@ class MimicDataProcessor:
                 kofam_metagenome_domains = []
         
         # Get binding data and clean it up
-        binding_data = sequence_rows.to_dict(orient='records')
         
         # Make sure binding levels are strings to avoid template issues
         for binding in binding_data:
@@ -895,18 +2437,18 @@ class MimicDataProcessor:
         if binding_positions is None:
             binding_positions = []
         
-        return {
-            'sequence_id': sequence_id,
-            'basic_info': basic_info,
-            'pfam_domains': pfam_domains,
-            'kofam_domains': kofam_domains,
-            'pfam_metagenome_domains': pfam_metagenome_domains,
-            'kofam_metagenome_domains': kofam_metagenome_domains,
-            'binding_data': binding_data,
-            'sequence': sequence_text,
-            'binding_positions': binding_positions,
-            'raw_data': first_row
-        }
+        return SequenceDetail(
+            sequence_id=sequence_id,
+            basic_info=basic_info,
+            pfam_domains=pfam_domains,
+            kofam_domains=kofam_domains,
+            pfam_metagenome_domains=pfam_metagenome_domains,
+            kofam_metagenome_domains=kofam_metagenome_domains,
+            binding_data=binding_data,
+            sequence=sequence_text,
+            binding_positions=binding_positions,
+            raw_data=first_row
+        )
         
     def _calculate_binding_positions(self, binding_data, full_sequence):
         """
@@ -920,8 +2462,9 @@ class MimicDataProcessor:
             list: List of dictionaries with position and count for histogram
         """
         try:
-            # Initialize position counters
-            position_counts = {}
+            # Start and length of every located peptide, counted into a histogram at the end
+            peptide_starts = []
+            peptide_lengths = []
             
             # Validate inputs
             if not binding_data or not isinstance(binding_data, list):
@@ -959,7 +2502,16 @@ class MimicDataProcessor:
                 if sequence_length == 0:
                     sequence_length = 1000
                     
-                print(f"Estimated sequence length: {sequence_length}")
+                if DEBUG_OUTPUT:
+                    print(f"Estimated sequence length: {sequence_length}")
+            
+            # Locate every peptide in the sequence in one search
+            peptide_positions = {}
+            if full_sequence:
+                peptide_positions = find_peptide_positions(full_sequence, (
+                    binding['mimic_Peptide'] for binding in binding_data
+                    if isinstance(binding, dict) and isinstance(binding.get('mimic_Peptide'), str)
+                ))
             
             # Count of valid binding records processed
             valid_bindings = 0
@@ -985,7 +2537,9 @@ class MimicDataProcessor:
                 # Try to find the peptide in the full sequence
                 position = -1
                 if full_sequence:
-                    position = full_sequence.find(peptide)
+                    position = peptide_positions.get(peptide)
+                    if position is None:
+                        position = full_sequence.find(peptide)
                 
                 # If found in sequence or have specific position data
                 if position >= 0:
@@ -993,9 +2547,9 @@ class MimicDataProcessor:
                     binding['position_start'] = position
                     binding['position_end'] = position + len(peptide) - 1
                     
-                    # For each position in the peptide, increment the counter for histogram
-                    for i in range(position, position + len(peptide)):
-                        position_counts[i] = position_counts.get(i, 0) + 1
+                    # Record the covered span for the histogram
+                    peptide_starts.append(position)
+                    peptide_lengths.append(len(peptide))
                 elif 'position' in binding:
                     # Use provided position if available
                     try:
@@ -1007,8 +2561,8 @@ class MimicDataProcessor:
                             binding['position_end'] = start_pos + len(peptide) - 1
                             
                             # Update histogram data
-                            for i in range(start_pos, start_pos + len(peptide)):
-                                position_counts[i] = position_counts.get(i, 0) + 1
+                            peptide_starts.append(start_pos)
+                            peptide_lengths.append(len(peptide))
                         else:
                             print(f"Skipping invalid position value: {position_val}")
                     except (ValueError, TypeError) as e:
@@ -1021,18 +2575,32 @@ class MimicDataProcessor:
                     binding['position_end'] = -1
                     continue
             
-            print(f"Processed {valid_bindings} valid binding records out of {len(binding_data)} total")
-            
-            # Convert to format for visualization
-            position_data = [
-                {'position': pos, 'count': count}
-                for pos, count in position_counts.items()
-            ]
-            
-            # Sort by position
-            position_data.sort(key=lambda x: x['position'])
+            if DEBUG_OUTPUT:
+                print(f"Processed {valid_bindings} valid binding records out of {len(binding_data)} total")
+            
+            # Build the coverage histogram with a difference array: +1 where each peptide
+            # starts, -1 just past its end (both counted with np.bincount), then a cumulative
+            # sum gives the per-position counts
+            position_data = []
+            if peptide_starts:
+                starts = np.array(peptide_starts, dtype=np.int64)
+                ends = starts + np.array(peptide_lengths, dtype=np.int64)
+                offset = starts.min()
+                span = ends.max() - offset + 1
+                
+                coverage = np.cumsum(
+                    np.bincount(starts - offset, minlength=span) - np.bincount(ends - offset, minlength=span)
+                )
+                
+                # Convert to format for visualization, sorted by position
+                covered = np.nonzero(coverage)[0]
+                position_data = [
+                    {'position': pos, 'count': count}
+                    for pos, count in zip((covered + offset).tolist(), coverage[covered].tolist())
+                ]
             
-            print(f"Generated {len(position_data)} position data points")
+            if DEBUG_OUTPUT:
+                print(f"Generated {len(position_data)} position data points")
             
             return position_data
             
@@ -1043,6 +2611,47 @@ class MimicDataProcessor:
             print(traceback.format_exc())
             return []
     
+    def _get_intersection_pool(self, num_workers):
+        """
+        Return the process pool for intersection batches, creating it on first use.
+        
+        Starting worker processes costs far more than a typical analysis, so the pool is
+        kept for the lifetime of the processor (see close()).
+        
+        Args:
+            num_workers (int): Number of worker processes
+            
+        Returns:
+            ProcessPoolExecutor: The shared pool
+        """
+        with self._intersection_pool_lock:
+            pool = self._intersection_pool
+            # Replace a pool of the wrong size
+            if pool is not None and self._intersection_pool_size != num_workers:
+                pool.shutdown(wait=False)
+                pool = None
+            if pool is None:
+                pool = self._intersection_pool = ProcessPoolExecutor(
+                    max_workers=num_workers,
+                    mp_context=multiprocessing.get_context(INTERSECTION_START_METHOD)
+                )
+                self._intersection_pool_size = num_workers
+                # Also stop the workers if the processor is dropped or the interpreter exits
+                weakref.finalize(self, pool.shutdown, wait=False)
+            return pool
+    
+    def _discard_intersection_pool(self, pool):
+        """
+        Shut down a pool left broken by a crashed worker so the next analysis starts a new one.
+        
+        Args:
+            pool (ProcessPoolExecutor): The broken pool
+        """
+        with self._intersection_pool_lock:
+            if self._intersection_pool is pool:
+                self._intersection_pool = None
+        pool.shutdown(wait=False)
+    
     def analyze_binding_domain_intersections(self, binding_affinity_threshold=500, binding_level=None, max_sequences=None, progress_callback=None):
         """
         Analyze which PFAM domains contain mimic sequences.
@@ -1056,15 +2665,28 @@ class MimicDataProcessor:
         Returns:
             dict: Analysis results including domain-binding overlap counts
         """
+        # Results are cached per filter combination until merge_data() runs again
+        cache_key = (id(self.merged_data), self._merged_version,
+                     binding_affinity_threshold, binding_level, max_sequences)
+        with self._intersection_cache_lock:
+            cached = self._intersection_cache.get(cache_key)
+            if cached is not None:
+                self._intersection_cache.move_to_end(cache_key)
+        if cached is not None:
+            if progress_callback:
+                progress_callback(100)
+            return copy.deepcopy(cached)
+        
+        trace_memory = TRACE_MALLOC and not tracemalloc.is_tracing()
         try:
             import multiprocessing as mp
             import numpy as np
-            from collections import Counter, defaultdict
             import time
             from concurrent.futures import ThreadPoolExecutor, as_completed
             
-            # Enable memory usage tracking for optimization
-            tracemalloc.start()
+            # Enable memory usage tracking when requested
+            if trace_memory:
+                tracemalloc.start()
             
             print(f"Analyzing domain-binding intersections with threshold {binding_affinity_threshold}nM, level filter: {binding_level}")
             
@@ -1078,11 +2700,17 @@ class MimicDataProcessor:
             if progress_callback:
                 progress_callback(progress)
             
-            # Use more efficient filtering with polars if available
-            if HAS_POLARS:
+            # Only these columns are needed for the analysis
+            analysis_columns = [col for col in ('mimic_gene', 'mimic_Peptide', 'mimic_Aff(nM)', 'MHC', 'mimic_BindLevel')
+                                if col in self.merged_data.columns]
+            
+            # Use more efficient filtering with polars if available; without any filter
+            # the rows are used as they are, so the conversion to polars is skipped
+            use_polars = HAS_POLARS and (bool(binding_level) or binding_affinity_threshold is not None)
+            if use_polars:
                 print("Using polars for data filtering")
-                # Convert pandas DataFrame to polars
-                pl_df = pl.from_pandas(self.merged_data)
+                # Convert the needed pandas columns to polars (keeping NaN values as they are)
+                pl_df = pl.from_pandas(self.merged_data[analysis_columns], nan_to_null=False)
                 
                 # Apply filters
                 filter_expressions = []
@@ -1105,8 +2733,8 @@ class MimicDataProcessor:
                 else:
                     filtered_pl = pl_df
                 
-                # Convert back to pandas for compatibility with the rest of the code
-                filtered_data = filtered_pl.to_pandas()
+                # The rest of the preparation stays in polars
+                filtered_count = filtered_pl.height
                 
             else:
                 # Fall back to pandas filtering if polars is not available
@@ -1121,20 +2749,26 @@ class MimicDataProcessor:
                 
                 # Apply all filters at once (more efficient)
                 if filter_conditions:
-                    combined_filter = pd.concat(filter_conditions, axis=1).all(axis=1) if len(filter_conditions) > 1 else filter_conditions[0]
-                    filtered_data = self.merged_data[combined_filter]
+                    # AND the boolean masks directly instead of stacking them into a frame
+                    combined_filter = functools.reduce(operator.and_, filter_conditions)
+                    filtered_data = self.merged_data.loc[combined_filter, analysis_columns]
                 else:
-                    filtered_data = self.merged_data.copy()
+                    # No filter: read the merged data in place instead of copying its columns
+                    # (it is only read below, never modified)
+                    filtered_data = self.merged_data
+                
+                filtered_count = len(filtered_data)
             
-            print(f"Found {len(filtered_data)} binding records after filtering in {time.time() - start_time:.2f}s")
+            print(f"Found {filtered_count} binding records after filtering in {time.time() - start_time:.2f}s")
             
             progress = 5
             if progress_callback:
                 progress_callback(progress)
             
             # Skip processing if no data after filtering
-            if len(filtered_data) == 0:
-                tracemalloc.stop()
+            if filtered_count == 0:
+                if trace_memory:
+                    tracemalloc.stop()
                 if progress_callback:
                     progress_callback(100)
                 return {
@@ -1148,25 +2782,55 @@ class MimicDataProcessor:
                     'binding_level': binding_level
                 }
             
-            # Get unique sequence IDs for faster processing
-            unique_sequences = filtered_data['mimic_gene'].unique()
-            
-            # Limit number of sequences if specified
-            if max_sequences and len(unique_sequences) > max_sequences:
-                unique_sequences = unique_sequences[:max_sequences]
-                filtered_data = filtered_data[filtered_data['mimic_gene'].isin(unique_sequences)]
-            
-            # Pre-process: Group data by sequence ID for faster access
-            # Use dictionary groupby instead of pandas groupby for better performance
-            sequence_groups = {}
-            for _, row in filtered_data.iterrows():
-                seq_id = row['mimic_gene']
-                if seq_id not in sequence_groups:
-                    sequence_groups[seq_id] = []
-                sequence_groups[seq_id].append(row)
-            
-            # Create data structures to store binding positions and valid sequences
-            binding_positions_data = []
+            # Pre-process: get the unique sequence IDs (in order of first appearance), map each
+            # one to the positions of its rows and pull the needed columns out once, instead of
+            # materializing a row object per binding
+            if use_polars:
+                unique_sequences = filtered_pl['mimic_gene'].unique(maintain_order=True).to_list()
+                
+                # Limit number of sequences if specified
+                if max_sequences and len(unique_sequences) > max_sequences:
+                    unique_sequences = unique_sequences[:max_sequences]
+                    filtered_pl = filtered_pl.filter(pl.col('mimic_gene').is_in(unique_sequences))
+                
+                grouped = (filtered_pl.with_row_index('row')
+                           .group_by('mimic_gene', maintain_order=True)
+                           .agg(pl.col('row')))
+                sequence_groups = dict(zip(grouped['mimic_gene'].to_list(), grouped['row'].to_list()))
+                
+                def column_values(column):
+                    if column not in filtered_pl.columns:
+                        return [None] * filtered_pl.height
+                    return filtered_pl[column].to_list()
+            else:
+                unique_sequences = filtered_data['mimic_gene'].unique()
+                
+                # Limit number of sequences if specified
+                if max_sequences and len(unique_sequences) > max_sequences:
+                    unique_sequences = unique_sequences[:max_sequences]
+                    filtered_data = filtered_data.loc[filtered_data['mimic_gene'].isin(unique_sequences), analysis_columns]
+                
+                sequence_groups = {
+                    seq_id: rows.tolist()
+                    for seq_id, rows in filtered_data.groupby('mimic_gene', sort=False).indices.items()
+                }
+                
+                def column_values(column):
+                    if column not in filtered_data.columns:
+                        return [None] * len(filtered_data)
+                    return filtered_data[column].tolist()
+            
+            peptides = column_values('mimic_Peptide')
+            has_affinity = 'mimic_Aff(nM)' in analysis_columns
+            affinities = np.asarray(column_values('mimic_Aff(nM)'), dtype=np.float64) if has_affinity else None
+            
+            # Located bindings, stored column-wise: the filtered row each came from and its
+            # start/end in the sequence. A sequence's bindings are contiguous, so they are
+            # addressed by (first, stop) ranges
+            binding_rows = []
+            binding_starts = []
+            binding_ends = []
+            binding_bounds = {}
             valid_sequence_ids = []
             
             # Use optimized batch sequences retrieval
@@ -1199,8 +2863,8 @@ class MimicDataProcessor:
                             progress_callback(progress)
                     
                     # Get sequence rows
-                    sequence_rows = sequence_groups.get(sequence_id, [])
-                    if not sequence_rows:
+                    rows = sequence_groups.get(sequence_id)
+                    if not rows:
                         continue
                     
                     # Get sequence
@@ -1210,28 +2874,30 @@ class MimicDataProcessor:
                     
                     valid_sequence_ids.append(sequence_id)
                     
-                    # Process all peptides for this sequence at once
-                    for row in sequence_rows:
-                        peptide = row.get('mimic_Peptide', '')
+                    # Locate all peptides for this sequence at once
+                    peptide_positions = find_peptide_positions(
+                        sequence, (peptides[row] for row in rows if isinstance(peptides[row], str))
+                    )
+                    
+                    first_binding = len(binding_rows)
+                    for row in rows:
+                        peptide = peptides[row]
                         if not peptide or not isinstance(peptide, str):
                             continue
                         
-                        position = sequence.find(peptide)
+                        position = peptide_positions[peptide]
                         if position >= 0:
-                            binding_positions_data.append({
-                                'sequence_id': sequence_id,
-                                'peptide': peptide,
-                                'start': position,
-                                'end': position + len(peptide) - 1,
-                                'affinity': row.get('mimic_Aff(nM)'),
-                                'mhc_type': row.get('MHC'),
-                                'bind_level': row.get('mimic_BindLevel')
-                            })
-            
-            # Use numpy for faster data processing
-            # Convert binding positions to structured numpy array for more efficient processing
-            if not binding_positions_data:
-                tracemalloc.stop()
+                            binding_rows.append(row)
+                            binding_starts.append(position)
+                            binding_ends.append(position + len(peptide) - 1)
+                    
+                    if len(binding_rows) > first_binding:
+                        binding_bounds[sequence_id] = (first_binding, len(binding_rows))
+            
+            # Skip if no peptide was located in its sequence
+            if not binding_rows:
+                if trace_memory:
+                    tracemalloc.stop()
                 if progress_callback:
                     progress_callback(100)
                 return {
@@ -1245,40 +2911,28 @@ class MimicDataProcessor:
                     'binding_level': binding_level
                 }
             
-            # Convert to DataFrame for compatibility with downstream code
-            binding_df = pd.DataFrame(binding_positions_data)
-            
             # Update progress to 30%
             progress = 30
             if progress_callback:
                 progress_callback(progress)
             
-            # Get valid sequence set
-            valid_sequence_set = set(binding_df['sequence_id'].unique())
+            # Get valid sequence set (counts only; iteration follows binding_bounds so the
+            # batches, and the order of tied domains in the summaries, are the same every run)
+            valid_sequence_set = set(binding_bounds)
             
-            # Create optimized domain data structure
-            # Pre-index domains by sequence ID for faster access
-            sequence_to_domains = defaultdict(list)
-            
-            # Only process domains for sequences with binding positions
-            for seq_id in valid_sequence_set:
-                pfam_domains = self.pfam_map.get(str(seq_id), [])
-                for domain in pfam_domains:
-                    if not isinstance(domain, dict) or 'start' not in domain or 'end' not in domain:
-                        continue
-                        
-                    sequence_to_domains[seq_id].append({
-                        'sequence_id': seq_id,
-                        'domain_name': domain.get('hmm_name', 'unknown'),
-                        'start': domain.get('start', 0),
-                        'end': domain.get('end', 0),
-                        'bitscore': domain.get('bitscore', 0),
-                        'e_value': domain.get('e_value', 1.0)
-                    })
+            # Domains are read straight from the PFAM map's column arrays: each sequence with
+            # binding positions is addressed by its range of rows there
+            domain_map = self.pfam_map
+            domain_bounds = {}
+            for seq_id in binding_bounds:
+                first, stop = domain_map.row_range(str(seq_id))
+                if stop > first:
+                    domain_bounds[seq_id] = (first, stop)
             
             # Skip if no valid domains found
-            if not any(sequence_to_domains.values()):
-                tracemalloc.stop()
+            if not domain_bounds:
+                if trace_memory:
+                    tracemalloc.stop()
                 if progress_callback:
                     progress_callback(100)
                 return {
@@ -1297,103 +2951,106 @@ class MimicDataProcessor:
             if progress_callback:
                 progress_callback(progress)
             
-            # Pre-index bindings by sequence ID
-            # Fast bindings lookup dictionary
-            bindings_by_sequence = defaultdict(list)
-            for _, binding in binding_df.iterrows():
-                seq_id = binding['sequence_id']
-                bindings_by_sequence[seq_id].append({
-                    'peptide': binding['peptide'],
-                    'start': binding['start'],
-                    'end': binding['end'],
-                    'affinity': binding['affinity'],
-                    'mhc_type': binding['mhc_type'],
-                    'bind_level': binding['bind_level']
-                })
-            
-            # Define an optimized intersection function that works on batches
-            def find_domain_binding_intersections(sequence_id_batch):
-                results = []
-                
-                for seq_id in sequence_id_batch:
-                    # Get domains and bindings for this sequence
-                    domains = sequence_to_domains.get(seq_id, [])
-                    bindings = bindings_by_sequence.get(seq_id, [])
-                    
-                    if not domains or not bindings:
-                        continue
-                    
-                    # For each domain, find bindings that intersect with it
-                    for domain in domains:
-                        domain_start = domain['start']
-                        domain_end = domain['end']
-                        
-                        # Check each binding for intersection
-                        for binding in bindings:
-                            binding_start = binding['start']
-                            binding_end = binding['end']
-                            
-                            # Check if they overlap
-                            if binding_start <= domain_end and binding_end >= domain_start:
-                                # Calculate overlap percentage
-                                overlap_start = max(binding_start, domain_start)
-                                overlap_end = min(binding_end, domain_end)
-                                overlap_length = overlap_end - overlap_start + 1
-                                binding_length = binding_end - binding_start + 1
-                                overlap_pct = (overlap_length / binding_length) * 100
-                                
-                                # Only count if overlap is significant (more than 50%)
-                                if overlap_pct >= 50:
-                                    results.append({
-                                        'sequence_id': seq_id,
-                                        'domain': domain['domain_name'],
-                                        'domain_start': domain_start,
-                                        'domain_end': domain_end,
-                                        'binding': binding,
-                                        'overlap_pct': overlap_pct,
-                                        'bitscore': domain['bitscore'],
-                                        'e_value': domain['e_value']
-                                    })
-                
-                return results
-            
-            # Optimize parallelism based on data size and CPU cores
-            num_workers = min(mp.cpu_count(), 8)
+            binding_rows = np.array(binding_rows, dtype=np.intp)
+            binding_starts = np.array(binding_starts, dtype=np.int32)
+            binding_ends = np.array(binding_ends, dtype=np.int32)
+            
+            # Only sequences with both domains and bindings can intersect
+            sequence_ids = [seq_id for seq_id in binding_bounds if seq_id in domain_bounds]
             
-            # Split sequences into batches for parallel processing
-            sequence_batches = np.array_split(list(valid_sequence_set), num_workers)
+            # Without Numba the intersection work is pure Python/NumPy on small arrays and holds
+            # the GIL, so large analyses are spread over processes; small ones are not worth the
+            # startup. The compiled kernel is fast enough that shipping batches would dominate
+            num_workers = min(mp.cpu_count(), 8)
+            if HAS_NUMBA or len(sequence_ids) < PARALLEL_INTERSECTION_MIN_SEQUENCES:
+                num_workers = 1
+            
+            # Split sequences into batches, each shipped with just its own row ranges
+            num_batches = num_workers * INTERSECTION_BATCHES_PER_WORKER if num_workers > 1 else 1
+            sequence_batches = [sequence_ids[i::num_batches] for i in range(num_batches)]
+            
+            # Process in parallel with improved work distribution and progress tracking;
+            # each batch returns its hits as column arrays, kept as compact integer columns
+            # (sequences by position in sequence_ids) until one aggregation pass at the end
+            batch_hits = {}  # batch index -> (sequence positions, domain rows, binding rows)
+            
+            def batch_args(batch_idx):
+                batch = sequence_batches[batch_idx]
+                return (batch,
+                        {seq_id: domain_bounds[seq_id] for seq_id in batch}, domain_map.starts, domain_map.ends,
+                        {seq_id: binding_bounds[seq_id] for seq_id in batch}, binding_starts, binding_ends)
+            
+            def store_batch(batch_idx, batch_results):
+                # Batch i holds sequence_ids[i::num_batches]
+                batch_hits[batch_idx] = (
+                    batch_idx + batch_results['sequence_index'].astype(np.int64) * num_batches,
+                    batch_results['domain_rows'],
+                    batch_results['binding_rows']
+                )
             
-            # Process in parallel with improved work distribution and progress tracking
-            all_results = []
-            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            if num_workers > 1:
+                executor_context = contextlib.nullcontext(self._get_intersection_pool(num_workers))
+            else:
+                executor_context = ThreadPoolExecutor(max_workers=1)
+            lost_batches = []  # Batches whose worker process died
+            with executor_context as executor:
                 # Submit all tasks at once
-                future_to_batch = {executor.submit(find_domain_binding_intersections, batch): i 
-                                  for i, batch in enumerate(sequence_batches)}
+                try:
+                    future_to_batch = {
+                        executor.submit(_find_domain_binding_intersections, *batch_args(i)): i
+                        for i in range(len(sequence_batches))
+                    }
+                except BrokenProcessPool:
+                    # A worker died after the last analysis; start over on a new pool
+                    self._discard_intersection_pool(executor)
+                    executor = self._get_intersection_pool(num_workers)
+                    future_to_batch = {
+                        executor.submit(_find_domain_binding_intersections, *batch_args(i)): i
+                        for i in range(len(sequence_batches))
+                    }
                 
-                # Process results as they complete (instead of waiting for each one)
+                # Process results as they complete (instead of waiting for each one);
+                # progress follows the number of finished batches, not their submission order
+                completed_batches = 0
                 for future in as_completed(future_to_batch):
                     batch_idx = future_to_batch[future]
+                    completed_batches += 1
                     try:
-                        batch_results = future.result()
-                        all_results.extend(batch_results)
+                        store_batch(batch_idx, future.result())
                         
                         # Update progress more smoothly
                         if progress_callback:
-                            new_progress = 40 + int((batch_idx + 1) / num_workers * 50)
+                            new_progress = 40 + int(completed_batches / len(future_to_batch) * 50)
                             if new_progress > progress:
                                 progress = new_progress
                                 progress_callback(progress)
+                    except BrokenProcessPool:
+                        lost_batches.append(batch_idx)
                     except Exception as e:
                         print(f"Error processing batch {batch_idx}: {e}")
             
+            # A crashed worker breaks the whole pool: replace it for later analyses and
+            # finish the batches it lost in this process
+            if lost_batches:
+                print(f"Intersection worker process died; processing {len(lost_batches)} batches directly")
+                self._discard_intersection_pool(executor)
+                for batch_idx in sorted(lost_batches):
+                    store_batch(batch_idx, _find_domain_binding_intersections(*batch_args(batch_idx)))
+            
             # Update progress to 90%
             progress = 90
             if progress_callback:
                 progress_callback(progress)
             
+            # Combine in batch order so the result does not depend on completion order
+            hit_seq_pos_chunks, hit_domain_row_chunks, hit_binding_chunks = (
+                zip(*(batch_hits[i] for i in sorted(batch_hits))) if batch_hits else ((), (), ())
+            )
+            
             # Skip if no intersections found
-            if not all_results:
-                tracemalloc.stop()
+            if not any(len(chunk) for chunk in hit_domain_row_chunks):
+                if trace_memory:
+                    tracemalloc.stop()
                 if progress_callback:
                     progress_callback(100)
                 return {
@@ -1407,62 +3064,74 @@ class MimicDataProcessor:
                     'binding_level': binding_level
                 }
             
-            # Use Counter for domain statistics - much faster than pandas groupby
-            domain_counter = Counter()
-            domain_seq_counter = defaultdict(set)  # Using sets instead of Counter for sequence IDs
-            domain_bitscore_sum = defaultdict(float)
-            domain_bitscore_count = defaultdict(int)
-            domain_affinity_sum = defaultdict(float)
-            domain_affinity_count = defaultdict(int)
-            domain_sequences = defaultdict(set)
-            
-            # Process results with a single pass through the data
-            for result in all_results:
-                domain = result['domain']
-                domain_counter[domain] += 1
-                domain_seq_counter[domain].add(result['sequence_id'])  # Add to set instead of using |=
-                
-                # Track bitscore
-                if 'bitscore' in result and result['bitscore'] is not None:
-                    domain_bitscore_sum[domain] += result['bitscore']
-                    domain_bitscore_count[domain] += 1
-                
-                # Track affinity
-                if 'binding' in result and isinstance(result['binding'], dict) and 'affinity' in result['binding']:
-                    affinity = result['binding']['affinity']
-                    if affinity is not None:
-                        domain_affinity_sum[domain] += affinity
-                        domain_affinity_count[domain] += 1
-                
-                # Track sequences (limited to 100 per domain)
-                if len(domain_sequences[domain]) < 100:
-                    domain_sequences[domain].add(result['sequence_id'])
-            
-            # Calculate domain summaries directly from counters
-            domain_summaries = []
-            for domain in domain_counter:
-                # Calculate averages
-                avg_bitscore = domain_bitscore_sum[domain] / domain_bitscore_count[domain] if domain_bitscore_count[domain] > 0 else 0
-                avg_affinity = domain_affinity_sum[domain] / domain_affinity_count[domain] if domain_affinity_count[domain] > 0 else 0
-                
-                domain_summary = {
+            # Aggregate the hits per domain column-wise: domains and sequences are factorized
+            # (in order of first appearance) and the per-domain sums are single bincounts
+            hit_domain_rows = np.concatenate(hit_domain_row_chunks)
+            hit_bindings = np.concatenate(hit_binding_chunks)
+            domain_codes, domain_name_codes = pd.factorize(domain_map.name_codes[hit_domain_rows], sort=False)
+            domain_names = domain_map.name_table[domain_name_codes]
+            seq_codes, seq_positions = pd.factorize(np.concatenate(hit_seq_pos_chunks))
+            seq_names = np.array(sequence_ids, dtype=object)[seq_positions]
+            num_domains = len(domain_names)
+            
+            binding_counts = np.bincount(domain_codes, minlength=num_domains)
+            bitscore_sums = np.bincount(domain_codes, minlength=num_domains,
+                                        weights=domain_map.bitscores[hit_domain_rows])
+            if has_affinity:
+                affinity_sums = np.bincount(domain_codes, minlength=num_domains,
+                                            weights=affinities[binding_rows[hit_bindings]])
+            
+            # Distinct (domain, sequence) pairs, in order of first appearance
+            pair_keys = domain_codes.astype(np.int64) * len(seq_names) + seq_codes
+            _, first_hits = np.unique(pair_keys, return_index=True)
+            first_hits.sort()
+            pair_domains = domain_codes[first_hits]
+            sequence_counts = np.bincount(pair_domains, minlength=num_domains)
+            
+            # Track sequences (limited to 100 per domain): a stable sort groups the pairs by
+            # domain, each pair's rank within its group decides whether it is kept
+            pair_order = np.argsort(pair_domains, kind='stable')
+            group_starts = np.concatenate(([0], np.cumsum(sequence_counts)[:-1]))
+            pair_ranks = np.arange(len(pair_order)) - group_starts[pair_domains[pair_order]]
+            kept_pairs = first_hits[pair_order[pair_ranks < 100]]
+            kept_sequences = seq_names[seq_codes[kept_pairs]]
+            domain_sequences = [
+                chunk.tolist()
+                for chunk in np.split(kept_sequences, np.cumsum(np.minimum(sequence_counts, 100))[:-1])
+            ]
+            
+            # Calculate domain summaries from the per-domain columns; every domain here has
+            # at least one binding, so the averages need no zero guard
+            pct_scale = 100.0 / len(valid_sequence_set) if valid_sequence_set else 0.0
+            pct_of_sequences = sequence_counts * pct_scale
+            avg_bitscores = bitscore_sums / binding_counts
+            avg_affinities = affinity_sums / binding_counts if has_affinity else np.zeros(num_domains)
+            domain_counter = dict(zip(domain_names.tolist(), binding_counts.tolist()))
+            domain_summaries = [
+                {
                     'domain': domain,
-                    'binding_count': domain_counter[domain],
-                    'sequence_count': len(domain_seq_counter[domain]),
-                    'pct_of_sequences': (len(domain_seq_counter[domain]) / len(valid_sequence_set) * 100) if len(valid_sequence_set) > 0 else 0,
-                    'avg_bitscore': float(avg_bitscore),
-                    'avg_affinity': float(avg_affinity),
-                    'sequences': list(domain_sequences[domain])
+                    'binding_count': binding_count,
+                    'sequence_count': sequence_count,
+                    'pct_of_sequences': pct,
+                    'avg_bitscore': avg_bitscore,
+                    'avg_affinity': avg_affinity,
+                    'sequences': sequences
                 }
-                domain_summaries.append(domain_summary)
+                for domain, binding_count, sequence_count, pct, avg_bitscore, avg_affinity, sequences in zip(
+                    domain_names.tolist(), binding_counts.tolist(), sequence_counts.tolist(),
+                    pct_of_sequences.tolist(), avg_bitscores.tolist(), avg_affinities.tolist(),
+                    domain_sequences
+                )
+            ]
             
             # Sort domain summaries by binding count (descending)
             domain_summaries.sort(key=lambda x: x['binding_count'], reverse=True)
             
             # Report memory usage
-            current, peak = tracemalloc.get_traced_memory()
-            print(f"Current memory usage: {current / 10**6:.1f} MB; Peak: {peak / 10**6:.1f} MB")
-            tracemalloc.stop()
+            if trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                print(f"Current memory usage: {current / 10**6:.1f} MB; Peak: {peak / 10**6:.1f} MB")
+                tracemalloc.stop()
             
             # Update progress to 100%
             if progress_callback:
@@ -1471,9 +3140,9 @@ class MimicDataProcessor:
             print(f"Domain binding analysis completed in {time.time() - start_time:.2f}s")
             
             # Return comprehensive results
-            return {
+            result = {
                 'total_sequences': len(valid_sequence_set),
-                'domain_binding_counts': dict(domain_counter),
+                'domain_binding_counts': domain_counter,
                 'domain_summaries': domain_summaries,
                 'processed_sequences': processed_count,
                 'total_unique_sequences': len(valid_sequence_set),
@@ -1481,6 +3150,11 @@ class MimicDataProcessor:
                 'binding_threshold': binding_affinity_threshold,
                 'binding_level': binding_level
             }
+            with self._intersection_cache_lock:
+                self._intersection_cache[cache_key] = copy.deepcopy(result)
+                while len(self._intersection_cache) > INTERSECTION_CACHE_SIZE:
+                    self._intersection_cache.popitem(last=False)
+            return result
             
         except Exception as e:
             # If anything goes wrong, return basic error info
@@ -1488,10 +3162,8 @@ class MimicDataProcessor:
             print(f"Error analyzing binding domain intersections: {e}")
             print(traceback.format_exc())
             
-            try:
+            if trace_memory:
                 tracemalloc.stop()
-            except:
-                pass
                 
             if progress_callback:
                 progress_callback(100)  # Complete the progress bar even on error
@@ -1508,53 +3180,17 @@ class MimicDataProcessor:
         """
         Load sequence lengths from all FASTA files in the data directory.
         This is more accurate than estimating from domain positions.
-        """
-        import os
         
-        fasta_files = [f for f in os.listdir(self.data_dir) if f.endswith('.faa') or f.endswith('.fasta')]
+        The lengths come from the sequence cache's index, which scans each file as
+        one memory-mapped block (or reuses the on-disk index) instead of parsing it
+        line by line a second time.
+        """
+        sequence_lengths = self.sequence_cache.sequence_lengths
         
-        if not fasta_files:
-            print("No FASTA files found in the data directory.")
+        if not sequence_lengths:
+            print("No FASTA sequence lengths found in the data directory.")
             return
         
-        print(f"Loading sequence lengths from FASTA files: {fasta_files}")
-        
-        # Dictionary to store sequence lengths
-        sequence_lengths = {}
-        
-        # Process each FASTA file
-        for fasta_file in fasta_files:
-            file_path = os.path.join(self.data_dir, fasta_file)
-            try:
-                with open(file_path, 'r') as f:
-                    current_id = None
-                    current_seq = []
-                    
-                    for line in f:
-                        line = line.strip()
-                        if line.startswith('>'):
-                            # Store the length of the previous sequence if we have one
-                            if current_id is not None and current_seq:
-                                seq_length = len(''.join(current_seq))
-                                sequence_lengths[current_id] = seq_length
-                            
-                            # Parse the ID from the header line
-                            header_parts = line[1:].split()
-                            current_id = header_parts[0] if header_parts else ""
-                            current_seq = []
-                        else:
-                            # Add this line to the current sequence
-                            current_seq.append(line)
-                    
-                    # Don't forget to store the last sequence
-                    if current_id is not None and current_seq:
-                        seq_length = len(''.join(current_seq))
-                        sequence_lengths[current_id] = seq_length
-                
-                print(f"Loaded {len(sequence_lengths)} sequence lengths from {fasta_file}")
-            except Exception as e:
-                print(f"Error reading FASTA file {fasta_file}: {e}")
-        
         # Update the global dictionary with the lengths
         self.metagenome_sequence_lengths.update(sequence_lengths)
         print(f"Total sequences with lengths: {len(self.metagenome_sequence_lengths)}")
@@ -1590,14 +3226,14 @@ class MimicDataProcessor:
         """
         Calculate global domain frequencies from all available data.
         
+        The frequencies are cached until the domain maps or merged_data change.
+        
         Returns:
             dict: Dictionary with PFAM and KOFAM domain frequencies
         """
-        # Domain frequency counters
-        pfam_better_binders_freq = {}  # For better binders
-        pfam_metagenome_freq = {}      # For metagenome
-        kofam_better_binders_freq = {}
-        kofam_metagenome_freq = {}
+        cache_key = (id(self.merged_data), self._merged_version)
+        if self._domain_freqs_cache is not None and self._domain_freqs_cache[0] == cache_key:
+            return {source: dict(freqs) for source, freqs in self._domain_freqs_cache[1].items()}
         
         # Get all unique genes/sequences
         if self.merged_data is not None:
@@ -1617,67 +3253,44 @@ class MimicDataProcessor:
             # Remove duplicates
             all_genes = list(set(all_genes))
         
-        print(f"DEBUG: Calculating global domain frequencies for {len(all_genes)} genes")
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Calculating global domain frequencies for {len(all_genes)} genes")
         
-        # Count domains across all genes
-        for gene in all_genes:
-            # Count PFAM better binders domains
-            if hasattr(self, 'pfam_map'):
-                pfam_domains = self.pfam_map.get(str(gene), [])
-                for domain in pfam_domains:
-                    if isinstance(domain, dict) and 'hmm_name' in domain:
-                        domain_name = domain['hmm_name']
-                        if domain_name not in pfam_better_binders_freq:
-                            pfam_better_binders_freq[domain_name] = 0
-                        pfam_better_binders_freq[domain_name] += 1
-            
-            # Count KOFAM better binders domains
-            if hasattr(self, 'kofam_map'):
-                kofam_domains = self.kofam_map.get(str(gene), [])
-                for domain in kofam_domains:
-                    if isinstance(domain, dict) and 'hmm_name' in domain:
-                        domain_name = domain['hmm_name']
-                        if domain_name not in kofam_better_binders_freq:
-                            kofam_better_binders_freq[domain_name] = 0
-                        kofam_better_binders_freq[domain_name] += 1
-            
-            # Count PFAM metagenome domains
-            if hasattr(self, 'pfam_metagenome_map'):
-                pfam_meta_domains = self.pfam_metagenome_map.get(str(gene), [])
-                for domain in pfam_meta_domains:
-                    if isinstance(domain, dict) and 'hmm_name' in domain:
-                        domain_name = domain['hmm_name']
-                        if domain_name not in pfam_metagenome_freq:
-                            pfam_metagenome_freq[domain_name] = 0
-                        pfam_metagenome_freq[domain_name] += 1
-            
-            # Count KOFAM metagenome domains
-            if hasattr(self, 'kofam_metagenome_map'):
-                kofam_meta_domains = self.kofam_metagenome_map.get(str(gene), [])
-                for domain in kofam_meta_domains:
-                    if isinstance(domain, dict) and 'hmm_name' in domain:
-                        domain_name = domain['hmm_name']
-                        if domain_name not in kofam_metagenome_freq:
-                            kofam_metagenome_freq[domain_name] = 0
-                        kofam_metagenome_freq[domain_name] += 1
+        gene_keys = [str(gene) for gene in all_genes]
         
-        # DEBUG information about the counts
-        print(f"DEBUG: PFAM better binders domain counts: {len(pfam_better_binders_freq)} unique domains")
-        print(f"DEBUG: PFAM metagenome domain counts: {len(pfam_metagenome_freq)} unique domains")
-        print(f"DEBUG: KOFAM better binders domain counts: {len(kofam_better_binders_freq)} unique domains")
-        print(f"DEBUG: KOFAM metagenome domain counts: {len(kofam_metagenome_freq)} unique domains")
+        def count_domains(map_name):
+            # Counted on the map's interned name codes
+            if not hasattr(self, map_name):
+                return {}
+            return getattr(self, map_name).name_counts(gene_keys)
         
-        # Show some sample domains if available
-        if pfam_better_binders_freq:
-            sample_pfam = list(pfam_better_binders_freq.items())[:3]
-            print(f"DEBUG: Sample PFAM domains: {sample_pfam}")
+        # Count domains across all genes
+        pfam_better_binders_freq = count_domains('pfam_map')  # For better binders
+        kofam_better_binders_freq = count_domains('kofam_map')
+        pfam_metagenome_freq = count_domains('pfam_metagenome_map')  # For metagenome
+        kofam_metagenome_freq = count_domains('kofam_metagenome_map')
         
-        return {
+        # DEBUG information about the counts
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: PFAM better binders domain counts: {len(pfam_better_binders_freq)} unique domains")
+            print(f"DEBUG: PFAM metagenome domain counts: {len(pfam_metagenome_freq)} unique domains")
+            print(f"DEBUG: KOFAM better binders domain counts: {len(kofam_better_binders_freq)} unique domains")
+            print(f"DEBUG: KOFAM metagenome domain counts: {len(kofam_metagenome_freq)} unique domains")
+            
+            # Show some sample domains if available
+            if pfam_better_binders_freq:
+                sample_pfam = list(pfam_better_binders_freq.items())[:3]
+                print(f"DEBUG: Sample PFAM domains: {sample_pfam}")
+        
+        frequencies = {
             'pfam_better_binders': pfam_better_binders_freq,
             'pfam_metagenome': pfam_metagenome_freq,
             'kofam_better_binders': kofam_better_binders_freq,
             'kofam_metagenome': kofam_metagenome_freq
         }
+        self._domain_freqs_cache = (cache_key, {source: dict(freqs) for source, freqs in frequencies.items()})
+        
+        return frequencies
     
     def get_cancer_data(self, cancer_acc):
         """
@@ -1711,150 +3324,85 @@ class MimicDataProcessor:
         pfam_domain_counts = {}
         kofam_domain_counts = {}
         
+        def add_gene_domains(domain_counts, domain_map, gene, gene_key, prefix='', is_metagenome=False):
+            # Read the gene's hits straight from the map's columns; one dict probe per hit
+            first, stop = domain_map.row_range(gene_key)
+            hits = zip(
+                domain_map.name_table[domain_map.name_codes[first:stop]].tolist(),
+                domain_map.e_values[first:stop].tolist(),
+                domain_map.bitscores[first:stop].tolist()
+            )
+            for hmm_name, e_value, bitscore in hits:
+                domain_name = prefix + hmm_name
+                entry = domain_counts.get(domain_name)
+                if entry is None:
+                    entry = domain_counts[domain_name] = {
+                        'domain': domain_name,
+                        'count': 0,
+                        'genes': [],
+                        'e_values': [],
+                        'bitscores': []
+                    }
+                    if is_metagenome:
+                        entry['is_metagenome'] = True
+                
+                entry['count'] += 1
+                entry['genes'].append(gene)
+                entry['e_values'].append(e_value)
+                entry['bitscores'].append(bitscore)
+        
         # Extract and count domains from associated mimic genes
         for gene in mimic_genes:
+            gene_key = str(gene)  # Domain maps are keyed by string IDs
+            
             # Get PFAM better binders domains with error handling
             try:
-                pfam_domains = self.pfam_map.get(str(gene), [])
-                if not isinstance(pfam_domains, list):
-                    pfam_domains = []
-                    
-                for domain in pfam_domains:
-                    if not isinstance(domain, dict) or 'hmm_name' not in domain:
-                        continue
-                    
-                    domain_name = domain['hmm_name']
-                    if domain_name not in pfam_domain_counts:
-                        pfam_domain_counts[domain_name] = {
-                            'count': 0, 
-                            'genes': [],
-                            'e_values': [],
-                            'bitscores': []
-                        }
-                    
-                    pfam_domain_counts[domain_name]['count'] += 1
-                    pfam_domain_counts[domain_name]['genes'].append(gene)
-                    pfam_domain_counts[domain_name]['e_values'].append(domain.get('e_value', 1.0))
-                    pfam_domain_counts[domain_name]['bitscores'].append(domain.get('bitscore', 0.0))
-                    
+                add_gene_domains(pfam_domain_counts, self.pfam_map, gene, gene_key)
             except Exception as e:
                 print(f"Error processing PFAM domains for cancer {cancer_acc}, gene {gene}: {e}")
             
             # Get KOFAM better binders domains with error handling
             try:
-                kofam_domains = self.kofam_map.get(str(gene), [])
-                if not isinstance(kofam_domains, list):
-                    kofam_domains = []
-                    
-                for domain in kofam_domains:
-                    if not isinstance(domain, dict) or 'hmm_name' not in domain:
-                        continue
-                    
-                    domain_name = domain['hmm_name']
-                    if domain_name not in kofam_domain_counts:
-                        kofam_domain_counts[domain_name] = {
-                            'count': 0, 
-                            'genes': [],
-                            'e_values': [],
-                            'bitscores': []
-                        }
-                    
-                    kofam_domain_counts[domain_name]['count'] += 1
-                    kofam_domain_counts[domain_name]['genes'].append(gene)
-                    kofam_domain_counts[domain_name]['e_values'].append(domain.get('e_value', 1.0))
-                    kofam_domain_counts[domain_name]['bitscores'].append(domain.get('bitscore', 0.0))
-                    
+                add_gene_domains(kofam_domain_counts, self.kofam_map, gene, gene_key)
             except Exception as e:
                 print(f"Error processing KOFAM domains for cancer {cancer_acc}, gene {gene}: {e}")
                 
-            # Get PFAM metagenome domains if available
+            # Get metagenome domains if available, prefixed to avoid collisions with better
+            # binders domains
             if hasattr(self, 'pfam_metagenome_map'):
                 try:
-                    pfam_meta_domains = self.pfam_metagenome_map.get(str(gene), [])
-                    if not isinstance(pfam_meta_domains, list):
-                        pfam_meta_domains = []
-                        
-                    for domain in pfam_meta_domains:
-                        if not isinstance(domain, dict) or 'hmm_name' not in domain:
-                            continue
-                        
-                        domain_name = domain['hmm_name']
-                        # Add a prefix to avoid collisions with better binders domains
-                        domain_name = "META_" + domain_name
-                        
-                        if domain_name not in pfam_domain_counts:
-                            pfam_domain_counts[domain_name] = {
-                                'count': 0, 
-                                'genes': [],
-                                'e_values': [],
-                                'bitscores': [],
-                                'is_metagenome': True
-                            }
-                        
-                        pfam_domain_counts[domain_name]['count'] += 1
-                        pfam_domain_counts[domain_name]['genes'].append(gene)
-                        pfam_domain_counts[domain_name]['e_values'].append(domain.get('e_value', 1.0))
-                        pfam_domain_counts[domain_name]['bitscores'].append(domain.get('bitscore', 0.0))
-                        
+                    add_gene_domains(pfam_domain_counts, self.pfam_metagenome_map, gene, gene_key,
+                                     prefix="META_", is_metagenome=True)
                 except Exception as e:
                     print(f"Error processing PFAM metagenome domains for cancer {cancer_acc}, gene {gene}: {e}")
             
-            # Get KOFAM metagenome domains if available
             if hasattr(self, 'kofam_metagenome_map'):
                 try:
-                    kofam_meta_domains = self.kofam_metagenome_map.get(str(gene), [])
-                    if not isinstance(kofam_meta_domains, list):
-                        kofam_meta_domains = []
-                        
-                    for domain in kofam_meta_domains:
-                        if not isinstance(domain, dict) or 'hmm_name' not in domain:
-                            continue
-                        
-                        domain_name = domain['hmm_name']
-                        # Add a prefix to avoid collisions with better binders domains
-                        domain_name = "META_" + domain_name
-                        
-                        if domain_name not in kofam_domain_counts:
-                            kofam_domain_counts[domain_name] = {
-                                'count': 0, 
-                                'genes': [],
-                                'e_values': [],
-                                'bitscores': [],
-                                'is_metagenome': True
-                            }
-                        
-                        kofam_domain_counts[domain_name]['count'] += 1
-                        kofam_domain_counts[domain_name]['genes'].append(gene)
-                        kofam_domain_counts[domain_name]['e_values'].append(domain.get('e_value', 1.0))
-                        kofam_domain_counts[domain_name]['bitscores'].append(domain.get('bitscore', 0.0))
-                        
+                    add_gene_domains(kofam_domain_counts, self.kofam_metagenome_map, gene, gene_key,
+                                     prefix="META_", is_metagenome=True)
                 except Exception as e:
                     print(f"Error processing KOFAM metagenome domains for cancer {cancer_acc}, gene {gene}: {e}")
         
-        # Get binding affinity statistics
+        # Get binding affinity statistics (computed on the columns; the row records are
+        # only built below for the page's binding table)
         try:
-            binding_data = cancer_rows.to_dict(orient='records')
-            
-            # Calculate binding affinity statistics
-            binding_affinities = []
-            for binding in binding_data:
-                if 'mimic_Aff(nM)' in binding:
-                    try:
-                        aff = float(binding['mimic_Aff(nM)'])
-                        if not pd.isna(aff) and not pd.isinf(aff) and aff > 0:
-                            binding_affinities.append(aff)
-                    except (ValueError, TypeError):
-                        continue
+            # Calculate binding affinity statistics over the valid (finite, positive) values
+            if 'mimic_Aff(nM)' in cancer_rows.columns:
+                binding_affinities = pd.to_numeric(cancer_rows['mimic_Aff(nM)'], errors='coerce').to_numpy(dtype=np.float64)
+                binding_affinities = binding_affinities[np.isfinite(binding_affinities) & (binding_affinities > 0)]
+            else:
+                binding_affinities = np.empty(0, dtype=np.float64)
                         
             # Calculate statistics if we have data
-            if binding_affinities:
+            if len(binding_affinities) > 0:
+                sorted_affinities = np.sort(binding_affinities)
                 affinity_stats = {
-                    'min': min(binding_affinities),
-                    'max': max(binding_affinities),
-                    'mean': sum(binding_affinities) / len(binding_affinities),
-                    'median': sorted(binding_affinities)[len(binding_affinities) // 2],
+                    'min': float(sorted_affinities[0]),
+                    'max': float(sorted_affinities[-1]),
+                    'mean': float(binding_affinities.mean()),
+                    'median': float(sorted_affinities[len(sorted_affinities) // 2]),
                     'count': len(binding_affinities),
-                    'data': binding_affinities
+                    'data': binding_affinities.tolist()
                 }
             else:
                 affinity_stats = {
@@ -1866,20 +3414,15 @@ class MimicDataProcessor:
                     'data': []
                 }
                 
-            # Count binding levels
-            binding_levels = {}
-            for binding in binding_data:
-                level = binding.get('mimic_BindLevel', 'Unknown')
-                if not isinstance(level, str):
-                    level = str(level)
-                
-                if level not in binding_levels:
-                    binding_levels[level] = 0
-                binding_levels[level] += 1
+            # Count binding levels (missing levels are counted as 'nan')
+            if 'mimic_BindLevel' in cancer_rows.columns:
+                levels = cancer_rows['mimic_BindLevel'].astype(object).fillna('nan')
+                binding_levels = {str(level): int(count) for level, count in levels.value_counts(sort=False).items()}
+            else:
+                binding_levels = {'Unknown': len(cancer_rows)}
                 
         except Exception as e:
             print(f"Error processing binding data for cancer {cancer_acc}: {e}")
-            binding_data = []
             affinity_stats = {
                 'min': 0,
                 'max': 0,
@@ -1890,123 +3433,76 @@ class MimicDataProcessor:
             }
             binding_levels = {}
         
+        binding_data = cancer_rows.to_dict(orient='records')
+        
         # Get global domain frequencies for comparison
-        print(f"DEBUG: Fetching global domain frequencies for cancer {cancer_acc}")
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Fetching global domain frequencies for cancer {cancer_acc}")
         global_freqs = self.get_global_domain_frequencies()
         
-        # Calculate domain enrichment (comparing cancer-specific domains to global frequencies)
-        pfam_enrichment = []
+        # Calculate domain enrichment (comparing cancer-specific domains to global frequencies);
+        # metagenome domains are not part of the comparison
+        enrichment_domains = [domain_name for domain_name, data in pfam_domain_counts.items()
+                              if not data.get('is_metagenome', False)]
+        global_pfam_freqs = global_freqs['pfam_better_binders']
+        
+        cancer_counts = np.array([pfam_domain_counts[domain_name]['count'] for domain_name in enrichment_domains],
+                                 dtype=np.int64)
+        global_counts = np.array([global_pfam_freqs.get(domain_name, 0) for domain_name in enrichment_domains],
+                                 dtype=np.int64)
         
         # Total number of PFAM domains in cancer
-        total_cancer_pfam = sum(data['count'] for data in pfam_domain_counts.values() 
-                               if not data.get('is_metagenome', False))
+        total_cancer_pfam = int(cancer_counts.sum())
         
         # Total number of PFAM domains globally
-        total_global_pfam = sum(global_freqs['pfam_better_binders'].values())
-        
-        print(f"DEBUG: Computing domain enrichment for cancer {cancer_acc}")
-        print(f"DEBUG: Total PFAM domains in cancer: {total_cancer_pfam}")
-        print(f"DEBUG: Total PFAM domains globally: {total_global_pfam}")
-        print(f"DEBUG: Number of PFAM domains to analyze: {sum(1 for d in pfam_domain_counts.items() if not d[1].get('is_metagenome', False))}")
-        
-        # Calculate enrichment for each PFAM domain
-        for domain_name, data in pfam_domain_counts.items():
-            # Skip metagenome domains
-            if data.get('is_metagenome', False):
-                print(f"DEBUG: Skipping metagenome domain {domain_name}")
-                continue
-                
-            # Get global frequency
-            global_count = global_freqs['pfam_better_binders'].get(domain_name, 0)
-            
-            print(f"DEBUG: Processing domain {domain_name} - cancer count: {data['count']}, global count: {global_count}")
-            
-            try:
-                # Always add enrichment data, even if we can't calculate a meaningful fold change
-                # This ensures we have at least some data in the enrichment array
-                
-                # First, make sure we have all the required data for the record
-                if not isinstance(data.get('genes', None), list):
-                    print(f"DEBUG: Fixing genes data for {domain_name}")
-                    data['genes'] = []
-                
-                if not isinstance(data.get('e_values', None), list):
-                    print(f"DEBUG: Fixing e_values data for {domain_name}")
-                    data['e_values'] = []
-                
-                if not isinstance(data.get('bitscores', None), list):
-                    print(f"DEBUG: Fixing bitscores data for {domain_name}")
-                    data['bitscores'] = []
-                
-                enrichment_data = {
-                    'domain': domain_name,
-                    'cancer_count': data['count'],
-                    'global_count': global_count,
-                    'cancer_fraction': 0,
-                    'global_fraction': 0,
-                    'enrichment': 1.0,  # Default to no enrichment
-                    'genes': data['genes'],
-                    'e_values': data['e_values'],
-                    'bitscores': data['bitscores']
-                }
-                
-                # Calculate enrichment score (fold change) if possible
-                if global_count > 0 and total_global_pfam > 0 and total_cancer_pfam > 0:
-                    # Calculate fractions
-                    cancer_fraction = data['count'] / total_cancer_pfam
-                    global_fraction = global_count / total_global_pfam
-                    
-                    # Calculate enrichment (fold change)
-                    if global_fraction > 0:
-                        enrichment = cancer_fraction / global_fraction
-                    else:
-                        enrichment = float('inf')
-                    
-                    # Update the enrichment data
-                    enrichment_data.update({
-                        'cancer_fraction': cancer_fraction,
-                        'global_fraction': global_fraction,
-                        'enrichment': enrichment
-                    })
-                else:
-                    print(f"DEBUG: Using default enrichment values for {domain_name} - insufficient data")
-            except Exception as e:
-                print(f"DEBUG: Error creating enrichment data for {domain_name}: {e}")
-                # Create a safe fallback enrichment record
-                enrichment_data = {
-                    'domain': domain_name,
-                    'cancer_count': data.get('count', 0),
-                    'global_count': global_count,
-                    'cancer_fraction': 0,
-                    'global_fraction': 0,
-                    'enrichment': 1.0,
-                    'genes': [],
-                    'e_values': [],
-                    'bitscores': []
-                }
-            
-            # Add to enrichment data
-            pfam_enrichment.append(enrichment_data)
+        total_global_pfam = sum(global_pfam_freqs.values())
+        
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Computing domain enrichment for cancer {cancer_acc}")
+            print(f"DEBUG: Total PFAM domains in cancer: {total_cancer_pfam}")
+            print(f"DEBUG: Total PFAM domains globally: {total_global_pfam}")
+            print(f"DEBUG: Number of PFAM domains to analyze: {len(enrichment_domains)}")
+        
+        # Fractions and enrichment score (fold change) for all domains at once; domains without
+        # a global count (or without any totals) keep the defaults: no enrichment
+        computable = (global_counts > 0) & (total_global_pfam > 0) & (total_cancer_pfam > 0)
+        cancer_fractions = np.zeros(len(enrichment_domains))
+        global_fractions = np.zeros(len(enrichment_domains))
+        enrichments = np.ones(len(enrichment_domains))
+        if computable.any():
+            cancer_fractions[computable] = cancer_counts[computable] / total_cancer_pfam
+            global_fractions[computable] = global_counts[computable] / total_global_pfam
+            enrichments[computable] = cancer_fractions[computable] / global_fractions[computable]
         
-        print(f"DEBUG: Generated {len(pfam_enrichment)} enrichment records for cancer {cancer_acc}")
-        if pfam_enrichment:
-            print(f"DEBUG: First enrichment record: {pfam_enrichment[0]}")
+        pfam_enrichment = []
+        for domain_name, cancer_count, global_count, cancer_fraction, global_fraction, enrichment in zip(
+            enrichment_domains, cancer_counts.tolist(), global_counts.tolist(),
+            cancer_fractions.tolist(), global_fractions.tolist(), enrichments.tolist()
+        ):
+            data = pfam_domain_counts[domain_name]
+            pfam_enrichment.append({
+                'domain': domain_name,
+                'cancer_count': cancer_count,
+                'global_count': global_count,
+                'cancer_fraction': cancer_fraction,
+                'global_fraction': global_fraction,
+                'enrichment': enrichment,
+                'genes': data['genes'],
+                'e_values': data['e_values'],
+                'bitscores': data['bitscores']
+            })
+        
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Generated {len(pfam_enrichment)} enrichment records for cancer {cancer_acc}")
+            if pfam_enrichment:
+                print(f"DEBUG: First enrichment record: {pfam_enrichment[0]}")
         
         # Sort domains by enrichment score
         pfam_enrichment.sort(key=lambda x: x['enrichment'], reverse=True)
         
-        # Sort domains by frequency
-        sorted_pfam = sorted(
-            [{'domain': domain, **data} for domain, data in pfam_domain_counts.items()],
-            key=lambda x: x['count'],
-            reverse=True
-        )
-        
-        sorted_kofam = sorted(
-            [{'domain': domain, **data} for domain, data in kofam_domain_counts.items()],
-            key=lambda x: x['count'],
-            reverse=True
-        )
+        # Sort domains by frequency; the count entries already carry their domain name
+        sorted_pfam = sorted(pfam_domain_counts.values(), key=operator.itemgetter('count'), reverse=True)
+        sorted_kofam = sorted(kofam_domain_counts.values(), key=operator.itemgetter('count'), reverse=True)
         
         # Basic information
         basic_info = {
@@ -2040,10 +3536,22 @@ class MimicDataProcessor:
         Returns:
             dict: Dictionary containing PFAM and KOFAM enrichment and depletion data
         """
-        print("Generating comprehensive domain enrichment data...")
-        
         if self.merged_data is None:
             raise ValueError("Merged data not created. Call merge_data() first.")
+        
+        # The enrichment data is cached until the domain maps or merged_data change, and
+        # on disk for later runs over the same input files
+        cache_key = (id(self.merged_data), self._merged_version)
+        if self._enrichment_cache is not None and self._enrichment_cache[0] == cache_key:
+            return copy.deepcopy(self._enrichment_cache[1])
+        
+        disk_cache_key = self._merged_cache_key()
+        enrichment_data = self._load_enrichment_cache(disk_cache_key)
+        if enrichment_data is not None:
+            self._enrichment_cache = (cache_key, copy.deepcopy(enrichment_data))
+            return enrichment_data
+        
+        print("Generating comprehensive domain enrichment data...")
             
         # Get better binder sequences
         better_binder_sequences = set(self.merged_data['mimic_gene'].unique())
@@ -2069,15 +3577,17 @@ class MimicDataProcessor:
             self.kofam_map
         )
         
-        # Calculate metagenome domain frequencies (excluding binder domains to avoid duplication)
-        non_binder_sequences = all_metagenome_sequences - better_binder_sequences
+        # Calculate metagenome domain frequencies (excluding binder domains to avoid duplication;
+        # binders are skipped while collecting the sequences instead of building a difference set)
         metagenome_domain_data = self._calculate_domain_frequencies(
-            non_binder_sequences,
+            all_metagenome_sequences,
             self.pfam_metagenome_map,
-            self.kofam_metagenome_map
+            self.kofam_metagenome_map,
+            exclude=better_binder_sequences
         )
+        non_binder_count = metagenome_domain_data['sequence_count']
         
-        print(f"Calculated domain frequencies for {len(non_binder_sequences)} non-binder sequences")
+        print(f"Calculated domain frequencies for {non_binder_count} non-binder sequences")
         
         # Calculate enrichment for PFAM domains
         pfam_enrichment, pfam_depletion, pfam_exclusive = self._calculate_domain_enrichment(
@@ -2107,55 +3617,26 @@ class MimicDataProcessor:
             binder_domain_data['kofam_details']
         )
         
-        # Create all enrichment data for tables
-        all_enrichment_data = []
-        
-        # Add PFAM enrichment data with domain type
-        for domain in pfam_enrichment:
-            domain_data = domain.copy()
-            domain_data['domain_type'] = 'PFAM'
-            domain_data['status'] = 'Enriched'
-            all_enrichment_data.append(domain_data)
-            
-        # Add PFAM depletion data with domain type
-        for domain in pfam_depletion:
-            domain_data = domain.copy()
-            domain_data['domain_type'] = 'PFAM'
-            domain_data['status'] = 'Depleted'
-            all_enrichment_data.append(domain_data)
-            
-        # Add PFAM exclusive data with domain type
-        for domain in pfam_exclusive:
-            domain_data = domain.copy()
-            domain_data['domain_type'] = 'PFAM'
-            domain_data['status'] = 'Exclusive'
-            all_enrichment_data.append(domain_data)
-            
-        # Add KOFAM enrichment data with domain type
-        for domain in kofam_enrichment:
-            domain_data = domain.copy()
-            domain_data['domain_type'] = 'KOFAM'
-            domain_data['status'] = 'Enriched'
-            all_enrichment_data.append(domain_data)
-            
-        # Add KOFAM depletion data with domain type
-        for domain in kofam_depletion:
-            domain_data = domain.copy()
-            domain_data['domain_type'] = 'KOFAM'
-            domain_data['status'] = 'Depleted'
-            all_enrichment_data.append(domain_data)
-            
-        # Add KOFAM exclusive data with domain type
-        for domain in kofam_exclusive:
-            domain_data = domain.copy()
-            domain_data['domain_type'] = 'KOFAM'
-            domain_data['status'] = 'Exclusive'
-            all_enrichment_data.append(domain_data)
+        # Create all enrichment data for tables: copies of every record tagged with its domain
+        # type and status (the per-status lists are returned too, so they stay untagged)
+        tagged_groups = (
+            (pfam_enrichment, 'PFAM', 'Enriched'),
+            (pfam_depletion, 'PFAM', 'Depleted'),
+            (pfam_exclusive, 'PFAM', 'Exclusive'),
+            (kofam_enrichment, 'KOFAM', 'Enriched'),
+            (kofam_depletion, 'KOFAM', 'Depleted'),
+            (kofam_exclusive, 'KOFAM', 'Exclusive')
+        )
+        all_enrichment_data = [
+            {**domain, 'domain_type': domain_type, 'status': status}
+            for domains, domain_type, status in tagged_groups
+            for domain in domains
+        ]
         
         # Summary statistics
         statistics = {
             'better_binder_count': len(better_binder_sequences),
-            'metagenome_count': len(non_binder_sequences),
+            'metagenome_count': non_binder_count,
             'total_sequence_count': len(all_metagenome_sequences),
             'pfam_domains': {
                 'better_binder': {
@@ -2186,7 +3667,7 @@ class MimicDataProcessor:
         }
         
         # Return all data
-        return {
+        enrichment_data = {
             'pfam_enrichment': pfam_enrichment,
             'kofam_enrichment': kofam_enrichment,
             'pfam_depletion': pfam_depletion,
@@ -2198,8 +3679,60 @@ class MimicDataProcessor:
             'all_enrichment_data': all_enrichment_data,
             'statistics': statistics
         }
+        self._enrichment_cache = (cache_key, copy.deepcopy(enrichment_data))
+        self._save_enrichment_cache(disk_cache_key, enrichment_data)
+        
+        return enrichment_data
+    
+    def _load_enrichment_cache(self, cache_key):
+        """
+        Load the cached enrichment data if it was computed from the same inputs.
+        
+        Args:
+            cache_key (dict): Key of the current inputs (see _merged_cache_key)
+            
+        Returns:
+            dict or None: The cached enrichment data, or None if missing or stale
+        """
+        cache_path = os.path.join(self.data_dir, ENRICHMENT_CACHE_FILENAME)
+        if not os.path.exists(cache_path):
+            return None
+        
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('version') != ENRICHMENT_CACHE_VERSION or cache.get('key') != cache_key:
+                return None
+            print(f"Loaded domain enrichment data from cache {cache_path}")
+            return cache['data']
+        except Exception as e:
+            print(f"Ignoring unreadable enrichment cache {cache_path}: {e}")
+            return None
+    
+    def _save_enrichment_cache(self, cache_key, enrichment_data):
+        """
+        Write the enrichment data next to the input files for the next run.
+        
+        Args:
+            cache_key (dict): Key of the inputs the data was computed from
+            enrichment_data (dict): Result of get_domain_enrichment_data()
+        """
+        cache_path = os.path.join(self.data_dir, ENRICHMENT_CACHE_FILENAME)
+        cache = {
+            'version': ENRICHMENT_CACHE_VERSION,
+            'key': cache_key,
+            'data': enrichment_data
+        }
+        
+        # Stdlib json, not orjson: exclusive domains have an infinite enrichment, which
+        # orjson would write as null; json writes (and reads back) Infinity and NaN
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, allow_nan=True)
+        
+        _write_cache_file(cache_path, write, 'enrichment')
     
-    def _calculate_domain_frequencies(self, sequence_ids, pfam_map, kofam_map):
+    def _calculate_domain_frequencies(self, sequence_ids, pfam_map, kofam_map, exclude=None):
         """
         Calculate domain frequencies for a given set of sequences.
         
@@ -2207,83 +3740,65 @@ class MimicDataProcessor:
             sequence_ids (set): Set of sequence IDs to analyze
             pfam_map (dict): Mapping of sequence IDs to PFAM domains
             kofam_map (dict): Mapping of sequence IDs to KOFAM domains
+            exclude (set, optional): Sequence IDs to skip
             
         Returns:
             dict: Dictionary with domain frequency data
         """
-        # Domain counters
-        pfam_counts = {}
-        kofam_counts = {}
-        
-        # Domain details for visualization 
-        pfam_details = {}
-        kofam_details = {}
-        
-        # Track total domain counts
-        total_pfam = 0
-        total_kofam = 0
+        if exclude:
+            seq_keys = [str(seq_id) for seq_id in sequence_ids if seq_id not in exclude]
+        else:
+            seq_keys = [str(seq_id) for seq_id in sequence_ids]
+        
+        def count_map(domain_map):
+            # Group all hits of the sequences by domain name on the map's columns: codes are
+            # factorized in order of first appearance and a stable sort keeps the hit order
+            if not domain_map:
+                return {}, {}, 0
+            rows, owners = domain_map.hit_rows(seq_keys)
+            if len(rows) == 0:
+                return {}, {}, 0
+            codes, name_codes = pd.factorize(domain_map.name_codes[rows], sort=False)
+            names = domain_map.name_table[name_codes].tolist()
+            counts = np.bincount(codes)
+            order = np.argsort(codes, kind='stable')
+            splits = np.cumsum(counts)[:-1]
+            
+            # Within a domain the hits are in sequence order, so each gene's repeated hits are
+            # adjacent: keeping the first of each run gives the distinct genes, in order
+            sorted_codes = codes[order]
+            sorted_owners = owners[order]
+            first_of_gene = np.ones(len(order), dtype=bool)
+            first_of_gene[1:] = (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_owners[1:] != sorted_owners[:-1])
+            gene_groups = np.split(
+                np.array(seq_keys, dtype=object)[sorted_owners[first_of_gene]],
+                np.cumsum(np.bincount(sorted_codes[first_of_gene], minlength=len(counts)))[:-1]
+            )
+            # Scores stay NumPy arrays; their per-domain sums (accumulated in hit order) let
+            # _prepare_domain_details average without another pass
+            hit_bitscores = domain_map.bitscores[rows]
+            hit_e_values = domain_map.e_values[rows]
+            bitscore_sums = np.bincount(codes, weights=hit_bitscores).tolist()
+            e_value_sums = np.bincount(codes, weights=hit_e_values).tolist()
+            bitscore_groups = np.split(hit_bitscores[order], splits)
+            e_value_groups = np.split(hit_e_values[order], splits)
+            details = {
+                name: {
+                    'genes': genes.tolist(),
+                    'bitscores': bitscores,
+                    'e_values': e_values,
+                    'bitscore_sum': bitscore_sum,
+                    'e_value_sum': e_value_sum
+                }
+                for name, genes, bitscores, e_values, bitscore_sum, e_value_sum in zip(
+                    names, gene_groups, bitscore_groups, e_value_groups, bitscore_sums, e_value_sums
+                )
+            }
+            return dict(zip(names, counts.tolist())), details, len(rows)
         
-        # Calculate domain frequencies
-        for seq_id in sequence_ids:
-            # Process PFAM domains if available
-            if pfam_map and str(seq_id) in pfam_map:
-                pfam_domains = pfam_map[str(seq_id)]
-                
-                if isinstance(pfam_domains, list):
-                    for domain in pfam_domains:
-                        if isinstance(domain, dict) and 'hmm_name' in domain:
-                            domain_name = domain['hmm_name']
-                            
-                            # Increment counter
-                            if domain_name not in pfam_counts:
-                                pfam_counts[domain_name] = 0
-                                pfam_details[domain_name] = {
-                                    'genes': set(),
-                                    'bitscores': [],
-                                    'e_values': []
-                                }
-                            
-                            pfam_counts[domain_name] += 1
-                            total_pfam += 1
-                            
-                            # Store details
-                            pfam_details[domain_name]['genes'].add(str(seq_id))
-                            
-                            if 'bitscore' in domain:
-                                pfam_details[domain_name]['bitscores'].append(domain['bitscore'])
-                            
-                            if 'e_value' in domain:
-                                pfam_details[domain_name]['e_values'].append(domain['e_value'])
-            
-            # Process KOFAM domains if available
-            if kofam_map and str(seq_id) in kofam_map:
-                kofam_domains = kofam_map[str(seq_id)]
-                
-                if isinstance(kofam_domains, list):
-                    for domain in kofam_domains:
-                        if isinstance(domain, dict) and 'hmm_name' in domain:
-                            domain_name = domain['hmm_name']
-                            
-                            # Increment counter
-                            if domain_name not in kofam_counts:
-                                kofam_counts[domain_name] = 0
-                                kofam_details[domain_name] = {
-                                    'genes': set(),
-                                    'bitscores': [],
-                                    'e_values': []
-                                }
-                            
-                            kofam_counts[domain_name] += 1
-                            total_kofam += 1
-                            
-                            # Store details
-                            kofam_details[domain_name]['genes'].add(str(seq_id))
-                            
-                            if 'bitscore' in domain:
-                                kofam_details[domain_name]['bitscores'].append(domain['bitscore'])
-                            
-                            if 'e_value' in domain:
-                                kofam_details[domain_name]['e_values'].append(domain['e_value'])
+        # Domain counts, details for visualization and total domain counts
+        pfam_counts, pfam_details, total_pfam = count_map(pfam_map)
+        kofam_counts, kofam_details, total_kofam = count_map(kofam_map)
         
         return {
             'pfam_counts': pfam_counts,
@@ -2291,7 +3806,8 @@ class MimicDataProcessor:
             'pfam_details': pfam_details,
             'kofam_details': kofam_details,
             'total_pfam': total_pfam,
-            'total_kofam': total_kofam
+            'total_kofam': total_kofam,
+            'sequence_count': len(seq_keys)
         }
     
     def _calculate_domain_enrichment(self, target_counts, target_total, background_counts, background_total, domain_details=None):
@@ -2308,83 +3824,72 @@ class MimicDataProcessor:
         Returns:
             tuple: (enriched domains, depleted domains, exclusive domains)
         """
-        # Lists to store enriched, depleted, and exclusive domains
-        enriched = []
-        depleted = []
-        exclusive = []
-        
         # Make sure we have data to compare
         if target_total == 0 or background_total == 0:
             print(f"WARNING: Missing data for enrichment calculation. Target: {target_total}, Background: {background_total}")
-            return enriched, depleted, exclusive
-        
-        # Calculate enrichment for each domain in target
-        for domain, count in target_counts.items():
-            # Skip domains with no counts
-            if count == 0:
-                continue
-                
-            try:
-                # Calculate fractions
-                target_fraction = count / target_total
-                
-                # Get background count (0 if not present)
-                background_count = background_counts.get(domain, 0)
-                
-                # Get additional domain details if available
-                additional_details = {}
-                if domain_details and domain in domain_details:
-                    # Add gene count and gene list
-                    additional_details['gene_count'] = len(domain_details[domain]['genes'])
-                    additional_details['genes'] = list(domain_details[domain]['genes'])
-                
-                # Calculate enrichment
-                if background_count > 0:
-                    background_fraction = background_count / background_total
-                    enrichment = target_fraction / background_fraction
-                    
-                    # Create enrichment data
-                    enrichment_data = {
-                        'domain': domain,
-                        'target_count': count,
-                        'background_count': background_count,
-                        'target_fraction': target_fraction,
-                        'background_fraction': background_fraction,
-                        'enrichment': enrichment,
-                        **additional_details
-                    }
-                    
-                    # Add to appropriate list
-                    if enrichment >= 1.0:
-                        enriched.append(enrichment_data)
-                    else:
-                        depleted.append(enrichment_data)
-                else:
-                    # Exclusive to target dataset (infinite enrichment)
-                    enrichment_data = {
-                        'domain': domain,
-                        'target_count': count,
-                        'background_count': 0,
-                        'target_fraction': target_fraction,
-                        'background_fraction': 0,
-                        'enrichment': float('inf'),
-                        **additional_details
-                    }
-                    
-                    # Add to exclusive list
-                    exclusive.append(enrichment_data)
-                    
-            except Exception as e:
-                print(f"Error calculating enrichment for domain {domain}: {e}")
-        
-        # Sort enriched domains by enrichment (descending)
-        enriched.sort(key=lambda x: x['enrichment'], reverse=True)
-        
-        # Sort depleted domains by enrichment (ascending)
-        depleted.sort(key=lambda x: x['enrichment'])
-        
-        # Sort exclusive domains by target count (descending)
-        exclusive.sort(key=lambda x: x['target_count'], reverse=True)
+            return [], [], []
+        
+        # Calculate fractions and enrichment for all target domains at once (domains with
+        # no counts are skipped)
+        domains = [domain for domain, count in target_counts.items() if count != 0]
+        target = np.array([target_counts[domain] for domain in domains], dtype=np.int64)
+        background = np.array([background_counts.get(domain, 0) for domain in domains], dtype=np.int64)
+        target_fractions = target / target_total
+        background_fractions = background / background_total
+        
+        # Domains absent from the background are exclusive and take their own path, so
+        # enrichment ratios are only computed (and sorted) where they are finite
+        present_idx = np.flatnonzero(background > 0)
+        exclusive_idx = np.flatnonzero(background == 0)
+        present_enrichments = target_fractions[present_idx] / background_fractions[present_idx]
+        enrichments = np.zeros(len(domains))
+        enrichments[present_idx] = present_enrichments
+        
+        target_list = target.tolist()
+        background_list = background.tolist()
+        target_fraction_list = target_fractions.tolist()
+        background_fraction_list = background_fractions.tolist()
+        enrichment_list = enrichments.tolist()
+        
+        def enrichment_record(i, exclusive=False):
+            domain = domains[i]
+            if not exclusive:
+                record = {
+                    'domain': domain,
+                    'target_count': target_list[i],
+                    'background_count': background_list[i],
+                    'target_fraction': target_fraction_list[i],
+                    'background_fraction': background_fraction_list[i],
+                    'enrichment': enrichment_list[i]
+                }
+            else:
+                # Exclusive to target dataset (infinite enrichment)
+                record = {
+                    'domain': domain,
+                    'target_count': target_list[i],
+                    'background_count': 0,
+                    'target_fraction': target_fraction_list[i],
+                    'background_fraction': 0,
+                    'enrichment': float('inf')
+                }
+            # Add gene count and gene list if available
+            if domain_details and domain in domain_details:
+                record['gene_count'] = len(domain_details[domain]['genes'])
+                record['genes'] = list(domain_details[domain]['genes'])
+            return record
+        
+        # Enriched domains by enrichment (descending), depleted domains by enrichment
+        # (ascending), exclusive domains by target count (descending); stable sorts keep
+        # ties in target order
+        enriched_idx = present_idx[present_enrichments >= 1.0]
+        enriched_idx = enriched_idx[np.argsort(-enrichments[enriched_idx], kind='stable')]
+        depleted_idx = present_idx[present_enrichments < 1.0]
+        depleted_idx = depleted_idx[np.argsort(enrichments[depleted_idx], kind='stable')]
+        exclusive_idx = exclusive_idx[np.argsort(-target[exclusive_idx], kind='stable')]
+        
+        enriched = [enrichment_record(i) for i in enriched_idx.tolist()]
+        depleted = [enrichment_record(i) for i in depleted_idx.tolist()]
+        exclusive = [enrichment_record(i, exclusive=True) for i in exclusive_idx.tolist()]
         
         return enriched, depleted, exclusive
     
@@ -2405,17 +3910,19 @@ class MimicDataProcessor:
                 # Convert gene set to list
                 gene_list = list(details['genes'])
                 
-                # Calculate average bitscore and e-value
-                avg_bitscore = sum(details['bitscores']) / len(details['bitscores']) if details['bitscores'] else 0
-                avg_evalue = sum(details['e_values']) / len(details['e_values']) if details['e_values'] else 1.0
+                # Average bitscore and e-value from the sums collected with the scores
+                bitscores = details['bitscores']
+                e_values = details['e_values']
+                avg_bitscore = details['bitscore_sum'] / len(bitscores) if len(bitscores) else 0
+                avg_evalue = details['e_value_sum'] / len(e_values) if len(e_values) else 1.0
                 
                 # Create domain data
                 domain_data = {
                     'domain': domain,
                     'count': len(details['genes']),
                     'genes': gene_list,
-                    'bitscores': details['bitscores'],
-                    'e_values': details['e_values'],
+                    'bitscores': bitscores.tolist(),
+                    'e_values': e_values.tolist(),
                     'avg_bitscore': avg_bitscore,
                     'avg_evalue': avg_evalue
                 }
@@ -2430,10 +3937,19 @@ class MimicDataProcessor:
         
         return result
     
+    def _merged_genes(self):
+        """Unique mimic genes of merged_data in order of appearance, as an Index (cached)."""
+        cache_key = (id(self.merged_data), self._merged_version)
+        if self._merged_genes_cache is None or self._merged_genes_cache[0] != cache_key:
+            self._merged_genes_cache = (cache_key, pd.Index(self.merged_data['mimic_gene'].unique()))
+        return self._merged_genes_cache[1]
+    
     def find_related_sequences(self, sequence_id, limit=5):
         """
         Find sequences related to the given sequence ID based on shared domains.
         
+        Lookups are cached until the domain maps or merged_data change.
+        
         Args:
             sequence_id (str): The sequence ID to find related sequences for
             limit (int): Maximum number of related sequences to return
@@ -2443,147 +3959,67 @@ class MimicDataProcessor:
         """
         if self.merged_data is None:
             raise ValueError("Merged data not created. Call merge_data() first.")
-            
-        # Get better binders domains for this sequence - with robust error handling
-        try:
-            pfam_domains = self.pfam_map.get(str(sequence_id), [])
-            if not isinstance(pfam_domains, list):
-                print(f"Warning: PFAM domains for {sequence_id} is not a list: {type(pfam_domains)}")
-                pfam_domains = []
-        except Exception as e:
-            print(f"Error accessing PFAM domains for {sequence_id}: {e}")
-            pfam_domains = []
-            
-        try:
-            kofam_domains = self.kofam_map.get(str(sequence_id), [])
-            if not isinstance(kofam_domains, list):
-                print(f"Warning: KOFAM domains for {sequence_id} is not a list: {type(kofam_domains)}")
-                kofam_domains = []
-        except Exception as e:
-            print(f"Error accessing KOFAM domains for {sequence_id}: {e}")
-            kofam_domains = []
-            
-        # Get metagenome domains for this sequence if available
-        pfam_metagenome_domains = []
-        if hasattr(self, 'pfam_metagenome_map'):
-            try:
-                pfam_metagenome_domains = self.pfam_metagenome_map.get(str(sequence_id), [])
-                if not isinstance(pfam_metagenome_domains, list):
-                    print(f"Warning: PFAM metagenome domains for {sequence_id} is not a list: {type(pfam_metagenome_domains)}")
-                    pfam_metagenome_domains = []
-            except Exception as e:
-                print(f"Error accessing PFAM metagenome domains for {sequence_id}: {e}")
-                pfam_metagenome_domains = []
-            
-        kofam_metagenome_domains = []
-        if hasattr(self, 'kofam_metagenome_map'):
-            try:
-                kofam_metagenome_domains = self.kofam_metagenome_map.get(str(sequence_id), [])
-                if not isinstance(kofam_metagenome_domains, list):
-                    print(f"Warning: KOFAM metagenome domains for {sequence_id} is not a list: {type(kofam_metagenome_domains)}")
-                    kofam_metagenome_domains = []
-            except Exception as e:
-                print(f"Error accessing KOFAM metagenome domains for {sequence_id}: {e}")
-                kofam_metagenome_domains = []
-                
-        # Extract domain names
-        pfam_names = set(d['hmm_name'] for d in pfam_domains if isinstance(d, dict) and 'hmm_name' in d)
-        kofam_names = set(d['hmm_name'] for d in kofam_domains if isinstance(d, dict) and 'hmm_name' in d)
-        pfam_metagenome_names = set(d['hmm_name'] for d in pfam_metagenome_domains if isinstance(d, dict) and 'hmm_name' in d)
-        kofam_metagenome_names = set(d['hmm_name'] for d in kofam_metagenome_domains if isinstance(d, dict) and 'hmm_name' in d)
+        
+        cache_key = (id(self.merged_data), self._merged_version, str(sequence_id), limit)
+        with self._related_cache_lock:
+            related = self._related_cache.get(cache_key)
+            if related is not None:
+                self._related_cache.move_to_end(cache_key)
+        if related is None:
+            related = self._find_related_sequences(sequence_id, limit)
+            with self._related_cache_lock:
+                self._related_cache[cache_key] = related
+                while len(self._related_cache) > RELATED_CACHE_SIZE:
+                    self._related_cache.popitem(last=False)
+        
+        return [dict(entry) for entry in related]
+    
+    def _find_related_sequences(self, sequence_id, limit):
+        """Uncached implementation of find_related_sequences()."""
+        sequence_key = str(sequence_id)
+        
+        # Each map with the weight of a shared domain (better binders over metagenome hits,
+        # PFAM over KOFAM) and this sequence's domain names
+        weighted_maps = []
+        for map_name, weight in (('pfam_map', 3), ('kofam_map', 2),
+                                 ('pfam_metagenome_map', 1.5), ('kofam_metagenome_map', 1)):
+            domain_map = getattr(self, map_name, None)
+            if domain_map is None:
+                continue
+            names = set(domain_map.domain_names(sequence_key))
+            if names:
+                weighted_maps.append((domain_map, weight, names))
         
         # If no domains to compare, return empty list
-        if not pfam_names and not kofam_names and not pfam_metagenome_names and not kofam_metagenome_names:
+        if not weighted_maps:
             return []
-            
-        # Find sequences with similar domains
-        related_scores = {}
-        
-        # Check all sequences
-        for seq_id in self.merged_data['mimic_gene'].unique():
-            if str(seq_id) == str(sequence_id):
-                continue  # Skip self
-                
-            score = 0
-            
-            # Get better binders domains for the other sequence
-            try:
-                other_pfam_domains = self.pfam_map.get(str(seq_id), [])
-                if not isinstance(other_pfam_domains, list):
-                    other_pfam_domains = []
-            except Exception as e:
-                print(f"Error accessing PFAM domains for related sequence {seq_id}: {e}")
-                other_pfam_domains = []
-                
-            try:
-                other_kofam_domains = self.kofam_map.get(str(seq_id), [])
-                if not isinstance(other_kofam_domains, list):
-                    other_kofam_domains = []
-            except Exception as e:
-                print(f"Error accessing KOFAM domains for related sequence {seq_id}: {e}")
-                other_kofam_domains = []
-            
-            # Get metagenome domains for the other sequence if available
-            other_pfam_metagenome_domains = []
-            if hasattr(self, 'pfam_metagenome_map'):
-                try:
-                    other_pfam_metagenome_domains = self.pfam_metagenome_map.get(str(seq_id), [])
-                    if not isinstance(other_pfam_metagenome_domains, list):
-                        other_pfam_metagenome_domains = []
-                except Exception as e:
-                    print(f"Error accessing PFAM metagenome domains for related sequence {seq_id}: {e}")
-                    other_pfam_metagenome_domains = []
-                
-            other_kofam_metagenome_domains = []
-            if hasattr(self, 'kofam_metagenome_map'):
-                try:
-                    other_kofam_metagenome_domains = self.kofam_metagenome_map.get(str(seq_id), [])
-                    if not isinstance(other_kofam_metagenome_domains, list):
-                        other_kofam_metagenome_domains = []
-                except Exception as e:
-                    print(f"Error accessing KOFAM metagenome domains for related sequence {seq_id}: {e}")
-                    other_kofam_metagenome_domains = []
-            
-            # Check PFAM better binders domains (weight higher)
-            try:
-                other_pfam = set(d['hmm_name'] for d in other_pfam_domains if isinstance(d, dict) and 'hmm_name' in d)
-                pfam_overlap = pfam_names.intersection(other_pfam)
-                score += len(pfam_overlap) * 3  # Highest weight for PFAM better binders
-            except Exception as e:
-                print(f"Error processing PFAM overlaps for {seq_id}: {e}")
-            
-            # Check KOFAM better binders domains
-            try:
-                other_kofam = set(d['hmm_name'] for d in other_kofam_domains if isinstance(d, dict) and 'hmm_name' in d)
-                kofam_overlap = kofam_names.intersection(other_kofam)
-                score += len(kofam_overlap) * 2  # Medium weight for KOFAM better binders
-            except Exception as e:
-                print(f"Error processing KOFAM overlaps for {seq_id}: {e}")
-                
-            # Check PFAM metagenome domains
-            if pfam_metagenome_names and other_pfam_metagenome_domains:
-                try:
-                    other_pfam_meta = set(d['hmm_name'] for d in other_pfam_metagenome_domains if isinstance(d, dict) and 'hmm_name' in d)
-                    pfam_meta_overlap = pfam_metagenome_names.intersection(other_pfam_meta)
-                    score += len(pfam_meta_overlap) * 1.5  # Lower weight for metagenome domains
-                except Exception as e:
-                    print(f"Error processing PFAM metagenome overlaps for {seq_id}: {e}")
-            
-            # Check KOFAM metagenome domains
-            if kofam_metagenome_names and other_kofam_metagenome_domains:
-                try:
-                    other_kofam_meta = set(d['hmm_name'] for d in other_kofam_metagenome_domains if isinstance(d, dict) and 'hmm_name' in d)
-                    kofam_meta_overlap = kofam_metagenome_names.intersection(other_kofam_meta)
-                    score += len(kofam_meta_overlap)  # Lowest weight for KOFAM metagenome
-                except Exception as e:
-                    print(f"Error processing KOFAM metagenome overlaps for {seq_id}: {e}")
-            
-            if score > 0:
-                related_scores[seq_id] = score
         
-        # Sort by score and return top matches
-        related = sorted(related_scores.items(), key=lambda x: x[1], reverse=True)
-        return [{'id': id, 'score': score} for id, score in related[:limit]]
+        # Score only the sequences sharing a domain, found through each map's inverted index
+        related_scores = {}
+        for domain_map, weight, names in weighted_maps:
+            postings = domain_map.postings()
+            shared = Counter(itertools.chain.from_iterable(postings.get(name, ()) for name in names))
+            for seq_key, shared_count in shared.items():
+                related_scores[seq_key] = related_scores.get(seq_key, 0) + shared_count * weight
+        related_scores.pop(sequence_key, None)  # Skip self
+        
+        # A sequence with any hits in a fractionally weighted map has always been scored as a
+        # float (its zero overlap still added 0.0), so keep that for consistent display
+        for domain_map, weight, _ in weighted_maps:
+            if isinstance(weight, float):
+                for seq_key, score in related_scores.items():
+                    if domain_map.domain_count(seq_key):
+                        related_scores[seq_key] = float(score)
+        
+        # Only genes in the merged data are candidates; ties keep their merged data order
+        genes = self._merged_genes()
+        seq_keys = list(related_scores)
+        positions = genes.get_indexer(seq_keys)
+        related = sorted(
+            ((related_scores[seq_key], position) for seq_key, position in zip(seq_keys, positions) if position >= 0),
+            key=lambda x: (-x[0], x[1])
+        )
+        return [{'id': genes[position], 'score': score} for score, position in related[:limit]]
 
 # Example usage
 if __name__ == "__main__":
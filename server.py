@@ -3,20 +3,290 @@
 
 import os
 import json
+import math
+import gzip
+import hashlib
+import time
+import uuid
+import re
+import shutil
+import threading
+import traceback
 import argparse
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from flask import Flask, jsonify, request, render_template, send_from_directory
+from flask import Flask, jsonify, request, render_template, send_file, send_from_directory, stream_template
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import escape
 from werkzeug.utils import secure_filename
-from data_processor import MimicDataProcessor
+from data_processor import MimicDataProcessor, DEBUG_OUTPUT
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import waitress
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider serializing API responses (jsonify) with orjson. Output matches
+    the default provider except that NaN/Infinity become null (valid JSON) and non-ASCII
+    text is written as UTF-8 instead of escapes.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            # Dates, decimals, dataclasses etc. go through Flask's default conversion
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+        except TypeError:
+            # Values orjson rejects outright (e.g. integers beyond 64 bits)
+            return super().dumps(obj, **kwargs)
 
 app = Flask(__name__, 
             static_folder='static',
             template_folder='templates')
+if HAS_ORJSON:
+    app.json = OrjsonProvider(app)
+    # The templates' tojson filter keeps the default provider: page scripts receive values
+    # such as the Infinity enrichment of exclusive domains, which orjson would turn into null
+    app.jinja_env.policies['json.dumps_function'] = DefaultJSONProvider(app).dumps
+
+# Compiled templates persist across restarts (in a per-user temporary directory), so a
+# fresh process loads bytecode instead of parsing and compiling the templates again.
+# Template files are only re-checked for changes in debug mode (Flask's default).
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(pattern='mimic_%s.cache')
+
+# HTML and JSON responses at least this large are compressed for clients that accept it
+# (brotli if installed, else gzip); pages of records and sequence pages compress several-fold
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = frozenset(['text/html', 'application/json'])
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+
+# Part of every ETag, so validators handed out by an earlier server run never match
+SERVER_INSTANCE = uuid.uuid4().hex
+
+# Rendered sequence detail pages kept in memory (least recently used are evicted)
+SEQUENCE_PAGE_CACHE_SIZE = 256
+
+# Browsers and shared caches reuse a sequence page this long before revalidating its ETag
+SEQUENCE_PAGE_MAX_AGE_SECONDS = 3600
+
+# Sequence pages with at least this many binding records are streamed to the client as
+# they render instead of being buffered whole (and are not kept in the page cache)
+STREAM_PAGE_MIN_BINDINGS = 5000
+
+# Most sequence IDs accepted by one /api/sequences/batch request
+SEQUENCE_BATCH_MAX_IDS = 500
+
+# Media type of /api/data pages requested with format=arrow
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+def parse_json_arg(text):
+    """
+    Parse a JSON query parameter, with orjson when available.
+    
+    Args:
+        text (str): Raw parameter value
+        
+    Returns:
+        The parsed value
+        
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # The stdlib parser also accepts NaN/Infinity, and raises the usual error otherwise
+            pass
+    return json.loads(text)
+
+def json_response(payload):
+    """
+    Serialize a JSON API response, with orjson when available (several times faster
+    than jsonify for large pages of records; keys are sorted the same way).
+    
+    Args:
+        payload (dict): Response data
+        
+    Returns:
+        Response: application/json response (compressed by compress_response if large)
+    """
+    if HAS_ORJSON:
+        return app.response_class(
+            orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS),
+            mimetype='application/json'
+        )
+    return jsonify(payload)
+
+@app.after_request
+def compress_response(response):
+    """Compress large HTML and JSON responses for clients that accept it (brotli preferred over gzip)."""
+    # Streamed and file responses are sent as they are
+    if (response.is_streamed or response.direct_passthrough or response.status_code != 200 or
+            'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if response.content_length < COMPRESS_MIN_BYTES:
+        return response
+    
+    if HAS_BROTLI and request.accept_encodings.quality('br') > 0:
+        response.set_data(brotli.compress(response.get_data(), quality=BROTLI_QUALITY))
+        response.headers['Content-Encoding'] = 'br'
+    elif request.accept_encodings.quality('gzip') > 0:
+        response.set_data(gzip.compress(response.get_data(), compresslevel=GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def arrow_response(frame, page_info):
+    """
+    Serialize a page of rows as an Arrow IPC stream, for clients that read the columns
+    directly instead of parsing JSON records.
+    
+    Args:
+        frame (DataFrame): Rows to send
+        page_info (dict): Pagination details, stored as JSON under the b'mimic_page'
+            key of the schema metadata
+        
+    Returns:
+        Response: application/vnd.apache.arrow.stream response
+    """
+    table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b'mimic_page': json.dumps(page_info).encode('utf-8')
+    })
+    
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return app.response_class(sink.getvalue().to_pybytes(), mimetype=ARROW_STREAM_MIMETYPE)
+
+def json_records(frame):
+    """
+    Convert a DataFrame to records for a JSON response, with missing, NaN and
+    infinite values as None.
+    
+    Columns are converted one at a time (float columns with a single vectorized
+    pass) instead of running DataFrame.replace over the whole frame.
+    
+    Args:
+        frame (DataFrame): Rows to convert
+        
+    Returns:
+        list: One dict per row
+    """
+    column_values = []
+    for column in frame.columns:
+        values = frame[column]
+        if values.dtype.kind == 'f':
+            array = values.to_numpy()
+            column_values.append(np.where(np.isfinite(array), array, None).tolist())
+        elif values.dtype.kind in 'iub':
+            column_values.append(values.tolist())
+        else:
+            column_values.append([
+                None if value is pd.NA or (isinstance(value, float) and not math.isfinite(value)) else value
+                for value in values.tolist()
+            ])
+    
+    columns = list(frame.columns)
+    return [dict(zip(columns, row)) for row in zip(*column_values)]
+
+# error.html rendered once with placeholder fields, split into literal parts and
+# field names: {has_details: [part, field, part, ...]}
+ERROR_PAGE_FIELDS = ('error_title', 'error_message', 'error_details')
+error_page_parts = {}
+
+def error_page(error_title, error_message, error_details):
+    """
+    Render the error page; the same output as render_template('error.html', ...), but
+    filled into a copy of the template rendered once instead of running Jinja each time.
+    
+    Args:
+        error_title (str): Page heading
+        error_message (str): Error message
+        error_details (str): Details shown below the message (omitted when empty)
+        
+    Returns:
+        str: The error page HTML
+    """
+    has_details = bool(error_details)
+    parts = error_page_parts.get(has_details)
+    if parts is None:
+        placeholders = {field: f'@@{field}@@' for field in ERROR_PAGE_FIELDS}
+        if not has_details:
+            placeholders['error_details'] = ''
+        skeleton = render_template('error.html', **placeholders)
+        parts = re.split('@@(' + '|'.join(ERROR_PAGE_FIELDS) + ')@@', skeleton)
+        error_page_parts[has_details] = parts
+    
+    values = {
+        'error_title': escape(error_title),
+        'error_message': escape(error_message),
+        'error_details': escape(error_details)
+    }
+    # Odd positions of the split hold the field names
+    return ''.join(values[part] if i % 2 else part for i, part in enumerate(parts))
 
 # Global variables
 DATA_DIR = None
 PROCESSOR = None
 SAMPLE_ID = None
+DATA_LOAD_COUNT = 0  # Incremented by every load_data(); part of the ETags
+
+# Set while load_data() runs; requests meanwhile get a 503 instead of partly loaded data
+data_loading = threading.Event()
+
+# Seconds a client is asked to wait (Retry-After) while the data is loading
+LOADING_RETRY_AFTER_SECONDS = 5
+
+@app.before_request
+def reject_while_loading():
+    """Answer requests with 503 Service Unavailable until the data has loaded."""
+    if not data_loading.is_set() or request.endpoint == 'static':
+        return None
+    
+    headers = {'Retry-After': str(LOADING_RETRY_AFTER_SECONDS)}
+    if request.path.startswith('/api/'):
+        return jsonify({'error': 'Data is loading'}), 503, headers
+    return error_page("Loading Data",
+                      "The data is still loading.",
+                      f"Please retry in {LOADING_RETRY_AFTER_SECONDS} seconds."), 503, headers
+
+# (data version, sequence ID) -> rendered sequence detail HTML; only successful pages are kept
+sequence_page_cache = OrderedDict()
+sequence_page_cache_lock = threading.Lock()
 
 @app.route('/')
 def index():
@@ -37,7 +307,7 @@ def get_data():
         # Get filter parameters
         filters_str = request.args.get('filters', default='{}')
         try:
-            filters = json.loads(filters_str)
+            filters = parse_json_arg(filters_str)
         except json.JSONDecodeError:
             return jsonify({'error': 'Invalid filters JSON'}), 400
         
@@ -45,48 +315,62 @@ def get_data():
         sort_by = request.args.get('sort_by', default=None)
         sort_dir = request.args.get('sort_dir', default='asc')
         
-        # Apply filters - with error handling
-        try:
-            # Create a boolean mask instead of copying the DataFrame
-            mask = pd.Series(True, index=PROCESSOR.merged_data.index)
-            
-            for column, filter_value in filters.items():
-                if column not in PROCESSOR.merged_data.columns:
-                    continue
-                    
-                if isinstance(filter_value, dict):
-                    # Numeric filter
-                    if 'min' in filter_value and filter_value['min'] is not None:
-                        mask &= (PROCESSOR.merged_data[column] >= filter_value['min'])
-                    if 'max' in filter_value and filter_value['max'] is not None:
-                        mask &= (PROCESSOR.merged_data[column] <= filter_value['max'])
-                else:
-                    # String filter (substring match)
-                    mask &= (PROCESSOR.merged_data[column].astype(str).str.contains(str(filter_value), case=False, na=False))
-            
-            # Apply the mask only once
-            filtered_data = PROCESSOR.merged_data[mask]
-        except Exception as e:
-            print(f"Error applying filters: {e}")
-            filtered_data = PROCESSOR.merged_data.head(page_size)  # Fallback to first page_size rows
+        # Response format: JSON records (default) or an Arrow IPC stream of the page
+        response_format = request.args.get('format', default='json')
+        if response_format not in ('json', 'arrow'):
+            return jsonify({'error': f'Unknown format: {response_format}'}), 400
+        if response_format == 'arrow' and not HAS_PYARROW:
+            return jsonify({'error': 'Arrow format requires pyarrow'}), 400
         
-        # Apply sorting - with error handling
+        # The page only depends on these parameters and the loaded table, so a client
+        # revisiting a page it already holds gets a 304 without the page being rebuilt
+        etag = hashlib.blake2b(repr((
+            SERVER_INSTANCE, DATA_LOAD_COUNT, PROCESSOR.data_version, json.dumps(filters, sort_keys=True),
+            sort_by, sort_dir, page, page_size, response_format
+        )).encode('utf-8'), digest_size=16).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        
+        # Apply filters - with error handling; only the positions of the matching rows are
+        # kept (the processor caches them per filter set, so paging does not rescan the table)
+        filters_applied = False
         try:
-            if sort_by and sort_by in filtered_data.columns:
-                ascending = sort_dir.lower() == 'asc'
-                filtered_data = filtered_data.sort_values(by=sort_by, ascending=ascending)
+            rows = PROCESSOR.filtered_rows(filters)
+            filters_applied = True
         except Exception as e:
-            print(f"Error applying sorting: {e}")
+            print(f"Error applying filters: {e}")
+            rows = np.arange(min(page_size, len(PROCESSOR.merged_data)))  # Fallback to first page_size rows
         
         # Calculate total after filtering
-        total_rows = len(filtered_data)
+        total_rows = len(rows)
         
         # Apply pagination - with bounds checking
         start_idx = min(page * page_size, max(0, total_rows - 1))
         end_idx = min(start_idx + page_size, total_rows)
         
+        # Apply sorting - with error handling; only the rows up to the end of the page
+        # have to be in order
+        try:
+            if sort_by and sort_by in PROCESSOR.merged_data.columns:
+                ascending = sort_dir.lower() == 'asc'
+                if filters_applied:
+                    rows = PROCESSOR.filtered_rows(filters, sort_by, ascending, limit=end_idx)
+                else:
+                    rows = PROCESSOR.sort_rows(rows, sort_by, ascending)
+        except Exception as e:
+            print(f"Error applying sorting: {e}")
+        
         # Handle empty dataframe case
         if total_rows == 0:
+            if response_format == 'arrow':
+                return arrow_response(PROCESSOR.merged_data.iloc[:0], {
+                    'page': page,
+                    'page_size': page_size,
+                    'total_rows': 0,
+                    'total_pages': 0
+                })
             return jsonify({
                 'data': [],
                 'page': page,
@@ -96,45 +380,48 @@ def get_data():
             })
             
         try:
-            paginated_data = filtered_data.iloc[start_idx:end_idx]
+            page_rows = rows[start_idx:end_idx]
+            paginated_data = PROCESSOR.merged_data.take(page_rows)
         except Exception as e:
             print(f"Error applying pagination: {e}")
-            paginated_data = filtered_data.head(page_size)  # Fallback
+            page_rows = rows[:page_size]
+            paginated_data = PROCESSOR.merged_data.take(page_rows)  # Fallback
+        
+        page_info = {
+            'page': page,
+            'page_size': page_size,
+            'total_rows': total_rows,
+            'total_pages': max(1, (total_rows + page_size - 1) // page_size)
+        }
+        
+        if response_format == 'arrow':
+            # Same domain column sanitization as the JSON records; missing values are Arrow nulls
+            for col in ['PFAM_domains', 'KOFAM_domains']:
+                if col in paginated_data.columns:
+                    paginated_data[col] = PROCESSOR.json_column_values(col, page_rows)
+            response = arrow_response(paginated_data, page_info)
+            response.set_etag(etag, weak=True)
+            response.cache_control.no_cache = True
+            return response
         
         # Convert to JSON-compatible format - with sanitization for problematic values
         try:
             # Convert to records and sanitize
-            records = paginated_data.replace({
-                float('nan'): None,
-                float('inf'): None,
-                float('-inf'): None
-            }).to_dict(orient='records')
+            records = json_records(paginated_data)
             
-            # Additional sanitization for domain columns
-            for record in records:
-                # Process domain columns that should contain JSON strings
-                for col in ['PFAM_domains', 'KOFAM_domains']:
-                    if col in record:
-                        try:
-                            if record[col] is None:
-                                record[col] = '[]'
-                            elif isinstance(record[col], str):
-                                # Try to validate JSON
-                                json.loads(record[col])
-                            else:
-                                record[col] = '[]'
-                        except:
-                            record[col] = '[]'
+            # Additional sanitization for domain columns that should contain JSON strings;
+            # the processor validates each distinct value once and substitutes '[]' otherwise
+            for col in ['PFAM_domains', 'KOFAM_domains']:
+                if col in paginated_data.columns:
+                    for record, value in zip(records, PROCESSOR.json_column_values(col, page_rows)):
+                        record[col] = value
             
-            return jsonify({
-                'data': records,
-                'page': page,
-                'page_size': page_size,
-                'total_rows': total_rows,
-                'total_pages': max(1, (total_rows + page_size - 1) // page_size)
-            })
+            response = json_response({'data': records, **page_info})
+            # Browsers keep the page but revalidate it on every request
+            response.set_etag(etag, weak=True)
+            response.cache_control.no_cache = True
+            return response
         except Exception as e:
-            import traceback
             print(f"Error preparing JSON response: {e}")
             print(traceback.format_exc())
             
@@ -149,7 +436,6 @@ def get_data():
             })
             
     except Exception as e:
-        import traceback
         print(f"Unhandled error in get_data: {e}")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
@@ -164,37 +450,21 @@ def get_visualization_data():
         # Get filter parameters
         filters_str = request.args.get('filters', default='{}')
         try:
-            filters = json.loads(filters_str)
+            filters = parse_json_arg(filters_str)
         except json.JSONDecodeError:
             return jsonify({'error': 'Invalid filters JSON'}), 400
         
         # Apply filters - with error handling
         try:
-            # Create a boolean mask instead of copying the DataFrame
-            mask = pd.Series(True, index=PROCESSOR.merged_data.index)
-            
-            for column, filter_value in filters.items():
-                if column not in PROCESSOR.merged_data.columns:
-                    continue
-                    
-                if isinstance(filter_value, dict):
-                    # Numeric filter
-                    if 'min' in filter_value and filter_value['min'] is not None:
-                        mask &= (PROCESSOR.merged_data[column] >= filter_value['min'])
-                    if 'max' in filter_value and filter_value['max'] is not None:
-                        mask &= (PROCESSOR.merged_data[column] <= filter_value['max'])
-                else:
-                    # String filter (substring match)
-                    mask &= (PROCESSOR.merged_data[column].astype(str).str.contains(str(filter_value), case=False, na=False))
-            
-            # Apply the mask only once
-            filtered_data = PROCESSOR.merged_data[mask]
+            # The processor caches the row positions per filter set; every summary below
+            # reads just these rows of the columns it needs instead of copying the table
+            rows = PROCESSOR.filtered_rows(filters)
         except Exception as e:
             print(f"Error applying filters for visualization data: {e}")
             return jsonify({'error': f'Error applying filters: {str(e)}'}), 500
         
         # Calculate total after filtering
-        total_rows = len(filtered_data)
+        total_rows = len(rows)
         
         # Handle empty dataframe case
         if total_rows == 0:
@@ -209,30 +479,17 @@ def get_visualization_data():
         # Instead of sending all raw data, pre-compute the summaries needed for each visualization
         try:
             # 1. MHC Distribution - Count by MHC type
-            mhc_counts = filtered_data['MHC'].value_counts().to_dict()
+            mhc_counts = PROCESSOR.value_counts('MHC', rows)
             
             # 2. Binding Affinity - Extract only the affinity values needed for histogram
-            affinity_data = filtered_data['mimic_Aff(nM)'].dropna().tolist()
+            affinity_data = PROCESSOR.merged_data['mimic_Aff(nM)'].take(rows).dropna().tolist()
             
             # 3. Domain Distribution - Pre-compute domain counts using vectorized operations where possible
             
             # Process PFAM better binders domains
             try:
-                # Create a counter for domain names
-                from collections import Counter
-                pfam_domain_counts = Counter()
-                
-                # Only process rows that actually have domains
-                domains_data = filtered_data['PFAM_domains'].dropna()
-                
-                # Extract and count domains efficiently
-                for domains_json in domains_data:
-                    try:
-                        domains = json.loads(domains_json)
-                        domain_names = [domain['hmm_name'] for domain in domains]
-                        pfam_domain_counts.update(domain_names)
-                    except:
-                        continue
+                # Count domain names from the processor's preparsed domain column
+                pfam_domain_counts = PROCESSOR.count_domain_names('PFAM_domains', rows)
                 
                 # Convert to list and sort by count - only keep top 15
                 pfam_domains = [{'domain': domain, 'count': count} 
@@ -243,21 +500,8 @@ def get_visualization_data():
             
             # Process KOFAM better binders domains similarly
             try:
-                # Create a counter for domain names
-                from collections import Counter
-                kofam_domain_counts = Counter()
-                
-                # Only process rows that actually have domains
-                domains_data = filtered_data['KOFAM_domains'].dropna()
-                
-                # Extract and count domains efficiently
-                for domains_json in domains_data:
-                    try:
-                        domains = json.loads(domains_json)
-                        domain_names = [domain['hmm_name'] for domain in domains]
-                        kofam_domain_counts.update(domain_names)
-                    except:
-                        continue
+                # Count domain names from the processor's preparsed domain column
+                kofam_domain_counts = PROCESSOR.count_domain_names('KOFAM_domains', rows)
                 
                 # Convert to list and sort by count - only keep top 15
                 kofam_domains = [{'domain': domain, 'count': count} 
@@ -271,23 +515,10 @@ def get_visualization_data():
             kofam_metagenome_domains = []
             
             # Process PFAM metagenome domains if available
-            if 'PFAM_metagenome_domains' in filtered_data.columns:
+            if 'PFAM_metagenome_domains' in PROCESSOR.merged_data.columns:
                 try:
-                    # Create a counter for domain names
-                    from collections import Counter
-                    pfam_meta_domain_counts = Counter()
-                    
-                    # Only process rows that actually have domains
-                    domains_data = filtered_data['PFAM_metagenome_domains'].dropna()
-                    
-                    # Extract and count domains efficiently
-                    for domains_json in domains_data:
-                        try:
-                            domains = json.loads(domains_json)
-                            domain_names = [domain['hmm_name'] for domain in domains]
-                            pfam_meta_domain_counts.update(domain_names)
-                        except:
-                            continue
+                    # Count domain names from the processor's preparsed domain column
+                    pfam_meta_domain_counts = PROCESSOR.count_domain_names('PFAM_metagenome_domains', rows)
                     
                     # Convert to list and sort by count - only keep top 15
                     pfam_metagenome_domains = [{'domain': domain, 'count': count} 
@@ -297,23 +528,10 @@ def get_visualization_data():
                     pfam_metagenome_domains = []
             
             # Process KOFAM metagenome domains if available
-            if 'KOFAM_metagenome_domains' in filtered_data.columns:
+            if 'KOFAM_metagenome_domains' in PROCESSOR.merged_data.columns:
                 try:
-                    # Create a counter for domain names
-                    from collections import Counter
-                    kofam_meta_domain_counts = Counter()
-                    
-                    # Only process rows that actually have domains
-                    domains_data = filtered_data['KOFAM_metagenome_domains'].dropna()
-                    
-                    # Extract and count domains efficiently
-                    for domains_json in domains_data:
-                        try:
-                            domains = json.loads(domains_json)
-                            domain_names = [domain['hmm_name'] for domain in domains]
-                            kofam_meta_domain_counts.update(domain_names)
-                        except:
-                            continue
+                    # Count domain names from the processor's preparsed domain column
+                    kofam_meta_domain_counts = PROCESSOR.count_domain_names('KOFAM_metagenome_domains', rows)
                     
                     # Convert to list and sort by count - only keep top 15
                     kofam_metagenome_domains = [{'domain': domain, 'count': count} 
@@ -332,13 +550,11 @@ def get_visualization_data():
                 'kofam_metagenome_domains': kofam_metagenome_domains
             })
         except Exception as e:
-            import traceback
             print(f"Error preparing visualization data summaries: {e}")
             print(traceback.format_exc())
             return jsonify({'error': f'Error preparing data: {str(e)}'}), 500
             
     except Exception as e:
-        import traceback
         print(f"Unhandled error in get_visualization_data: {e}")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
@@ -367,7 +583,6 @@ def get_summary():
             summary = PROCESSOR.get_data_summary()
             return jsonify(summary)
         except Exception as e:
-            import traceback
             error_details = traceback.format_exc()
             print(f"Error in get_data_summary: {e}")
             print(error_details)
@@ -390,10 +605,9 @@ def domain_enrichment_doc():
 def domain_enrichment():
     """Render the domain enrichment analysis page."""
     if PROCESSOR is None:
-        return render_template('error.html', 
-                              error_title="Server Error",
-                              error_message="Data not loaded.",
-                              error_details="Please restart the server."), 500
+        return error_page("Server Error",
+                          "Data not loaded.",
+                          "Please restart the server."), 500
     
     try:
         # Get domain enrichment data from processor
@@ -433,15 +647,13 @@ def domain_enrichment():
                               binding_domains_data=binding_domains_data,
                               thresholds=default_thresholds)
     except Exception as e:
-        import traceback
         error_details = traceback.format_exc()
         print(f"ERROR loading domain enrichment page: {e}")
         print(error_details)
         
-        return render_template('error.html', 
-                              error_title="Error Loading Domain Enrichment",
-                              error_message="An error occurred while loading domain enrichment data.",
-                              error_details=str(e)), 500
+        return error_page("Error Loading Domain Enrichment",
+                          "An error occurred while loading domain enrichment data.",
+                          str(e)), 500
 
 @app.route('/api/binding_domains')
 def get_binding_domains():
@@ -468,7 +680,6 @@ def get_binding_domains():
         
         return jsonify(binding_domains_data)
     except Exception as e:
-        import traceback
         print(f"Error in get_binding_domains: {e}")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
@@ -489,7 +700,6 @@ def binding_domains_progress():
         session_id = data.get('session_id', '')
         
         # Generate a unique task ID
-        import uuid
         task_id = str(uuid.uuid4())
         
         # Store task info in a global tasks dictionary (in-memory storage)
@@ -497,15 +707,16 @@ def binding_domains_progress():
             'progress': 0,
             'status': 'running',
             'result': None,
-            'session_id': session_id
+            'session_id': session_id,
+            # Wakes status requests waiting for this task to change (see binding_domains_status)
+            'changed': threading.Condition()
         }
         
         # Define progress callback function
         def update_progress(progress):
-            global_tasks[task_id]['progress'] = progress
+            update_task(task_id, progress=progress)
             
-        # Run analysis in a separate thread to avoid blocking
-        import threading
+        # Run analysis on the worker pool to avoid blocking
         def run_analysis():
             try:
                 result = PROCESSOR.analyze_binding_domain_intersections(
@@ -514,23 +725,19 @@ def binding_domains_progress():
                     max_sequences=max_sequences,
                     progress_callback=update_progress
                 )
-                global_tasks[task_id]['result'] = result
-                global_tasks[task_id]['status'] = 'completed'
+                update_task(task_id, result=result, status='completed')
             except Exception as e:
-                import traceback
                 print(f"Error in analysis thread: {e}")
                 print(traceback.format_exc())
-                global_tasks[task_id]['status'] = 'error'
-                global_tasks[task_id]['error'] = str(e)
+                update_task(task_id, status='error', error=str(e))
                 
-        # Start the analysis thread
-        threading.Thread(target=run_analysis).start()
+        # Queue the analysis (runs as soon as a worker is free)
+        analysis_executor.submit(run_analysis)
         
         # Return task ID for client to poll progress
         return jsonify({'task_id': task_id})
         
     except Exception as e:
-        import traceback
         print(f"Error starting binding domains analysis: {e}")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
@@ -538,13 +745,65 @@ def binding_domains_progress():
 # In-memory storage for tasks
 global_tasks = {}
 
+# Completed tasks are dropped this long after their result was first fetched
+TASK_RESULT_TTL_SECONDS = 300
+
+# (expiry time, task ID) of fetched results, oldest first; expired tasks are dropped
+# on the next status request instead of by a sleeping thread per task
+task_expiries = deque()
+task_expiries_lock = threading.Lock()
+
+# Longest a status request may wait for a running task to change (?wait=<seconds>)
+STATUS_LONG_POLL_MAX_SECONDS = 25
+
+# Bounded pool running the background analyses; extra requests wait in its queue
+analysis_executor = ThreadPoolExecutor(max_workers=max(2, (os.cpu_count() or 2) // 2),
+                                       thread_name_prefix='binding-analysis')
+
+def update_task(task_id, **fields):
+    """
+    Update a task's fields and wake the status requests waiting on it.
+    
+    Args:
+        task_id (str): ID of the task
+        **fields: Task fields to set (progress, status, result, error)
+    """
+    task = global_tasks[task_id]
+    with task['changed']:
+        task.update(fields)
+        task['changed'].notify_all()
+
+def evict_expired_tasks():
+    """Drop the completed tasks whose result TTL has passed."""
+    now = time.monotonic()
+    with task_expiries_lock:
+        while task_expiries and task_expiries[0][0] <= now:
+            _, expired_task_id = task_expiries.popleft()
+            global_tasks.pop(expired_task_id, None)
+
 @app.route('/api/binding_domains_status/<task_id>')
 def binding_domains_status(task_id):
-    """Check status of a binding domain analysis task."""
-    if task_id not in global_tasks:
+    """
+    Check status of a binding domain analysis task.
+    
+    With ?wait=<seconds>&since=<progress>, a running task is long-polled: the request
+    returns as soon as the progress differs from `since` or the task finishes, or when
+    the wait lapses, instead of the client polling repeatedly.
+    """
+    evict_expired_tasks()
+    
+    task = global_tasks.get(task_id)
+    if task is None:
         return jsonify({'error': 'Task not found'}), 404
-        
-    task = global_tasks[task_id]
+    
+    wait = min(request.args.get('wait', default=0, type=float), STATUS_LONG_POLL_MAX_SECONDS)
+    if wait > 0:
+        since = request.args.get('since', default=None, type=int)
+        with task['changed']:
+            task['changed'].wait_for(
+                lambda: task['status'] != 'running' or task['progress'] != since,
+                timeout=wait
+            )
     
     # Build response based on task status
     response = {
@@ -552,20 +811,15 @@ def binding_domains_status(task_id):
         'progress': task['progress']
     }
     
-    # If task completed, include the result and clean up
+    # If task completed, include the result and schedule its cleanup to prevent memory leaks
+    # In a production application, you would use a proper task queue and results backend
     if task['status'] == 'completed':
         response['result'] = task['result']
         
-        # Cleanup task after 5 minutes to prevent memory leaks
-        # In a production application, you would use a proper task queue and results backend
-        import threading
-        def cleanup_task():
-            import time
-            time.sleep(300)  # Wait 5 minutes
-            if task_id in global_tasks:
-                del global_tasks[task_id]
-                
-        threading.Thread(target=cleanup_task).start()
+        with task_expiries_lock:
+            if 'expires_at' not in task:
+                task['expires_at'] = time.monotonic() + TASK_RESULT_TTL_SECONDS
+                task_expiries.append((task['expires_at'], task_id))
         
     # If task errored, include error message
     elif task['status'] == 'error':
@@ -576,10 +830,9 @@ def binding_domains_status(task_id):
 
 @app.errorhandler(500)
 def server_error(e):
-    return render_template('error.html', 
-                          error_title="Server Error",
-                          error_message="An internal server error occurred.",
-                          error_details=str(e)), 500
+    return error_page("Server Error",
+                      "An internal server error occurred.",
+                      str(e)), 500
                           
 @app.route('/api/domains/<sequence_id>')
 def get_domains(sequence_id):
@@ -611,35 +864,75 @@ def get_domains(sequence_id):
         'kofam_metagenome_domains': kofam_metagenome_domains
     })
 
+@app.route('/api/sequences/batch', methods=['POST'])
+def get_sequences_batch():
+    """
+    API endpoint returning the sequence detail data of several sequences in one request.
+    
+    Expects {"ids": [...]} and returns {"sequences": [...]} in the same order, each entry
+    holding the data the sequence detail page renders (null for unknown IDs).
+    """
+    if PROCESSOR is None:
+        return jsonify({'error': 'Data not loaded'}), 500
+    
+    data = request.get_json(silent=True) or {}
+    sequence_ids = data.get('ids')
+    if not isinstance(sequence_ids, list) or not all(isinstance(sid, str) for sid in sequence_ids):
+        return jsonify({'error': 'Expected {"ids": [sequence IDs]}'}), 400
+    if len(sequence_ids) > SEQUENCE_BATCH_MAX_IDS:
+        return jsonify({'error': f'At most {SEQUENCE_BATCH_MAX_IDS} sequence IDs per request'}), 400
+    
+    try:
+        sequences = []
+        for sequence_id in sequence_ids:
+            sequence_data = PROCESSOR.get_sequence_detail(sequence_id)
+            if sequence_data is None:
+                sequences.append(None)
+                continue
+            
+            # The cached detail data is shared, so the related sequences go into a new dict
+            try:
+                related_sequences = PROCESSOR.find_related_sequences(sequence_id)
+            except Exception as related_error:
+                print(f"ERROR finding related sequences for {sequence_id}: {related_error}")
+                related_sequences = []
+            sequences.append({**sequence_data.to_dict(), 'related_sequences': related_sequences})
+        
+        return json_response({'sequences': sequences})
+    except Exception as e:
+        print(f"Error in get_sequences_batch: {e}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/cancer/<cancer_acc>')
 def cancer_detail(cancer_acc):
     """Render the cancer accession detail page."""
     if PROCESSOR is None:
-        return render_template('error.html', 
-                              error_title="Server Error",
-                              error_message="Data not loaded.",
-                              error_details="Please restart the server."), 500
+        return error_page("Server Error",
+                          "Data not loaded.",
+                          "Please restart the server."), 500
     
     # Get comprehensive cancer data
     try:
-        print(f"DEBUG: Loading cancer detail for {cancer_acc}")
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Loading cancer detail for {cancer_acc}")
         cancer_data = PROCESSOR.get_cancer_data(cancer_acc)
         
         if cancer_data is None:
-            return render_template('error.html', 
-                                  error_title="Cancer Accession Not Found",
-                                  error_message=f"Cancer accession {cancer_acc} was not found in the dataset.",
-                                  error_details="Please check the cancer accession and try again."), 404
+            return error_page("Cancer Accession Not Found",
+                              f"Cancer accession {cancer_acc} was not found in the dataset.",
+                              "Please check the cancer accession and try again."), 404
         
         # DEBUG: Print information about the pfam_enrichment data
-        print(f"DEBUG: Got cancer data for {cancer_acc}, preparing to render template")
-        print(f"DEBUG: pfam_enrichment data type: {type(cancer_data.get('pfam_enrichment'))}")
-        print(f"DEBUG: pfam_enrichment length: {len(cancer_data.get('pfam_enrichment', []))}")
-        if len(cancer_data.get('pfam_enrichment', [])) > 0:
-            first_item = cancer_data['pfam_enrichment'][0]
-            print(f"DEBUG: First pfam_enrichment item: {first_item}")
-        else:
-            print(f"DEBUG: pfam_enrichment is empty")
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Got cancer data for {cancer_acc}, preparing to render template")
+            print(f"DEBUG: pfam_enrichment data type: {type(cancer_data.get('pfam_enrichment'))}")
+            print(f"DEBUG: pfam_enrichment length: {len(cancer_data.get('pfam_enrichment', []))}")
+            if len(cancer_data.get('pfam_enrichment', [])) > 0:
+                first_item = cancer_data['pfam_enrichment'][0]
+                print(f"DEBUG: First pfam_enrichment item: {first_item}")
+            else:
+                print(f"DEBUG: pfam_enrichment is empty")
         
         # Set default threshold values 
         default_thresholds = {
@@ -666,154 +959,274 @@ def cancer_detail(cancer_acc):
                                   raw_data=cancer_data['raw_data'],
                                   thresholds=default_thresholds)
         except Exception as template_error:
-            import traceback
             print(f"ERROR rendering template for cancer {cancer_acc}: {template_error}")
             print(traceback.format_exc())
             
-            return render_template('error.html', 
-                                  error_title="Template Error",
-                                  error_message=f"An error occurred while rendering the template for cancer {cancer_acc}.",
-                                  error_details=str(template_error)), 500
+            return error_page("Template Error",
+                              f"An error occurred while rendering the template for cancer {cancer_acc}.",
+                              str(template_error)), 500
                               
     except Exception as e:
-        import traceback
         error_details = traceback.format_exc()
         print(f"ERROR loading cancer {cancer_acc}: {e}")
         print(error_details)
         
-        return render_template('error.html', 
-                              error_title="Error Loading Cancer Accession",
-                              error_message=f"An error occurred while loading cancer accession {cancer_acc}.",
-                              error_details=str(e)), 500
+        return error_page("Error Loading Cancer Accession",
+                          f"An error occurred while loading cancer accession {cancer_acc}.",
+                          str(e)), 500
+
+def cacheable_page(response, etag):
+    """
+    Mark a page response as cacheable by browsers and shared caches.
+    
+    Args:
+        response (Response): The page (or 304) response
+        etag (str): ETag identifying the page content
+        
+    Returns:
+        Response: The same response with ETag and Cache-Control set
+    """
+    response.set_etag(etag, weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = SEQUENCE_PAGE_MAX_AGE_SECONDS
+    return response
+
+def sequence_page_context(sequence_id, sequence_data):
+    """
+    Build the sequence_detail.html template variables of a sequence.
+    
+    Args:
+        sequence_id (str): The sequence ID
+        sequence_data (SequenceDetail): The sequence's data from get_sequence_detail()
+        
+    Returns:
+        dict: Template variables
+    """
+    # Get related sequences with exception handling
+    try:
+        related_sequences = PROCESSOR.find_related_sequences(sequence_id)
+    except Exception as related_error:
+        print(f"ERROR finding related sequences for {sequence_id}: {related_error}")
+        print(traceback.format_exc())
+        # Continue without related sequences if they fail
+        related_sequences = []
+    
+    # Debug the data being sent to the template
+    if DEBUG_OUTPUT:
+        print(f"DEBUG: Rendering template with: pfam_domains={len(sequence_data.pfam_domains)}, "
+              f"kofam_domains={len(sequence_data.kofam_domains)}, "
+              f"binding_data={len(sequence_data.binding_data)} items, "
+              f"binding_positions={len(sequence_data.binding_positions)} items, "
+              f"related_sequences={len(related_sequences)} items")
+    
+    return dict(
+        sample_id=SAMPLE_ID,
+        sequence_id=sequence_id,
+        basic_info=sequence_data.basic_info,
+        pfam_domains=sequence_data.pfam_domains,
+        kofam_domains=sequence_data.kofam_domains,
+        pfam_metagenome_domains=sequence_data.pfam_metagenome_domains,
+        kofam_metagenome_domains=sequence_data.kofam_metagenome_domains,
+        binding_data=sequence_data.binding_data,
+        binding_positions=sequence_data.binding_positions,
+        sequence=sequence_data.sequence,
+        raw_data=sequence_data.raw_data,
+        related_sequences=related_sequences
+    )
+
+def prerendered_page_path(pages_dir, sequence_id):
+    """Path of a sequence's prerendered page (file names are hashes, so any ID is safe)."""
+    file_name = hashlib.blake2b(sequence_id.encode('utf-8'), digest_size=16).hexdigest() + '.html'
+    return os.path.join(pages_dir, file_name)
+
+def prerender_sequence_pages():
+    """
+    Render every sequence detail page of the loaded data into a fresh subdirectory of
+    PRERENDER_PAGE_DIR, and remove the pages of this server's earlier loads.
+    """
+    global prerendered_pages_dir
+    
+    # Only subdirectories named with this server's prefix are ever removed, so anything
+    # else in PRERENDER_PAGE_DIR (including other servers' pages) is left alone
+    load_dir = os.path.join(PRERENDER_PAGE_DIR, f"{PRERENDER_DIR_PREFIX}{DATA_LOAD_COUNT}")
+    os.makedirs(load_dir, exist_ok=True)
+    for entry in os.listdir(PRERENDER_PAGE_DIR):
+        entry_path = os.path.join(PRERENDER_PAGE_DIR, entry)
+        if entry.startswith(PRERENDER_DIR_PREFIX) and entry_path != load_dir and os.path.isdir(entry_path):
+            shutil.rmtree(entry_path, ignore_errors=True)
+    
+    sequence_ids = PROCESSOR.merged_data['mimic_gene'].dropna().unique().tolist()
+    
+    try:
+        # url_for() in the templates needs a request context
+        with app.test_request_context():
+            for sequence_id in sequence_ids:
+                sequence_data = PROCESSOR.get_sequence_data(sequence_id)
+                page = render_template('sequence_detail.html', **sequence_page_context(sequence_id, sequence_data))
+                # Each page appears complete or not at all
+                page_path = prerendered_page_path(load_dir, sequence_id)
+                tmp_path = f"{page_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as page_file:
+                    page_file.write(page)
+                os.replace(tmp_path, page_path)
+    except Exception:
+        # Leave no partial page directory behind
+        shutil.rmtree(load_dir, ignore_errors=True)
+        raise
+    
+    # Requests only look for files once every page is written
+    prerendered_pages_dir = load_dir
+    print(f"Prerendered {len(sequence_ids)} sequence pages into {load_dir}")
 
 @app.route('/sequence/<sequence_id>')
 def sequence_detail(sequence_id):
     """Render the sequence detail page."""
     if PROCESSOR is None:
-        return render_template('error.html', 
-                              error_title="Server Error",
-                              error_message="Data not loaded.",
-                              error_details="Please restart the server."), 500
+        return error_page("Server Error",
+                          "Data not loaded.",
+                          "Please restart the server."), 500
+    
+    # The page only depends on the loaded data; browsers holding it get a 304
+    etag = hashlib.blake2b(repr((
+        SERVER_INSTANCE, DATA_LOAD_COUNT, PROCESSOR.data_version, sequence_id
+    )).encode('utf-8'), digest_size=16).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        return cacheable_page(app.response_class(status=304), etag)
+    
+    # Pages rendered at load time are sent straight from disk
+    pages_dir = prerendered_pages_dir
+    if pages_dir is not None:
+        page_path = prerendered_page_path(pages_dir, sequence_id)
+        if os.path.exists(page_path):
+            return cacheable_page(send_file(page_path, mimetype='text/html', conditional=False, etag=False,
+                                            max_age=SEQUENCE_PAGE_MAX_AGE_SECONDS), etag)
+    
+    # Repeat visits from other clients skip the lookups and the render
+    page_key = (PROCESSOR.data_version, sequence_id)
+    with sequence_page_cache_lock:
+        page = sequence_page_cache.get(page_key)
+        if page is not None:
+            sequence_page_cache.move_to_end(page_key)
+            return cacheable_page(app.make_response(page), etag)
     
     # Get comprehensive sequence data
     try:
-        print(f"DEBUG: Loading sequence detail for {sequence_id}")
-        sequence_data = PROCESSOR.get_sequence_data(sequence_id)
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Loading sequence detail for {sequence_id}")
+        sequence_data = PROCESSOR.get_sequence_detail(sequence_id)
         
         if sequence_data is None:
-            return render_template('error.html', 
-                                  error_title="Sequence Not Found",
-                                  error_message=f"Sequence {sequence_id} was not found in the dataset.",
-                                  error_details="Please check the sequence ID and try again."), 404
+            return error_page("Sequence Not Found",
+                              f"Sequence {sequence_id} was not found in the dataset.",
+                              "Please check the sequence ID and try again."), 404
         
-        print(f"DEBUG: Got sequence data for {sequence_id}, fetching related sequences")
+        if DEBUG_OUTPUT:
+            print(f"DEBUG: Got sequence data for {sequence_id}, fetching related sequences")
         
-        # Get related sequences with exception handling
-        try:
-            related_sequences = PROCESSOR.find_related_sequences(sequence_id)
-        except Exception as related_error:
-            print(f"ERROR finding related sequences for {sequence_id}: {related_error}")
-            import traceback
-            print(traceback.format_exc())
-            # Continue without related sequences if they fail
-            related_sequences = []
+        template_context = sequence_page_context(sequence_id, sequence_data)
         
-        print(f"DEBUG: Preparing to render template for {sequence_id}")
+        # Huge pages start reaching the client while the rest renders; a template error
+        # past that point ends the response early instead of showing the error page
+        if len(sequence_data.binding_data) >= STREAM_PAGE_MIN_BINDINGS:
+            return cacheable_page(app.response_class(stream_template('sequence_detail.html', **template_context)), etag)
         
-        # Ensure all required keys exist and are of proper type
-        if 'pfam_domains' not in sequence_data or not isinstance(sequence_data['pfam_domains'], list):
-            print(f"WARNING: pfam_domains missing or not a list for {sequence_id}, using empty list")
-            sequence_data['pfam_domains'] = []
-            
-        if 'kofam_domains' not in sequence_data or not isinstance(sequence_data['kofam_domains'], list):
-            print(f"WARNING: kofam_domains missing or not a list for {sequence_id}, using empty list")
-            sequence_data['kofam_domains'] = []
-            
-        if 'binding_data' not in sequence_data or not isinstance(sequence_data['binding_data'], list):
-            print(f"WARNING: binding_data missing or not a list for {sequence_id}, using empty list")
-            sequence_data['binding_data'] = []
-            
-        if 'binding_positions' not in sequence_data or not isinstance(sequence_data['binding_positions'], list):
-            print(f"WARNING: binding_positions missing or not a list for {sequence_id}, using empty list")
-            sequence_data['binding_positions'] = []
-            
-        if 'sequence' not in sequence_data:
-            print(f"WARNING: sequence missing for {sequence_id}, using empty string")
-            sequence_data['sequence'] = ""
-            
-        if 'raw_data' not in sequence_data or not isinstance(sequence_data['raw_data'], dict):
-            print(f"WARNING: raw_data missing or not a dict for {sequence_id}, using empty dict")
-            sequence_data['raw_data'] = {}
-        
-        # Ensure basic_info exists and is a dict
-        if 'basic_info' not in sequence_data or not isinstance(sequence_data['basic_info'], dict):
-            print(f"WARNING: basic_info missing or not a dict for {sequence_id}, creating default")
-            sequence_data['basic_info'] = {
-                'Mimic Gene': sequence_id,
-                'Cancer Gene': 'N/A',
-                'Cancer DB': 'N/A',
-                'PFAM Domains': 0,
-                'KOFAM Domains': 0,
-                'MHC Binding Sites': 0
-            }
-        
-        # Debug the data being sent to the template
-        print(f"DEBUG: Rendering template with: pfam_domains={len(sequence_data['pfam_domains'])}, "
-              f"kofam_domains={len(sequence_data['kofam_domains'])}, "
-              f"binding_data={len(sequence_data['binding_data'])} items, "
-              f"binding_positions={len(sequence_data['binding_positions'])} items, "
-              f"related_sequences={len(related_sequences)} items")
-                
         try:
             # Render the template with all data
-            return render_template('sequence_detail.html', 
-                                sample_id=SAMPLE_ID,
-                                sequence_id=sequence_id,
-                                basic_info=sequence_data['basic_info'],
-                                pfam_domains=sequence_data['pfam_domains'],
-                                kofam_domains=sequence_data['kofam_domains'],
-                                pfam_metagenome_domains=sequence_data.get('pfam_metagenome_domains', []),
-                                kofam_metagenome_domains=sequence_data.get('kofam_metagenome_domains', []),
-                                binding_data=sequence_data['binding_data'],
-                                binding_positions=sequence_data.get('binding_positions', []),
-                                sequence=sequence_data['sequence'],
-                                raw_data=sequence_data['raw_data'],
-                                related_sequences=related_sequences)
+            page = render_template('sequence_detail.html', **template_context)
         except Exception as template_error:
-            import traceback
             print(f"ERROR rendering template for {sequence_id}: {template_error}")
             print(traceback.format_exc())
             
-            return render_template('error.html', 
-                                error_title="Template Error",
-                                error_message=f"An error occurred while rendering the template for {sequence_id}.",
-                                error_details=str(template_error)), 500
+            return error_page("Template Error",
+                              f"An error occurred while rendering the template for {sequence_id}.",
+                              str(template_error)), 500
+        
+        with sequence_page_cache_lock:
+            sequence_page_cache[page_key] = page
+            if len(sequence_page_cache) > SEQUENCE_PAGE_CACHE_SIZE:
+                sequence_page_cache.popitem(last=False)
+        return cacheable_page(app.make_response(page), etag)
                               
     except Exception as e:
-        import traceback
         error_details = traceback.format_exc()
         print(f"ERROR loading sequence {sequence_id}: {e}")
         print(error_details)
         
-        return render_template('error.html', 
-                              error_title="Error Loading Sequence",
-                              error_message=f"An error occurred while loading sequence {sequence_id}.",
-                              error_details=str(e)), 500
+        return error_page("Error Loading Sequence",
+                          f"An error occurred while loading sequence {sequence_id}.",
+                          str(e)), 500
+
+# Set MIMIC_PRECOMPUTE_DETAILS=1 to build every sequence's detail data at startup
+# (faster first visits, at the cost of startup time and memory for large datasets)
+PRECOMPUTE_SEQUENCE_DETAILS = os.environ.get('MIMIC_PRECOMPUTE_DETAILS', '0') == '1'
+
+# Set MIMIC_PRERENDER_DIR to a directory for page files to render every sequence page
+# there at startup; requests are then answered from the files
+PRERENDER_PAGE_DIR = os.environ.get('MIMIC_PRERENDER_DIR')
+
+# Name prefix of the page subdirectories this server creates (one per data load)
+PRERENDER_DIR_PREFIX = f"mimic-pages-{SERVER_INSTANCE}-"
+
+# Subdirectory holding the prerendered pages of the current data, or None
+prerendered_pages_dir = None
 
 def load_data(data_dir):
     """Load and process data."""
-    global PROCESSOR, SAMPLE_ID
+    global PROCESSOR, SAMPLE_ID, DATA_LOAD_COUNT, prerendered_pages_dir
     
+    data_loading.set()
     try:
-        PROCESSOR = MimicDataProcessor(data_dir)
-        PROCESSOR.load_data()
-        SAMPLE_ID = PROCESSOR.sample_id
-        PROCESSOR.process_hmm_hits()
-        PROCESSOR.merge_data()
-        return True
+        # Built completely before it replaces the current processor
+        processor = MimicDataProcessor(data_dir)
+        processor.load_data()
+        processor.process_hmm_hits()
+        processor.merge_data()
+        if PRECOMPUTE_SEQUENCE_DETAILS:
+            processor.precompute_sequence_details()
+        
+        PROCESSOR = processor
+        SAMPLE_ID = processor.sample_id
+        
+        # Pages rendered from the previous data (and sample ID) must not be served again
+        prerendered_pages_dir = None
+        with sequence_page_cache_lock:
+            sequence_page_cache.clear()
+        DATA_LOAD_COUNT += 1
     except Exception as e:
         print(f"Error loading data: {e}")
+        data_loading.clear()
         return False
+    
+    # The new data is already in place: if its pages cannot be written, they are
+    # rendered on request instead
+    try:
+        if PRERENDER_PAGE_DIR:
+            prerender_sequence_pages()
+    except Exception as e:
+        print(f"Error prerendering sequence pages (rendering them on request instead): {e}")
+        prerendered_pages_dir = None
+    finally:
+        data_loading.clear()
+    return True
+
+def load_data_in_background(data_dir):
+    """
+    Load the data on a background thread so the server can bind its port right away
+    (requests get a 503 until loading finishes).
+    
+    Args:
+        data_dir (str): Directory containing the input data files
+    """
+    def run():
+        print(f"Loading data from {data_dir}...")
+        if load_data(data_dir):
+            print("Data loaded.")
+        else:
+            print("Failed to load data; requests will report that the data is not loaded.")
+    
+    # Mark loading before the thread starts so no request sees the unloaded state
+    data_loading.set()
+    threading.Thread(target=run, name='load-data', daemon=True).start()
 
 def main():
     """Main entry point."""
@@ -828,16 +1241,27 @@ def main():
     args = parser.parse_args()
     DATA_DIR = args.data_dir
     
-    # Load data
-    print(f"Loading data from {DATA_DIR}...")
-    success = load_data(DATA_DIR)
-    
-    if not success:
-        print("Failed to load data. Exiting.")
-        exit(1)
+    # Load data while the server starts
+    load_data_in_background(DATA_DIR)
     
     print(f"Starting server on {args.host}:{args.port}")
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    if args.debug or not HAS_WAITRESS:
+        app.run(host=args.host, port=args.port, debug=args.debug)
+    else:
+        # Production WSGI server instead of Werkzeug's development server
+        waitress.serve(app, host=args.host, port=args.port, threads=max(4, os.cpu_count() or 4))
+
+# WSGI entry point for other servers. Use one threaded process, e.g.
+#   MIMIC_DATA_DIR=/path/to/data gunicorn -w 1 --threads 8 --worker-class gthread server:application
+# Analysis tasks live in this process's global_tasks, so several worker processes would answer
+# status polls for tasks they never saw (404), and the long-polls would block sync workers
+application = app
 
 if __name__ == "__main__":
     main()
+elif __name__ != "__mp_main__" and os.environ.get('MIMIC_DATA_DIR'):
+    # Skipped in intersection worker processes, which re-import this script as __mp_main__
+    DATA_DIR = os.environ['MIMIC_DATA_DIR']
+    print(f"Loading data from {DATA_DIR}...")
+    if not load_data(DATA_DIR):
+        raise RuntimeError(f"Failed to load data from {DATA_DIR}")
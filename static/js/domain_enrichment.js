@@ -1569,13 +1569,13 @@ function createBindingNetwork(data, containerId) {
     return simulation;
 }
 
-// Poll for task status updates with exponential backoff
+// Poll for task status updates; the server holds each request until the progress changes
 function pollTaskStatus(taskId) {
-    let pollInterval = 1000; // Start with 1 second
-    const maxInterval = 10000; // Cap at 10 seconds
+    const waitSeconds = 20; // Server-side wait per request (long polling)
     const timeout = 5 * 60 * 1000; // 5 minute timeout
     const startTime = Date.now();
     let attempts = 0;
+    let lastProgress = null;
     
     // Cache DOM elements to avoid repeated lookups
     const progressBar = document.getElementById('binding-domains-progress-bar');
@@ -1590,13 +1590,16 @@ function pollTaskStatus(taskId) {
             return;
         }
         
-        fetch(`/api/binding_domains_status/${taskId}`)
+        const since = lastProgress === null ? '' : `&since=${lastProgress}`;
+        fetch(`/api/binding_domains_status/${taskId}?wait=${waitSeconds}${since}`)
             .then(response => response.json())
             .then(data => {
                 if (data.error) {
                     throw new Error(data.error);
                 }
                 
+                lastProgress = data.progress;
+                
                 // Update progress bar with cached DOM elements
                 updateProgressBar(data.progress, getProgressStatusText(data.progress), progressBar, progressStatus);
                 
@@ -1612,12 +1615,10 @@ function pollTaskStatus(taskId) {
                     progressBar.classList.remove('bg-primary');
                     progressBar.classList.add('bg-danger');
                 } else {
-                    // Still running, continue polling with increasing interval
+                    // Still running; the next request waits server-side for a change
                     attempts++;
-                    // Implement exponential backoff (increase interval up to max)
-                    pollInterval = Math.min(pollInterval * 1.5, maxInterval);
-                    console.log(`Polling again in ${pollInterval}ms (attempt ${attempts})`);
-                    setTimeout(poll, pollInterval);
+                    console.log(`Polling again (attempt ${attempts})`);
+                    setTimeout(poll, 0);
                 }
             })
             .catch(error => {
@@ -0,0 +1,98 @@
+"""
+Shared fixtures: a small synthetic data directory in the pipeline's file layout.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processor import MimicDataProcessor
+
+SAMPLE_ID = 'S1'
+
+SEQUENCES = {
+    'gene_1': 'MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQ',
+    'gene_2': 'MSLNFLDFEQPIAELEAKIDSLTAVSRQDEKLDINIDEEVHRLREKSVELTRKIFADLGAWQIAQ',
+    'gene_3': 'MAHHHHHHVDDDDKMTEYKLVVVGAGGVGKSALTIQLIQNHFVDEYDPTIEDSYRKQVVIDGETC',
+    'gene_4': 'MQIFVKTLTGKTITLEVEPSDTIENVKAKIQDKEGIPPDQQRLIFAGKQLEDGRTLSDYNIQKES'
+}
+
+BINDER_ROWS = [
+    # mimic_gene, MHC, cancer_acc, peptide start, affinity, bind level
+    ('gene_1', 'HLA-A*02:01', 'CAN1', 3, 45.2, '<= SB'),
+    ('gene_1', 'HLA-B*07:02', 'CAN2', 20, 310.0, '<= WB'),
+    ('gene_2', 'HLA-A*02:01', 'CAN1', 10, 820.5, ''),
+    ('gene_3', 'HLA-C*01:02', 'CAN3', 30, 12.7, '<= SB')
+]
+
+HMM_COLUMNS = 'sequence_id\thmm_name\tbitscore\tevalue\tenv_from\tenv_to\n'
+
+# PF99999 only occurs in binders, so it is an exclusive (infinitely enriched) domain
+PFAM_BINDER_HITS = [
+    ('gene_1', 'PF00001', 120.4, 1.2e-30, 1, 40),
+    ('gene_1', 'PF99999', 227.3, 3.5e-70, 30, 60),
+    ('gene_2', 'PF00001', 98.1, 4.0e-22, 5, 50),
+    ('gene_3', 'PF00002', 45.6, 7.7e-09, 10, 35)
+]
+PFAM_METAGENOME_HITS = PFAM_BINDER_HITS + [
+    ('gene_4', 'PF00001', 88.8, 2.2e-18, 2, 44),
+    ('gene_4', 'PF00002', 51.0, 9.1e-11, 20, 60)
+]
+KOFAM_BINDER_HITS = [
+    ('gene_1', 'K00001', 310.2, 1.0e-95, 1, 64),
+    ('gene_3', 'K00002', 150.9, 6.3e-40, 4, 60)
+]
+KOFAM_METAGENOME_HITS = KOFAM_BINDER_HITS + [
+    ('gene_4', 'K00001', 290.0, 5.5e-88, 1, 63)
+]
+
+def write_hits(path, hits):
+    with open(path, 'w') as f:
+        f.write(HMM_COLUMNS)
+        for hit in hits:
+            f.write('\t'.join(str(value) for value in hit) + '\n')
+
+def write_data_dir(path):
+    """Write the synthetic sample into the directory at path."""
+    with open(os.path.join(path, 'sequences.faa'), 'w') as f:
+        for sequence_id, sequence in SEQUENCES.items():
+            f.write(f">{sequence_id} synthetic\n")
+            for start in range(0, len(sequence), 60):
+                f.write(sequence[start:start + 60] + '\n')
+
+    with open(os.path.join(path, f"{SAMPLE_ID}_merged_better_binders.csv"), 'w') as f:
+        f.write('MHC,cancer_acc,cancer_DB,mimic_gene,mimic_Peptide,mimic_Score_EL,'
+                'mimic_%Rank_EL,mimic_Aff(nM),mimic_BindLevel\n')
+        for gene, mhc, cancer_acc, start, affinity, level in BINDER_ROWS:
+            peptide = SEQUENCES[gene][start:start + 9]
+            f.write(f"{mhc},{cancer_acc},db1,{gene},{peptide},0.5,1.2,{affinity},{level}\n")
+
+    write_hits(os.path.join(path, f"{SAMPLE_ID}_PFAM_better_binders.tsv"), PFAM_BINDER_HITS)
+    write_hits(os.path.join(path, f"{SAMPLE_ID}_PFAM_metagenome.tsv"), PFAM_METAGENOME_HITS)
+    write_hits(os.path.join(path, f"{SAMPLE_ID}_KOFAM_better_binders.tsv"), KOFAM_BINDER_HITS)
+    write_hits(os.path.join(path, f"{SAMPLE_ID}_KOFAM_metagenome.tsv"), KOFAM_METAGENOME_HITS)
+
+def load_processor(data_dir):
+    """Build a processor over data_dir the way the server does (progress output silenced)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = MimicDataProcessor(data_dir)
+        processor.load_data()
+        processor.process_hmm_hits()
+        processor.merge_data()
+    return processor
+
+@pytest.fixture
+def data_dir(tmp_path):
+    write_data_dir(str(tmp_path))
+    return str(tmp_path)
+
+@pytest.fixture
+def processor(data_dir):
+    processor = load_processor(data_dir)
+    yield processor
+    processor.close()
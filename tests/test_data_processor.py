@@ -0,0 +1,77 @@
+"""
+Tests for MimicDataProcessor and SequenceCache on the synthetic sample (see conftest.py).
+"""
+
+import contextlib
+import io
+import math
+import os
+
+import pytest
+
+import data_processor
+from conftest import load_processor
+from data_processor import ENRICHMENT_CACHE_FILENAME, NUMPY_STRIP_THRESHOLD, SequenceCache
+
+def enrichment_data(processor):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return processor.get_domain_enrichment_data()
+
+def test_enrichment_cache_round_trip(data_dir, processor):
+    cold = enrichment_data(processor)
+    assert os.path.exists(os.path.join(data_dir, ENRICHMENT_CACHE_FILENAME))
+
+    # A new processor over the same files is answered from the cache
+    warm_processor = load_processor(data_dir)
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            warm = warm_processor.get_domain_enrichment_data()
+    finally:
+        warm_processor.close()
+    assert 'from cache' in output.getvalue()
+
+    assert warm == cold
+    exclusive = {record['domain']: record for record in warm['pfam_exclusive']}
+    assert math.isinf(exclusive['PF99999']['enrichment'])
+
+def test_strip_whitespace_same_for_short_and_long_records():
+    record = b'AC\x0cDE \t\x0b\r\n'
+    repeats = NUMPY_STRIP_THRESHOLD // len(record) + 1
+
+    assert SequenceCache._strip_whitespace(record) == b'ACDE'
+    assert SequenceCache._strip_whitespace(record * repeats) == b'ACDE' * repeats
+
+@pytest.mark.parametrize('use_numba', [False, True])
+def test_indexed_lengths_match_sequences(tmp_path, monkeypatch, use_numba):
+    if use_numba and not data_processor.HAS_NUMBA:
+        pytest.skip('numba is not installed')
+    monkeypatch.setattr(data_processor, 'HAS_NUMBA', use_numba)
+    (tmp_path / 'records.faa').write_bytes(
+        b'>a\nACDE  \r\nFGHI\t\r\n'
+        b'>b\n' + b'M' * 100000 + b' \x0b\n'
+        b'>c\nAC\x0cDE\n'
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        cache = SequenceCache(str(tmp_path))
+    try:
+        for sequence_id, sequence in [('a', 'ACDEFGHI'), ('b', 'M' * 100000), ('c', 'ACDE')]:
+            assert cache.get_sequence(sequence_id) == sequence
+            assert cache.get_sequence_length(sequence_id) == len(sequence)
+    finally:
+        cache.close()
+
+def test_suffix_array_search_matches_str_find(monkeypatch):
+    if not data_processor.HAS_DIVSUFSORT:
+        pytest.skip('pydivsufsort is not installed')
+    monkeypatch.setattr(data_processor, 'SUFFIX_ARRAY_MIN_LENGTH', 10)
+    sequence = 'MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQ' * 3
+    peptides = ['AYIAKQRQI', 'KVKALPDAQ', 'SRQLEERLG', 'WWWWWWWWW', 'M']
+
+    positions = data_processor.find_peptide_positions(sequence, peptides)
+    assert positions == {peptide: sequence.find(peptide) for peptide in peptides}
+
+    # The suffix array is kept and reused for the next search of the sequence
+    assert sequence in data_processor._suffix_arrays
+    assert data_processor.find_peptide_positions(sequence, peptides) == positions
@@ -0,0 +1,93 @@
+"""
+Tests for the Flask routes, served from the synthetic sample (see conftest.py).
+"""
+
+import contextlib
+import io
+import os
+import re
+
+import pytest
+
+import server
+
+@pytest.fixture
+def client(data_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert server.load_data(data_dir)
+    yield server.app.test_client()
+    server.PROCESSOR.close()
+
+def test_enrichment_page_keeps_infinite_enrichment(client):
+    page = client.get('/domain_enrichment').get_data(as_text=True)
+
+    # The page script sorts and labels domains on enrichment; exclusive ones must stay Infinity
+    exclusive = re.search(r'pfamExclusive: (.*),\n', page).group(1)
+    assert '"domain": "PF99999"' in exclusive
+    assert '"enrichment": Infinity' in exclusive
+    assert '"enrichment": null' not in page
+
+def test_prerender_only_replaces_its_own_directories(data_dir, tmp_path_factory, monkeypatch):
+    page_dir = tmp_path_factory.mktemp('pages')
+    unrelated = page_dir / 'unrelated'
+    unrelated.mkdir()
+    (unrelated / 'keep.txt').write_text('keep')
+    monkeypatch.setattr(server, 'PRERENDER_PAGE_DIR', str(page_dir))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert server.load_data(data_dir)
+        assert server.load_data(data_dir)
+    try:
+        page_dirs = [entry.name for entry in page_dir.iterdir() if entry.name != 'unrelated']
+        assert page_dirs == [f"{server.PRERENDER_DIR_PREFIX}{server.DATA_LOAD_COUNT}"]
+        assert (unrelated / 'keep.txt').read_text() == 'keep'
+
+        response = server.app.test_client().get('/sequence/gene_1')
+        assert response.status_code == 200
+        assert 'gene_1' in response.get_data(as_text=True)
+    finally:
+        monkeypatch.setattr(server, 'prerendered_pages_dir', None)
+        server.PROCESSOR.close()
+
+def test_prerendered_pages_are_published_when_complete(data_dir, tmp_path_factory, monkeypatch):
+    monkeypatch.setattr(server, 'PRERENDER_PAGE_DIR', str(tmp_path_factory.mktemp('pages')))
+    published_while_rendering = []
+    render_template = server.render_template
+
+    def recording_render_template(*args, **kwargs):
+        published_while_rendering.append(server.prerendered_pages_dir)
+        return render_template(*args, **kwargs)
+
+    monkeypatch.setattr(server, 'render_template', recording_render_template)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert server.load_data(data_dir)
+    try:
+        assert published_while_rendering and set(published_while_rendering) == {None}
+        pages_dir = server.prerendered_pages_dir
+        assert pages_dir is not None
+        assert not [name for name in os.listdir(pages_dir) if not name.endswith('.html')]
+    finally:
+        monkeypatch.setattr(server, 'prerendered_pages_dir', None)
+        server.PROCESSOR.close()
+
+def test_prerender_failure_falls_back_to_live_pages(data_dir, tmp_path_factory, monkeypatch):
+    page_dir = tmp_path_factory.mktemp('pages')
+    monkeypatch.setattr(server, 'PRERENDER_PAGE_DIR', str(page_dir))
+
+    def failing_render_template(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(server, 'render_template', failing_render_template)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert server.load_data(data_dir)
+    monkeypatch.undo()
+    try:
+        assert server.prerendered_pages_dir is None
+        assert not server.data_loading.is_set()
+        assert list(page_dir.iterdir()) == []
+
+        response = server.app.test_client().get('/sequence/gene_1')
+        assert response.status_code == 200
+        assert 'gene_1' in response.get_data(as_text=True)
+    finally:
+        server.PROCESSOR.close()